@@ -2,17 +2,31 @@ from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
-from models import db
+from database import init_database
+from events import init_events
+from search_cache import init_search_cache
+from recommendations import init_recommender
+from metrics import init_metrics
+from sql_monitor import init_sql_monitor
+from counters import init_counters
+from serialization import JSONProvider
 import os
 
 def create_app():
     app = Flask(__name__, static_folder='../frontend/build', static_url_path='')
     app.config.from_object(Config)
+    app.json = JSONProvider(app)
     
     # Initialize extensions
     CORS(app)
-    db.init_app(app)
+    init_database(app)
     JWTManager(app)
+    init_events(app)
+    init_search_cache(app)
+    init_recommender(app)
+    init_metrics(app)
+    init_sql_monitor(app)
+    init_counters()
     
     # Register blueprints
     from routes.auth import auth_bp
@@ -27,6 +41,14 @@ def create_app():
     app.register_blueprint(communications_bp, url_prefix='/api/communications')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     
+    # Command-line tools: flask --app wsgi import-users students.csv
+    from bulk_import import import_users_command
+    app.cli.add_command(import_users_command)
+    from scoring import rescore_assessments_command
+    app.cli.add_command(rescore_assessments_command)
+    from migrations import init_db_command
+    app.cli.add_command(init_db_command)
+    
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
     def health_check():
@@ -41,28 +63,16 @@ def create_app():
         else:
             return send_from_directory(app.static_folder, 'index.html')
     
-    # Create tables
-    with app.app_context():
-        db.create_all()
-        
-        # Create default admin user if not exists
-        from models import User
-        admin = User.query.filter_by(email='admin@careerconnect.com').first()
-        if not admin:
-            admin = User(
-                user_id='admin-001',
-                name='Admin User',
-                email='admin@careerconnect.com',
-                role='admin'
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
-            print('Default admin user created: admin@careerconnect.com / admin123')
-    
     return app
 
 if __name__ == '__main__':
     app = create_app()
+    # The development server sets up its own database; deployments run
+    # 'flask --app wsgi init-db' once instead of in every worker
+    with app.app_context():
+        from migrations import DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD, init_db
+        _, admin_created = init_db()
+    if admin_created:
+        print(f'Default admin user created: {DEFAULT_ADMIN_EMAIL} / {DEFAULT_ADMIN_PASSWORD}')
     port = int(os.environ.get('PORT', 5001))
     app.run(host='0.0.0.0', port=port, debug=True)
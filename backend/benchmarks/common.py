@@ -0,0 +1,56 @@
+"""Shared helpers for the backend benchmarks.
+
+Benchmarks are run from the backend directory, e.g.
+``python -m benchmarks.query_counts``. They use a throwaway in-memory SQLite
+database unless DATABASE_URL is set.
+"""
+import os
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event
+from app import create_app
+from migrations import init_db
+from models import db
+
+
+class StatementCounter:
+    """Counts SQL statements sent through an engine."""
+
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def reset(self):
+        del self.statements[:]
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+def make_app():
+    app = create_app()
+    with app.app_context():
+        init_db()
+        counter = StatementCounter(db.engine)
+    return app, counter
+
+
+def auth_header(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def register(client, name, role, **fields):
+    data = {'name': name, 'email': f'{name}@bench.local', 'password': 'bench-password', 'role': role}
+    data.update(fields)
+    response = client.post('/api/auth/register', json=data)
+    return response.get_json()['access_token']
+
+
+def login(client, email, password):
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    return response.get_json()['access_token']
@@ -0,0 +1,60 @@
+"""Compare two load-test reports endpoint by endpoint.
+
+    python -m benchmarks.compare_reports base.json new.json
+
+Prints p50/p99 latency, throughput and SQL statements per request for both
+runs with the relative change; endpoints present in only one report are
+listed separately.
+"""
+import argparse
+import json
+
+METRICS = (('p50_ms', 'p50'), ('p99_ms', 'p99'), ('throughput_rps', 'rps'), ('sql_per_request', 'sql'))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _change(old, new):
+    if not old:
+        return '     n/a'
+    return f'{(new - old) / old:+8.0%}'
+
+
+def compare(base, new):
+    print(f'base: {base["meta"].get("git_commit")} {base["meta"].get("started_at")}  '
+          f'new: {new["meta"].get("git_commit")} {new["meta"].get("started_at")}')
+    header = ''.join(f' {label + " base":>8} {"new":>8} {"change":>8}' for _, label in METRICS)
+    print(f'{"endpoint":36}{header}')
+    names = sorted(set(base['endpoints']) & set(new['endpoints']))
+    rows = [(name, base['endpoints'][name], new['endpoints'][name]) for name in names]
+    rows.append(('TOTAL', base['totals'], new['totals']))
+    for name, old, current in rows:
+        cells = ''.join(
+            f' {old[key]:>8.1f} {current[key]:>8.1f} {_change(old[key], current[key])}' for key, _ in METRICS
+        )
+        print(f'{name:36}{cells}')
+    for label, only in (('base', set(base['endpoints']) - set(new['endpoints'])),
+                        ('new', set(new['endpoints']) - set(base['endpoints']))):
+        if only:
+            print(f'only in {label}: {", ".join(sorted(only))}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('new')
+    args = parser.parse_args()
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    compare(base, new)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Measure throughput under concurrent reads and writes from several workers.
+
+    python -m benchmarks.concurrency [--processes 4] [--threads 4]
+                                     [--seconds 10] [--write-ratio 0.2]
+
+Mimics ``gunicorn --preload``: the app is created (and the database seeded)
+in the parent, then forked into ``--processes`` workers, each running
+``--threads`` clients. Reads list the student's messages and conversations;
+writes send a message. Uses a file SQLite database unless DATABASE_URL is
+set, so the engine settings from the environment apply: compare e.g.
+``SQLITE_JOURNAL_MODE=DELETE SQLITE_BUSY_TIMEOUT=1`` with the defaults.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+_db_dir = tempfile.mkdtemp(prefix='careerconnect-bench-')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_db_dir, "bench.db")}')
+# Seeding registers a user per client; hashing cost is not what is measured
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+from benchmarks.common import auth_header, make_app, register  # noqa: E402
+
+READS = ('/api/communications/messages', '/api/communications/conversations')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def worker(app, tokens, mentor_id, args, results):
+    latencies = {'read': [], 'write': []}
+    errors = {}
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def client_loop(token, seed):
+        client = app.test_client()
+        rng = random.Random(seed)
+        headers = auth_header(token)
+        while not stop.is_set():
+            kind = 'write' if rng.random() < args.write_ratio else 'read'
+            started = time.perf_counter()
+            if kind == 'write':
+                response = client.post('/api/communications/messages', headers=headers, json={
+                    'receiver_id': mentor_id, 'content': f'benchmark message {rng.random()}'
+                })
+            else:
+                response = client.get(rng.choice(READS), headers=headers)
+            elapsed = time.perf_counter() - started
+            with lock:
+                if response.status_code < 400:
+                    latencies[kind].append(elapsed)
+                else:
+                    error = (response.get_json(silent=True) or {}).get('error', str(response.status_code))
+                    error = error.splitlines()[0] if error else str(response.status_code)
+                    errors[error] = errors.get(error, 0) + 1
+
+    threads = [
+        threading.Thread(target=client_loop, args=(token, os.getpid() * 1000 + i))
+        for i, token in enumerate(tokens)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    results.put((latencies, errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=4, help='forked workers')
+    parser.add_argument('--threads', type=int, default=4, help='clients per worker')
+    parser.add_argument('--seconds', type=float, default=10, help='measurement window')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='share of requests that write')
+    args = parser.parse_args()
+
+    app, _ = make_app()
+    client = app.test_client()
+    mentor_token = register(client, 'bench-concurrency-mentor', 'mentor')
+    mentor_id = client.get('/api/mentors/profile', headers=auth_header(mentor_token)).get_json()['profile']['id']
+    tokens = [
+        register(client, f'bench-concurrency-{i}', 'student')
+        for i in range(args.processes * args.threads)
+    ]
+
+    # The parent has used its pool; the children must not share those connections
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(
+            app, tokens[i * args.threads:(i + 1) * args.threads], mentor_id, args, results
+        ))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    latencies = {'read': [], 'write': []}
+    errors = {}
+    for _ in processes:
+        worker_latencies, worker_errors = results.get()
+        for kind, values in worker_latencies.items():
+            latencies[kind].extend(values)
+        for error, count in worker_errors.items():
+            errors[error] = errors.get(error, 0) + count
+    for process in processes:
+        process.join()
+
+    print(f'database:    {app.config["SQLALCHEMY_DATABASE_URI"]}')
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        print(f'sqlite:      journal_mode={app.config["SQLITE_JOURNAL_MODE"]} '
+              f'synchronous={app.config["SQLITE_SYNCHRONOUS"]} '
+              f'busy_timeout={app.config["SQLITE_BUSY_TIMEOUT"]}ms')
+    print(f'clients:     {args.processes} processes x {args.threads} threads, '
+          f'{args.write_ratio:.0%} writes, {args.seconds:.0f}s')
+    total = 0
+    for kind, values in latencies.items():
+        total += len(values)
+        print(f'{kind + "s:":<12} {len(values) / args.seconds:8.1f}/s  '
+              f'p50 {percentile(values, 50) * 1000:6.1f} ms  p99 {percentile(values, 99) * 1000:6.1f} ms')
+    print(f'total:       {total / args.seconds:8.1f}/s')
+    print(f'errors:      {sum(errors.values())}')
+    for error, count in sorted(errors.items(), key=lambda item: -item[1]):
+        print(f'  {count:6d}  {error}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+"""Drive a realistic request mix against every API blueprint and report
+latency, throughput and SQL statements per endpoint.
+
+    python -m benchmarks.seed_data --preset medium          # once
+    python -m benchmarks.load_test [--seconds 30] [--threads 4]
+                                   [--mix student=70,mentor=25,admin=5]
+                                   [--output report.json] [--compare base.json]
+
+Runs in-process against DATABASE_URL (default: ``benchmark.db``, as written
+by ``seed_data``). Each thread plays one virtual user at a time, picked by
+``--mix``, and sends that role's endpoints with the weights below; tokens are
+issued directly so only the login endpoint pays for password hashing.
+Everything random is derived from ``--seed``.
+
+The report (JSON, written to ``--output``) holds p50/p95/p99 latency,
+requests per second and SQL statements per request for each endpoint, plus
+the run's settings and git commit. ``--compare`` prints the change against
+an earlier report; ``python -m benchmarks.compare_reports`` does the same
+for two saved reports.
+
+Not exercised: the SSE stream (long-lived), bulk user import, user and
+availability deletion and invite acceptance (they consume their inputs).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.abspath("benchmark.db")}')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from benchmarks.common import auth_header  # noqa: E402
+from benchmarks.compare_reports import compare, percentile  # noqa: E402
+from benchmarks.seed_data import EMAIL_DOMAIN, PASSWORD, SKILLS  # noqa: E402
+from models import (  # noqa: E402
+    db, User, Student, Mentor, Message, Session, MentorshipRequest, ProgressTracker
+)
+
+DEFAULT_MIX = 'student=70,mentor=25,admin=5'
+USERS_PER_ROLE = 200
+REQUESTS_PER_USER = 20  # requests a virtual user sends before the thread switches user
+
+# (name, weight, method, path template, body builder or None). Templates are
+# filled from the virtual user's context; endpoints whose placeholders the
+# context lacks are skipped for that user.
+Endpoint = namedtuple('Endpoint', ['name', 'weight', 'method', 'path', 'body'])
+
+
+def _future(rng, days=14):
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    return (start + timedelta(days=rng.randint(1, days), hours=rng.randrange(9, 17))).isoformat()
+
+
+def _window(rng):
+    start = _future(rng, 30)
+    return {'start_time': start, 'end_time': (datetime.fromisoformat(start) + timedelta(hours=3)).isoformat()}
+
+
+def _answers(ctx, rng):
+    return {'answers': {
+        '1': rng.choice(['math and computer science', 'art and design', 'biology', 'economics']),
+        '2': rng.choice(['People', 'Data', 'Both']),
+        '3': rng.choice(['coding, analysis', 'communication', 'creativity']),
+        '4': rng.choice(['software engineer', 'manager', 'doctor']),
+        '5': rng.choice(['Office', 'Remote', 'Hybrid', 'Outdoor']),
+    }}
+
+
+ENDPOINTS = {
+    'student': [
+        Endpoint('auth.me', 5, 'GET', '/api/auth/me', None),
+        Endpoint('auth.login', 1, 'POST', '/api/auth/login',
+                 lambda ctx, rng: {'email': ctx['email'], 'password': PASSWORD}),
+        Endpoint('auth.password_reset', 0.5, 'POST', '/api/auth/password-reset',
+                 lambda ctx, rng: {'email': ctx['email']}),
+        Endpoint('auth.register', 0.5, 'POST', '/api/auth/register',
+                 lambda ctx, rng: {'name': 'Load Student', 'email': f'load-{rng.getrandbits(64):x}@{EMAIL_DOMAIN}',
+                                   'password': PASSWORD, 'role': 'student'}),
+        Endpoint('students.profile', 5, 'GET', '/api/students/profile', None),
+        Endpoint('students.profile.update', 1, 'PUT', '/api/students/profile',
+                 lambda ctx, rng: {'career_interests': ' '.join(rng.sample(SKILLS, 3))}),
+        Endpoint('students.questionnaire', 1, 'GET', '/api/students/assessment/questionnaire', None),
+        Endpoint('students.assessment.create', 1, 'POST', '/api/students/assessment', _answers),
+        Endpoint('students.assessments', 3, 'GET', '/api/students/assessments', None),
+        Endpoint('students.progress', 3, 'GET', '/api/students/progress', None),
+        Endpoint('students.progress.create', 0.5, 'POST', '/api/students/progress',
+                 lambda ctx, rng: {'goals': [{'text': 'Finish portfolio', 'completed': False}], 'milestones': []}),
+        Endpoint('students.progress.update', 1, 'PUT', '/api/students/progress/{tracker_id}',
+                 lambda ctx, rng: {'goals': [{'text': 'Finish portfolio', 'completed': rng.random() < 0.5}]}),
+        Endpoint('students.progress.patch', 1, 'PATCH', '/api/students/progress/{tracker_id}',
+                 lambda ctx, rng: {'operations': [
+                     {'op': 'add', 'path': '/milestones/-', 'value': {'text': 'Checkpoint', 'completed': False}}
+                 ]}),
+        Endpoint('mentors.search', 2, 'GET', '/api/mentors/search', None),
+        Endpoint('mentors.search.query', 8, 'GET', '/api/mentors/search?q={skill}', None),
+        Endpoint('mentors.recommendations', 3, 'GET', '/api/mentors/recommendations', None),
+        Endpoint('mentors.detail', 5, 'GET', '/api/mentors/{mentor_id}', None),
+        Endpoint('mentors.slots', 2, 'GET', '/api/mentors/{mentor_id}/slots?end={slots_end}', None),
+        Endpoint('mentors.request', 1, 'POST', '/api/mentors/request',
+                 lambda ctx, rng: {'mentor_id': ctx['mentor_id'], 'message': 'Would you mentor me?'}),
+        Endpoint('communications.messages', 8, 'GET', '/api/communications/messages', None),
+        Endpoint('communications.messages.send', 4, 'POST', '/api/communications/messages',
+                 lambda ctx, rng: {'receiver_id': ctx['mentor_id'], 'content': 'Could we talk about my CV?'}),
+        Endpoint('communications.unread', 6, 'GET', '/api/communications/messages/unread', None),
+        Endpoint('communications.conversations', 4, 'GET', '/api/communications/conversations', None),
+        Endpoint('communications.conversation', 4, 'GET',
+                 '/api/communications/conversations/{mentor_id}/messages', None),
+        Endpoint('communications.sessions', 4, 'GET', '/api/communications/sessions', None),
+        Endpoint('communications.sessions.create', 1, 'POST', '/api/communications/sessions',
+                 lambda ctx, rng: {'mentor_id': ctx['mentor_id'], 'date_time': _future(rng)}),
+    ],
+    'mentor': [
+        Endpoint('auth.me', 3, 'GET', '/api/auth/me', None),
+        Endpoint('mentors.profile', 4, 'GET', '/api/mentors/profile', None),
+        Endpoint('mentors.profile.update', 1, 'PUT', '/api/mentors/profile',
+                 lambda ctx, rng: {'expertise': ' '.join(rng.sample(SKILLS, 3))}),
+        Endpoint('mentors.requests', 4, 'GET', '/api/mentors/requests', None),
+        Endpoint('mentors.requests.respond', 1, 'PUT', '/api/mentors/requests/{request_id}',
+                 lambda ctx, rng: {'status': rng.choice(['approved', 'rejected'])}),
+        Endpoint('mentors.resources', 3, 'GET', '/api/mentors/resources', None),
+        Endpoint('mentors.resources.create', 0.5, 'POST', '/api/mentors/resources',
+                 lambda ctx, rng: {'title': 'Interview guide', 'file_type': 'link',
+                                   'file_url': 'https://example.com/guide'}),
+        Endpoint('mentors.availability', 2, 'GET', '/api/mentors/availability', None),
+        Endpoint('mentors.availability.create', 0.5, 'POST', '/api/mentors/availability',
+                 lambda ctx, rng: {'windows': [_window(rng)]}),
+        Endpoint('communications.messages', 6, 'GET', '/api/communications/messages', None),
+        Endpoint('communications.messages.read', 2, 'PUT', '/api/communications/messages/{message_id}/read', None),
+        Endpoint('communications.messages.read_bulk', 1, 'PUT', '/api/communications/messages/read',
+                 lambda ctx, rng: {'up_to': ctx['message_id']}),
+        Endpoint('communications.unread', 6, 'GET', '/api/communications/messages/unread', None),
+        Endpoint('communications.conversations', 4, 'GET', '/api/communications/conversations', None),
+        Endpoint('communications.conversation', 4, 'GET',
+                 '/api/communications/conversations/{student_id}/messages', None),
+        Endpoint('communications.sessions', 4, 'GET', '/api/communications/sessions', None),
+        Endpoint('communications.sessions.update', 1, 'PUT', '/api/communications/sessions/{session_id}',
+                 lambda ctx, rng: {'notes': 'Discussed next steps'}),
+    ],
+    'admin': [
+        Endpoint('admin.users', 4, 'GET', '/api/admin/users', None),
+        Endpoint('admin.users.by_role', 2, 'GET', '/api/admin/users?role=mentor', None),
+        Endpoint('admin.mentors.pending', 3, 'GET', '/api/admin/mentors/pending', None),
+        Endpoint('admin.mentors.verify', 1, 'PUT', '/api/admin/mentors/verify/{mentor_id}',
+                 lambda ctx, rng: {'status': 'verified'}),
+        Endpoint('admin.stats', 4, 'GET', '/api/admin/dashboard/stats', None),
+        Endpoint('admin.stats.recompute', 0.2, 'POST', '/api/admin/dashboard/stats/recompute', None),
+        Endpoint('admin.search_cache', 1, 'GET', '/api/admin/cache/search', None),
+        Endpoint('admin.reports.sessions', 3, 'GET', '/api/admin/reports/sessions', None),
+        Endpoint('admin.exports.sessions', 0.5, 'GET',
+                 '/api/admin/exports/sessions?format=ndjson&start={export_start}', None),
+        Endpoint('admin.profile.update', 0.5, 'PUT', '/api/admin/profile',
+                 lambda ctx, rng: {'name': 'Admin User'}),
+    ],
+}
+
+
+class StatementCounter:
+    """Counts SQL statements per thread, so concurrent requests do not mix."""
+
+    def __init__(self, engine):
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, *args):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def take(self):
+        count = getattr(self._local, 'count', 0)
+        self._local.count = 0
+        return count
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        role, _, weight = part.partition('=')
+        if role.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f'unknown role {role!r}; roles: {", ".join(ENDPOINTS)}')
+        mix[role.strip()] = float(weight)
+    return mix
+
+
+def _first(query):
+    return db.session.execute(query.limit(1)).scalar()
+
+
+def load_contexts(rng, per_role):
+    """Virtual users per role, with the ids their endpoints need."""
+    bench_users = User.email.like(f'%@{EMAIL_DOMAIN}')
+    students = db.session.execute(
+        select(User.id, User.email, Student.id).join(Student, Student.user_id == User.id).where(bench_users)
+    ).all()
+    mentors = db.session.execute(
+        select(User.id, Mentor.id).join(Mentor, Mentor.user_id == User.id)
+        .where(bench_users, Mentor.verification_status == 'verified')
+    ).all()
+    if not students or not mentors:
+        raise SystemExit('No benchmark data found; run python -m benchmarks.seed_data first')
+    mentor_ids = [mentor_id for _, mentor_id in mentors]
+    slots_end = (datetime.utcnow() + timedelta(days=7)).replace(microsecond=0).isoformat()
+
+    contexts = {'student': [], 'mentor': [], 'admin': []}
+    for user_id, email, student_id in rng.sample(students, min(per_role, len(students))):
+        contexts['student'].append({
+            'user_id': user_id, 'email': email, 'mentor_id': rng.choice(mentor_ids),
+            'skill': rng.choice(SKILLS), 'slots_end': slots_end,
+            'tracker_id': _first(select(ProgressTracker.tracker_id).where(ProgressTracker.student_id == student_id)),
+        })
+    for user_id, mentor_id in rng.sample(mentors, min(per_role, len(mentors))):
+        message = db.session.execute(
+            select(Message.id, Message.sender_id).where(Message.receiver_id == mentor_id)
+            .order_by(Message.timestamp.desc()).limit(1)
+        ).first()
+        contexts['mentor'].append({
+            'user_id': user_id,
+            'message_id': message and message.id,
+            'student_id': message and message.sender_id,
+            'request_id': _first(select(MentorshipRequest.id).where(MentorshipRequest.mentor_id == mentor_id)),
+            'session_id': _first(select(Session.id).where(Session.mentor_id == mentor_id)),
+        })
+    admin_id = _first(select(User.id).where(User.role == 'admin').order_by(User.id))
+    export_start = (datetime.utcnow() - timedelta(days=1)).date().isoformat()
+    contexts['admin'].append({'user_id': admin_id, 'mentor_id': None, 'export_start': export_start})
+    contexts['admin_mentor_ids'] = mentor_ids
+    for role in ('student', 'mentor', 'admin'):
+        for context in contexts[role]:
+            context['token'] = create_access_token(identity=str(context['user_id']))
+    return contexts
+
+
+def _render(endpoint, context):
+    fields = [field for _, field, _, _ in string.Formatter().parse(endpoint.path) if field]
+    if any(context.get(field) is None for field in fields):
+        return None
+    return endpoint.path.format(**context)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}  # name -> {'latencies': [...], 'statements': [...], 'statuses': {...}}
+
+    def add(self, name, role, status, elapsed, statements):
+        with self.lock:
+            entry = self.samples.setdefault(name, {'roles': set(), 'latencies': [], 'statements': [], 'statuses': {}})
+            entry['roles'].add(role)
+            entry['latencies'].append(elapsed)
+            entry['statements'].append(statements)
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+
+
+def run(app, contexts, mix, args, recorder, counter):
+    stop = threading.Event()
+    roles = list(mix)
+    role_weights = [mix[r] for r in roles]
+    mentor_ids = contexts['admin_mentor_ids']
+
+    def client_loop(index, measuring):
+        rng = random.Random(f'{args.seed}:{index}:{measuring}')
+        client = app.test_client()
+        while not stop.is_set():
+            role = rng.choices(roles, role_weights)[0]
+            context = dict(rng.choice(contexts[role]))
+            if role == 'admin':
+                context['mentor_id'] = rng.choice(mentor_ids)
+            endpoints = [e for e in ENDPOINTS[role] if _render(e, context)]
+            weights = [e.weight for e in endpoints]
+            headers = auth_header(context['token'])
+            for _ in range(REQUESTS_PER_USER):
+                if stop.is_set():
+                    break
+                endpoint = rng.choices(endpoints, weights)[0]
+                body = endpoint.body(context, rng) if endpoint.body else None
+                counter.take()
+                started = time.perf_counter()
+                response = client.open(_render(endpoint, context), method=endpoint.method, headers=headers, json=body)
+                response.get_data()
+                elapsed = time.perf_counter() - started
+                if measuring:
+                    recorder.add(endpoint.name, role, response.status_code, elapsed, counter.take())
+
+    for measuring, seconds in ((False, args.warmup), (True, args.seconds)):
+        if not seconds:
+            continue
+        stop.clear()
+        threads = [threading.Thread(target=client_loop, args=(i, measuring)) for i in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    return elapsed
+
+
+def _summary(latencies, statements, statuses, elapsed):
+    requests = len(latencies)
+    return {
+        'requests': requests,
+        'errors': sum(n for code, n in statuses.items() if code >= 500),
+        'rejected': sum(n for code, n in statuses.items() if 400 <= code < 500),
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+        'throughput_rps': round(requests / elapsed, 2),
+        'mean_ms': round(sum(latencies) / requests * 1000, 2) if requests else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2) if latencies else 0.0,
+        'sql_per_request': round(sum(statements) / requests, 2) if requests else 0.0,
+        'sql_max': max(statements) if statements else 0,
+    }
+
+
+def build_report(app, args, mix, recorder, started_at, elapsed):
+    from counters import read_counters
+    endpoints = {}
+    all_latencies, all_statements, all_statuses = [], [], {}
+    for name, entry in sorted(recorder.samples.items()):
+        endpoints[name] = dict(
+            roles=sorted(entry['roles']),
+            **_summary(entry['latencies'], entry['statements'], entry['statuses'], elapsed)
+        )
+        all_latencies += entry['latencies']
+        all_statements += entry['statements']
+        for code, count in entry['statuses'].items():
+            all_statuses[code] = all_statuses.get(code, 0) + count
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with app.app_context():
+        rows = {name: value for name, value in read_counters().items() if ':' not in name}
+    return {
+        'meta': {
+            'started_at': started_at.replace(microsecond=0).isoformat() + 'Z',
+            'git_commit': commit,
+            'python': platform.python_version(),
+            'database': make_url(app.config['SQLALCHEMY_DATABASE_URI']).render_as_string(hide_password=True),
+            'rows': rows,
+            'threads': args.threads,
+            'seconds': args.seconds,
+            'warmup': args.warmup,
+            'mix': mix,
+            'seed': args.seed,
+        },
+        'totals': _summary(all_latencies, all_statements, all_statuses, elapsed),
+        'endpoints': endpoints,
+    }
+
+
+def print_report(report):
+    print(f'{"endpoint":36} {"reqs":>6} {"err":>4} {"rps":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"sql":>6}')
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['totals'])]
+    for name, stats in rows:
+        print(f'{name:36} {stats["requests"]:>6} {stats["errors"]:>4} {stats["throughput_rps"]:>8.1f} '
+              f'{stats["p50_ms"]:>8.1f} {stats["p95_ms"]:>8.1f} {stats["p99_ms"]:>8.1f} {stats["sql_per_request"]:>6.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=30, help='measurement window')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds first (caches, indexes)')
+    parser.add_argument('--threads', type=int, default=4, help='concurrent clients')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f'default: {DEFAULT_MIX}')
+    parser.add_argument('--users', type=int, default=USERS_PER_ROLE, help='virtual users per role')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report here (default: load-report-<time>.json)')
+    parser.add_argument('--compare', help='earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        counter = StatementCounter(db.engine)
+        contexts = load_contexts(random.Random(args.seed), args.users)
+    mix = {role: weight for role, weight in args.mix.items() if weight > 0}
+
+    recorder = Recorder()
+    started_at = datetime.utcnow()
+    elapsed = run(app, contexts, mix, args, recorder, counter)
+    report = build_report(app, args, mix, recorder, started_at, elapsed)
+    print_report(report)
+
+    output = args.output or f'load-report-{started_at:%Y%m%dT%H%M%S}.json'
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'report written to {output}')
+    if args.compare:
+        with open(args.compare) as f:
+            print()
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
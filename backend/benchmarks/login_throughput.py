@@ -0,0 +1,65 @@
+"""Measure login throughput with the configured password hashing service.
+
+    python -m benchmarks.login_throughput [--threads 8] [--seconds 10]
+
+Hashing settings come from the usual environment variables
+(PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS). Reports logins per second in
+total and per core used for hashing.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+_db_dir = tempfile.mkdtemp(prefix='careerconnect-bench-')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_db_dir, "bench.db")}')
+
+from benchmarks.common import make_app, register  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--seconds', type=float, default=10, help='measurement window')
+    args = parser.parse_args()
+
+    app, _ = make_app()
+    register(app.test_client(), 'bench-login', 'student')
+    credentials = {'email': 'bench-login@bench.local', 'password': 'bench-password'}
+
+    counts = [0] * args.threads
+    errors = [0] * args.threads
+    stop = threading.Event()
+
+    def client_loop(index):
+        client = app.test_client()
+        while not stop.is_set():
+            response = client.post('/api/auth/login', json=credentials)
+            if response.status_code == 200:
+                counts[index] += 1
+            else:
+                errors[index] += 1
+
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    cores = min(workers, os.cpu_count() or 1) if workers else 1
+    rate = sum(counts) / elapsed
+    print(f'method:           {app.config["PASSWORD_HASH_METHOD"]}')
+    print(f'hash workers:     {workers or "inline"} ({cores} core(s) used)')
+    print(f'logins:           {sum(counts)} ok, {sum(errors)} failed in {elapsed:.1f}s')
+    print(f'logins/sec:       {rate:.1f}')
+    print(f'logins/sec/core:  {rate / cores:.1f}')
+
+
+if __name__ == '__main__':
+    main()
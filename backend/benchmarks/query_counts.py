@@ -0,0 +1,60 @@
+"""Report the number of SQL statements each authenticated endpoint issues.
+
+    python -m benchmarks.query_counts [--rows N]
+"""
+import argparse
+from benchmarks.common import make_app, auth_header, register, login
+
+
+def seed(client, rows):
+    admin = login(client, 'admin@careerconnect.com', 'admin123')
+    mentor = register(client, 'mentor0', 'mentor', industry='Technology', expertise='python')
+    student = register(client, 'student0', 'student')
+    client.put('/api/admin/mentors/verify/1', headers=auth_header(admin), json={'status': 'verified'})
+    for i in range(rows):
+        client.post('/api/communications/messages', headers=auth_header(student),
+                    json={'receiver_id': 1, 'content': f'message {i}'})
+        client.post('/api/communications/sessions', headers=auth_header(student),
+                    json={'mentor_id': 1, 'date_time': f'2030-01-01T{i % 24:02d}:00:00'})
+    client.post('/api/mentors/request', headers=auth_header(student), json={'mentor_id': 1})
+    return {'admin': admin, 'mentor': mentor, 'student': student}
+
+
+ENDPOINTS = [
+    ('student', 'GET', '/api/auth/me'),
+    ('student', 'GET', '/api/students/profile'),
+    ('student', 'GET', '/api/students/assessments'),
+    ('student', 'GET', '/api/students/progress'),
+    ('student', 'GET', '/api/mentors/search'),
+    ('student', 'GET', '/api/communications/messages'),
+    ('student', 'GET', '/api/communications/sessions'),
+    ('mentor', 'GET', '/api/mentors/profile'),
+    ('mentor', 'GET', '/api/mentors/requests'),
+    ('mentor', 'GET', '/api/mentors/resources'),
+    ('mentor', 'GET', '/api/communications/messages'),
+    ('mentor', 'PUT', '/api/communications/messages/1/read'),
+    ('admin', 'GET', '/api/admin/users'),
+    ('admin', 'GET', '/api/admin/mentors/pending'),
+    ('admin', 'GET', '/api/admin/dashboard/stats'),
+    ('admin', 'GET', '/api/admin/reports/sessions'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20, help='messages and sessions to seed')
+    args = parser.parse_args()
+
+    app, counter = make_app()
+    client = app.test_client()
+    tokens = seed(client, args.rows)
+
+    print(f'{"role":8} {"method":6} {"endpoint":42} {"status":>6} {"queries":>7}')
+    for role, method, path in ENDPOINTS:
+        counter.reset()
+        response = client.open(path, method=method, headers=auth_header(tokens[role]))
+        print(f'{role:8} {method:6} {path:42} {response.status_code:>6} {counter.count:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Measure mentor recommendation latency as the mentor count grows.
+
+    python -m benchmarks.recommendations [--sizes 10000 100000 1000000]
+
+Builds the TF-IDF index from synthetic profiles (Zipf-distributed terms, no
+database) and reports build time, single-student latency, per-student
+latency when students are scored in batches, and the cost of an
+incremental profile update.
+"""
+import argparse
+import time
+from collections import Counter
+import numpy as np
+from recommendations import MentorRecommender
+
+VOCABULARY = 20000
+TERMS_PER_MENTOR = 25
+TERMS_PER_STUDENT = 10
+
+
+def zipf_terms(rng, size, probabilities):
+    return rng.choice(len(probabilities), size=size, p=probabilities)
+
+
+def synthetic_index(rng, mentors, probabilities):
+    columns = zipf_terms(rng, mentors * TERMS_PER_MENTOR, probabilities)
+    counts = rng.integers(1, 4, size=len(columns))
+    indptr = np.arange(0, len(columns) + 1, TERMS_PER_MENTOR)
+    vocab = {f'term{i}': i for i in range(VOCABULARY)}
+    recommender = MentorRecommender(max_pending=10 ** 9, refresh_seconds=10 ** 9)
+    started = time.perf_counter()
+    recommender.load_arrays(np.arange(1, mentors + 1), indptr, columns, counts, vocab)
+    return recommender, time.perf_counter() - started
+
+
+def student(rng, probabilities):
+    return Counter(f'term{i}' for i in zipf_terms(rng, TERMS_PER_STUDENT, probabilities))
+
+
+def percentile(values, pct):
+    return sorted(values)[int(len(values) * pct / 100) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=50, help='single-student queries per size')
+    parser.add_argument('--batch', type=int, default=64, help='students per batched call')
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    ranks = np.arange(1, VOCABULARY + 1)
+    probabilities = (1 / ranks) / (1 / ranks).sum()
+
+    print(f'{"mentors":>9} {"build s":>8} {"p50 ms":>8} {"p95 ms":>8} {"batch ms/student":>17} {"update ms":>10}')
+    for size in args.sizes:
+        recommender, build_seconds = synthetic_index(rng, size, probabilities)
+
+        latencies = []
+        for _ in range(args.queries):
+            query = student(rng, probabilities)
+            started = time.perf_counter()
+            recommender.top_k([query], args.k)
+            latencies.append(time.perf_counter() - started)
+
+        batch = [student(rng, probabilities) for _ in range(args.batch)]
+        started = time.perf_counter()
+        recommender.top_k(batch, args.k)
+        per_student = (time.perf_counter() - started) / args.batch * 1000
+
+        class Profile:
+            id = size // 2
+            verification_status = 'verified'
+            expertise = 'term1 term2 term3'
+            industry = professional_title = bio = None
+
+        started = time.perf_counter()
+        recommender.update_mentor(Profile)
+        update_ms = (time.perf_counter() - started) * 1000
+
+        print(f'{size:>9} {build_seconds:>8.2f} {percentile(latencies, 50):>8.2f} '
+              f'{percentile(latencies, 95):>8.2f} {per_student:>17.2f} {update_ms:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Measure the batch re-score job over a large assessments table.
+
+    python -m benchmarks.rescore_assessments [--rows 200000] [--chunk-size 1000]
+
+Seeds synthetic answers straight into a file-backed SQLite database, then
+times ``rescore_assessments`` and reports rows per second and the peak
+Python memory it allocated.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+_db_dir = tempfile.mkdtemp(prefix='careerconnect-bench-')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_db_dir, "bench.db")}')
+
+from sqlalchemy import insert  # noqa: E402
+from benchmarks.common import make_app, register  # noqa: E402
+from models import db, CareerAssessment, Student  # noqa: E402
+from scoring import rescore_assessments  # noqa: E402
+
+SUBJECTS = ['math and statistics', 'art and design', 'biology and health', 'business and economics', 'computer science']
+SKILLS = ['communication', 'analysis', 'coding', 'drawing', 'negotiation', 'empathy']
+PLANS = ['manager at a startup', 'data scientist', 'nurse helping people', 'designer', 'engineer']
+
+
+def seed(rows):
+    rng = random.Random(7)
+    student_id = db.session.query(Student.id).scalar()
+    table = CareerAssessment.__table__
+    for offset in range(0, rows, 10000):
+        db.session.execute(insert(table), [{
+            'student_id': student_id,
+            'assessment_id': str(uuid.uuid4()),
+            'answers': {
+                '1': rng.choice(SUBJECTS), '2': rng.choice(['People', 'Data', 'Both']),
+                '3': rng.choice(SKILLS), '4': rng.choice(PLANS),
+                '5': rng.choice(['Office', 'Remote', 'Hybrid', 'Outdoor'])
+            }
+        } for _ in range(min(10000, rows - offset))])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app, _ = make_app()
+    register(app.test_client(), 'bench-assessments', 'student')
+    with app.app_context():
+        seed(args.rows)
+        tracemalloc.start()
+        started = time.perf_counter()
+        done = 0
+        for done in rescore_assessments(args.chunk_size):
+            pass
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+
+    print(f'assessments:      {done}')
+    print(f'chunk size:       {args.chunk_size}')
+    print(f'elapsed:          {elapsed:.1f}s')
+    print(f'rows/sec:         {done / elapsed:.0f}')
+    print(f'peak memory:      {peak / 1e6:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
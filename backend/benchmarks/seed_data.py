@@ -0,0 +1,387 @@
+"""Fill the schema with reproducible synthetic data for benchmarks.
+
+    python -m benchmarks.seed_data [--users 10000] [--mentors 1000]
+                                   [--messages 100000] [--seed 42]
+    python -m benchmarks.seed_data --preset large   # 100k users, 10k mentors, 5M messages
+
+Writes to DATABASE_URL (default: ``benchmark.db`` in the current directory),
+which should be empty apart from the default admin. Rows are generated from
+``--seed`` alone, so two runs with the same arguments produce the same
+database. Every table is filled with batched Core INSERTs using explicit
+primary keys; counters and the mentor search index are rebuilt at the end.
+
+All users share the password ``bench-password`` and have emails
+``student<n>@bench.local`` / ``mentor<n>@bench.local``.
+"""
+import argparse
+import os
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.abspath("benchmark.db")}')
+
+from flask import current_app  # noqa: E402
+from sqlalchemy import func, insert, select, text  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+from models import (  # noqa: E402
+    db, User, Student, Mentor, Message, Session, MentorshipRequest, CareerAssessment,
+    ProgressTracker, Resource, MentorAvailability
+)
+from migrations import init_db  # noqa: E402
+
+PASSWORD = 'bench-password'
+EMAIL_DOMAIN = 'bench.local'
+BATCH_SIZE = 10000
+
+Scale = namedtuple('Scale', [
+    'users', 'mentors', 'messages', 'sessions', 'requests', 'assessments', 'trackers',
+    'resources', 'availability'
+])
+
+PRESETS = {
+    'small': dict(users=2000, mentors=200, messages=20000),
+    'medium': dict(users=10000, mentors=1000, messages=100000),
+    'large': dict(users=100000, mentors=10000, messages=5000000),
+}
+
+INDUSTRIES = [
+    'Technology', 'Finance', 'Healthcare', 'Education', 'Marketing', 'Engineering',
+    'Consulting', 'Design', 'Research', 'Energy', 'Government', 'Media'
+]
+SKILLS = [
+    'python', 'java', 'javascript', 'react', 'data', 'analytics', 'machine', 'learning',
+    'cloud', 'security', 'design', 'ux', 'product', 'management', 'leadership', 'sales',
+    'marketing', 'finance', 'accounting', 'nursing', 'medicine', 'teaching', 'research',
+    'writing', 'statistics', 'economics', 'law', 'policy', 'robotics', 'electrical'
+]
+TITLES = ['Engineer', 'Manager', 'Analyst', 'Designer', 'Scientist', 'Consultant', 'Director', 'Lead']
+SENIORITY = ['Senior', 'Principal', 'Staff', 'Junior', '']
+SESSION_STATUSES = ['pending', 'scheduled', 'completed', 'cancelled']
+REQUEST_STATUSES = ['pending', 'approved', 'rejected']
+VERIFICATION_STATUSES = ['verified'] * 8 + ['pending', 'rejected']
+
+
+def make_scale(users, mentors, messages, **overrides):
+    students = users - mentors
+    values = dict(
+        users=users, mentors=mentors, messages=messages,
+        sessions=messages // 10,
+        requests=students // 2,
+        assessments=students // 2,
+        trackers=students // 2,
+        resources=mentors * 2,
+        availability=mentors * 4,
+    )
+    values.update({k: v for k, v in overrides.items() if v is not None})
+    if not 0 < mentors < users:
+        raise ValueError('need at least one mentor and one student')
+    return Scale(**values)
+
+
+def _words(rng, vocabulary, low, high):
+    return ' '.join(rng.sample(vocabulary, rng.randint(low, high)))
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _insert(model, rows, batch_size, progress):
+    """Insert ``rows`` (an iterable of dicts) in batches; returns the count.
+
+    Secondary indexes are dropped for the load and rebuilt afterwards: one
+    sorted build is far cheaper than millions of random B-tree inserts.
+    """
+    table = model.__table__
+    for index in table.indexes:
+        index.drop(db.session.connection(), checkfirst=True)
+    db.session.commit()
+    try:
+        return _insert_batches(table, rows, batch_size, progress)
+    finally:
+        for index in table.indexes:
+            index.create(db.session.connection(), checkfirst=True)
+        db.session.commit()
+
+
+def _insert_batches(table, rows, batch_size, progress):
+    batch, done = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(table), batch)
+            db.session.commit()
+            done += len(batch)
+            batch = []
+            progress(table.name, done)
+    if batch:
+        db.session.execute(insert(table), batch)
+        db.session.commit()
+        done += len(batch)
+    progress(table.name, done)
+    return done
+
+
+class _Generator:
+    def __init__(self, scale, seed, now):
+        self.scale = scale
+        self.seed = seed
+        self.now = now
+        self.students = scale.users - scale.mentors
+        self.user_base = _next_id(User)
+        self.student_base = _next_id(Student)
+        self.mentor_base = _next_id(Mentor)
+        self.password_hash = generate_password_hash(PASSWORD, current_app.config['PASSWORD_HASH_METHOD'])
+
+    def rng(self, name):
+        # One stream per table, so changing one table's size leaves the others alone
+        return random.Random(f'{self.seed}:{name}')
+
+    def student_id(self, rng):
+        return self.student_base + rng.randrange(self.students)
+
+    def mentor_id(self, rng):
+        # Skewed popularity: the top 1% of mentors get about a fifth of traffic
+        return self.mentor_base + int(self.scale.mentors * rng.random() ** 3)
+
+    def users(self):
+        rng = self.rng('users')
+        created = self.now - timedelta(days=365)
+        step = timedelta(days=365) / self.scale.users
+        for i in range(self.scale.users):
+            is_mentor = i < self.scale.mentors
+            role = 'mentor' if is_mentor else 'student'
+            number = i if is_mentor else i - self.scale.mentors
+            yield {
+                'id': self.user_base + i,
+                'user_id': f'bench-{role}-{number}',
+                'name': f'{rng.choice(["Ada", "Grace", "Alan", "Linus", "Mary", "Tim", "Sofia", "Ken"])} '
+                        f'{role.title()}{number}',
+                'email': f'{role}{number}@{EMAIL_DOMAIN}',
+                'phone_number': f'+1555{rng.randrange(10 ** 7):07d}',
+                'password_hash': self.password_hash,
+                'role': role,
+                'created_at': created + step * i,
+                'version': 1,
+            }
+
+    def mentors(self):
+        rng = self.rng('mentors')
+        for i in range(self.scale.mentors):
+            industry = rng.choice(INDUSTRIES)
+            yield {
+                'id': self.mentor_base + i,
+                'user_id': self.user_base + i,
+                'professional_title': f'{rng.choice(SENIORITY)} {rng.choice(TITLES)}'.strip(),
+                'industry': industry,
+                'verification_status': rng.choice(VERIFICATION_STATUSES),
+                'bio': f'{industry} professional with experience in {_words(rng, SKILLS, 3, 8)}',
+                'expertise': _words(rng, SKILLS, 2, 5),
+                'version': 1,
+            }
+
+    def students_rows(self):
+        rng = self.rng('students')
+        for i in range(self.students):
+            yield {
+                'id': self.student_base + i,
+                'user_id': self.user_base + self.scale.mentors + i,
+                'educational_background': f'BSc {rng.choice(INDUSTRIES)}',
+                'career_interests': _words(rng, SKILLS, 2, 5),
+                'goals': f'Become a {rng.choice(TITLES).lower()} in {rng.choice(INDUSTRIES).lower()}',
+                'version': 1,
+            }
+
+    def messages(self):
+        rng = self.rng('messages')
+        start = self.now - timedelta(days=365)
+        step = timedelta(days=365) / max(self.scale.messages, 1)
+        for i in range(self.scale.messages):
+            timestamp = start + step * i
+            yield {
+                'message_id': f'bench-message-{self.seed}-{i}',
+                'sender_id': self.student_id(rng),
+                'receiver_id': self.mentor_id(rng),
+                'content': f'Hello, could you help me with {_words(rng, SKILLS, 1, 4)}?',
+                'timestamp': timestamp,
+                # Older messages have been read; the last weeks are mostly unread
+                'read': (self.now - timestamp).days > 14 or rng.random() < 0.3,
+            }
+
+    def sessions(self):
+        rng = self.rng('sessions')
+        start = (self.now - timedelta(days=180)).replace(minute=0, second=0, microsecond=0)
+        slots = {}
+        for i in range(self.scale.sessions):
+            mentor_id = self.mentor_id(rng)
+            # Consecutive two-hour slots per mentor never overlap
+            slot = slots[mentor_id] = slots.get(mentor_id, rng.randrange(24)) + 1
+            date_time = start + timedelta(hours=2 * slot)
+            yield {
+                'session_id': f'bench-session-{self.seed}-{i}',
+                'student_id': self.student_id(rng),
+                'mentor_id': mentor_id,
+                'date_time': date_time,
+                'end_time': date_time + timedelta(minutes=60),
+                'status': 'completed' if date_time < self.now and rng.random() < 0.7 else rng.choice(SESSION_STATUSES),
+                'notes': rng.choice([None, 'Career planning', 'CV review', 'Interview practice']),
+                'created_at': date_time - timedelta(days=rng.randint(1, 14)),
+            }
+
+    def requests(self):
+        rng = self.rng('requests')
+        for i in range(self.scale.requests):
+            created = self.now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+            yield {
+                'student_id': self.student_id(rng),
+                'mentor_id': self.mentor_id(rng),
+                'status': rng.choice(REQUEST_STATUSES),
+                'message': 'I would like you to be my mentor',
+                'created_at': created,
+                'updated_at': created,
+            }
+
+    def assessments(self):
+        from scoring import score_batch
+        rng = self.rng('assessments')
+        for i in range(self.scale.assessments):
+            answers = {
+                '1': _words(rng, ['math', 'computer', 'biology', 'art', 'economics', 'psychology', 'environment'], 1, 3),
+                '2': rng.choice(['People', 'Data', 'Both']),
+                '3': _words(rng, ['communication', 'analysis', 'coding', 'creativity', 'sales', 'empathy'], 1, 3),
+                '4': rng.choice(['manager', 'engineer', 'teacher', 'designer', 'doctor', 'scientist']),
+                '5': rng.choice(['Office', 'Remote', 'Hybrid', 'Outdoor']),
+            }
+            results, recommendations = score_batch([answers])
+            yield {
+                'student_id': self.student_id(rng),
+                'assessment_id': f'bench-assessment-{self.seed}-{i}',
+                'questionnaire': None,
+                'questionnaire_version': 1,
+                'answers': answers,
+                'results': results[0],
+                'recommendations': recommendations[0],
+                'created_at': self.now - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+            }
+
+    def trackers(self):
+        rng = self.rng('trackers')
+        for i in range(self.scale.trackers):
+            created = self.now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+            yield {
+                'student_id': self.student_id(rng),
+                'tracker_id': f'bench-tracker-{self.seed}-{i}',
+                'goals': [{'text': f'Learn {skill}', 'completed': rng.random() < 0.5} for skill in rng.sample(SKILLS, 3)],
+                'milestones': [],
+                'mentor_feedback': None,
+                'created_at': created,
+                'updated_at': created,
+            }
+
+    def resources(self):
+        rng = self.rng('resources')
+        for i in range(self.scale.resources):
+            yield {
+                'resource_id': f'bench-resource-{self.seed}-{i}',
+                'mentor_id': self.mentor_id(rng),
+                'title': f'Guide to {_words(rng, SKILLS, 1, 2)}',
+                'file_type': rng.choice(['pdf', 'link', 'video']),
+                'description': None,
+                'upload_date': self.now - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                'file_url': f'https://example.com/resources/{i}',
+            }
+
+    def availability(self):
+        rng = self.rng('availability')
+        day = self.now.replace(hour=9, minute=0, second=0, microsecond=0)
+        per_mentor = max(self.scale.availability // self.scale.mentors, 1)
+        for i in range(self.scale.availability):
+            mentor = i // per_mentor
+            if mentor >= self.scale.mentors:
+                break
+            start = day + timedelta(days=i % per_mentor + 1, hours=rng.randrange(4))
+            yield {
+                'mentor_id': self.mentor_base + mentor,
+                'start_time': start,
+                'end_time': start + timedelta(hours=rng.randint(2, 8)),
+                'created_at': self.now,
+            }
+
+
+def seed_database(scale, seed=42, batch_size=BATCH_SIZE, progress=lambda table, done: None):
+    """Insert ``scale`` rows of every kind; returns ``{table: rows}``.
+
+    Must run inside an app context.
+    """
+    if db.session.execute(select(User.id).where(User.email.like(f'%@{EMAIL_DOMAIN}')).limit(1)).first():
+        raise RuntimeError('Database already contains benchmark data; seed an empty database')
+    generator = _Generator(scale, seed, datetime.utcnow().replace(microsecond=0))
+    counts = {}
+    for model, rows in (
+        (User, generator.users()),
+        (Mentor, generator.mentors()),
+        (Student, generator.students_rows()),
+        (Message, generator.messages()),
+        (Session, generator.sessions()),
+        (MentorshipRequest, generator.requests()),
+        (CareerAssessment, generator.assessments()),
+        (ProgressTracker, generator.trackers()),
+        (Resource, generator.resources()),
+        (MentorAvailability, generator.availability()),
+    ):
+        counts[model.__tablename__] = _insert(model, rows, batch_size, progress)
+
+    if db.engine.dialect.name == 'postgresql':
+        # Explicit ids leave the serial sequences behind
+        for table in ('users', 'students', 'mentors'):
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+            ))
+
+    from counters import recompute_counters
+    from search import rebuild_search_index
+    recompute_counters()
+    rebuild_search_index()
+    db.session.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preset', choices=PRESETS, default='medium')
+    parser.add_argument('--users', type=int, help='total users, mentors included')
+    parser.add_argument('--mentors', type=int)
+    parser.add_argument('--messages', type=int)
+    for name in ('sessions', 'requests', 'assessments', 'trackers', 'resources', 'availability'):
+        parser.add_argument(f'--{name}', type=int, help='default: derived from the sizes above')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    sizes = dict(PRESETS[args.preset])
+    sizes.update({k: getattr(args, k) for k in ('users', 'mentors', 'messages') if getattr(args, k) is not None})
+    scale = make_scale(**sizes, **{k: getattr(args, k) for k in Scale._fields if k not in sizes})
+
+    from app import create_app
+    app = create_app()
+    started = time.perf_counter()
+
+    def progress(table, done):
+        print(f'\r{table:22} {done:>10,} rows  {time.perf_counter() - started:7.1f}s', end='', flush=True)
+
+    with app.app_context():
+        print(f'database: {app.config["SQLALCHEMY_DATABASE_URI"]}')
+        init_db()
+        counts = seed_database(scale, args.seed, args.batch_size, progress)
+    elapsed = time.perf_counter() - started
+    print()
+    for table, count in counts.items():
+        print(f'{table:22} {count:>10,}')
+    total = sum(counts.values())
+    print(f'{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Compare the to_dict and projected serialization paths on a large list.
+
+    python -m benchmarks.serialization [--rows 10000] [--repeat 20]
+
+Seeds ``--rows`` messages between one student and one mentor into a
+file-backed SQLite database, then builds the message list response with
+sender and receiver names three ways:
+
+- ``to_dict``: ORM objects with joined users, ``to_dict`` per row, Flask's
+  default JSON provider (the path list endpoints used before)
+- ``projection + json``: ``MESSAGE_LIST`` rows, standard library encoder
+- ``projection + orjson``: ``MESSAGE_LIST`` rows, orjson (when installed)
+
+Each run starts from an empty session so the identity map does not carry
+objects over. Checks that all three produce the same JSON, then reports
+the median and fastest time per response.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp(prefix='careerconnect-bench-')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_db_dir, "bench.db")}')
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+from benchmarks.common import make_app  # noqa: E402
+from models import db, User, Student, Mentor, Message  # noqa: E402
+from routes.communications import MESSAGE_LIST  # noqa: E402
+from serialization import MentorUser, StudentUser, orjson  # noqa: E402
+
+
+def seed(rows):
+    student_user = User(user_id=str(uuid.uuid4()), name='Bench Student', email='student@bench.local',
+                        password_hash='-', role='student')
+    mentor_user = User(user_id=str(uuid.uuid4()), name='Bench Mentor', email='mentor@bench.local',
+                       password_hash='-', role='mentor')
+    student = Student(user=student_user, career_interests='software')
+    mentor = Mentor(user=mentor_user, professional_title='Engineer', verification_status='verified')
+    db.session.add_all([student, mentor])
+    db.session.commit()
+    started = datetime(2024, 1, 1)
+    db.session.execute(insert(Message.__table__), [
+        {
+            'message_id': str(uuid.uuid4()), 'sender_id': student.id, 'receiver_id': mentor.id,
+            'content': f'Benchmark message {i} about interviews, projects and next steps.',
+            'timestamp': started + timedelta(seconds=37 * i, microseconds=i), 'read': i % 3 == 0
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+    return student.id
+
+
+def to_dict_response(app, student_id, rows):
+    messages = (
+        Message.query.filter_by(sender_id=student_id)
+        .options(
+            joinedload(Message.sender).joinedload(Student.user),
+            joinedload(Message.receiver).joinedload(Mentor.user)
+        )
+        .order_by(Message.timestamp.desc(), Message.id.desc()).limit(rows).all()
+    )
+    result = []
+    for msg in messages:
+        msg_data = msg.to_dict()
+        msg_data['sender_name'] = msg.sender.user.name
+        msg_data['receiver_name'] = msg.receiver.user.name
+        result.append(msg_data)
+    return DefaultJSONProvider(app).response({'messages': result})
+
+
+def projected_body(student_id, rows):
+    query = (
+        MESSAGE_LIST.query()
+        .select_from(Message)
+        .join(Student, Message.sender_id == Student.id)
+        .join(StudentUser, Student.user_id == StudentUser.id)
+        .join(Mentor, Message.receiver_id == Mentor.id)
+        .join(MentorUser, Mentor.user_id == MentorUser.id)
+        .filter(Message.sender_id == student_id)
+        .order_by(Message.timestamp.desc(), Message.id.desc()).limit(rows)
+    )
+    return {'messages': MESSAGE_LIST.dump(query.all())}
+
+
+def projection_json_response(app, student_id, rows):
+    # The provider's standard library path, as used when orjson is missing
+    return DefaultJSONProvider.response(app.json, projected_body(student_id, rows))
+
+
+def projection_orjson_response(app, student_id, rows):
+    return app.json.response(projected_body(student_id, rows))
+
+
+def measure(app, fn, student_id, rows, repeat):
+    timings = []
+    body = None
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        body = fn(app, student_id, rows).get_data()
+        timings.append(time.perf_counter() - started)
+    return timings, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app, _ = make_app()
+    paths = [('to_dict', to_dict_response), ('projection + json', projection_json_response)]
+    if orjson is not None:
+        paths.append(('projection + orjson', projection_orjson_response))
+
+    with app.test_request_context():
+        student_id = seed(args.rows)
+        results = {name: measure(app, fn, student_id, args.rows, args.repeat) for name, fn in paths}
+
+    expected = json.loads(results['to_dict'][1])
+    for name, (_, body) in results.items():
+        assert json.loads(body) == expected, f'{name} response differs from to_dict'
+    print(f'{args.rows} messages, {args.repeat} runs, response {len(results["to_dict"][1]):,} bytes')
+    baseline = statistics.median(results['to_dict'][0])
+    for name, (timings, _) in results.items():
+        median = statistics.median(timings)
+        print(f'{name:<20} median {median * 1000:7.1f} ms  min {min(timings) * 1000:7.1f} ms  '
+              f'{args.rows / median:10,.0f} rows/s  x{baseline / median:.1f}')
+
+
+if __name__ == '__main__':
+    main()
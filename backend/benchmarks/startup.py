@@ -0,0 +1,107 @@
+"""Measure how long a worker takes to boot and what it does on the way.
+
+    python -m benchmarks.startup [--runs 10]
+
+Each run starts a fresh interpreter that imports the app and calls
+``create_app`` the way ``wsgi.py`` does, then serves one health check.
+Reports the median and worst import, ``create_app`` and first-request times,
+plus the database connections, SQL statements and password hashes the
+worker performed before serving. A worker should need none of them; the
+database is set up beforehand with ``init_db``, as ``flask init-db`` would.
+Uses a file SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def boot():
+    """Runs in the child: boot one worker and print what it cost as JSON."""
+    started = time.perf_counter()
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    import werkzeug.security
+
+    usage = {'connections': 0, 'statements': 0, 'hashes': 0}
+
+    def count(name):
+        def listener(*args, **kwargs):
+            usage[name] += 1
+        return listener
+
+    event.listen(Engine, 'connect', count('connections'))
+    event.listen(Engine, 'before_cursor_execute', count('statements'))
+    generate_password_hash = werkzeug.security.generate_password_hash
+
+    def counting_hash(*args, **kwargs):
+        usage['hashes'] += 1
+        return generate_password_hash(*args, **kwargs)
+
+    werkzeug.security.generate_password_hash = counting_hash
+
+    from app import create_app
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+    booted = dict(usage)
+    response = app.test_client().get('/api/health')
+    served = time.perf_counter()
+    assert response.status_code == 200, response.status_code
+    print(json.dumps(dict(
+        booted,
+        import_seconds=imported - started,
+        create_seconds=created - imported,
+        first_request_seconds=served - created,
+    )))
+
+
+def prepare_database():
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from migrations import init_db
+    app = create_app()
+    with app.app_context():
+        init_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--boot', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.boot:
+        boot()
+        return
+
+    if 'DATABASE_URL' not in os.environ:
+        db_dir = tempfile.mkdtemp(prefix='careerconnect-bench-')
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(db_dir, "bench.db")}'
+    prepare_database()
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--boot'],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f'database:       {os.environ["DATABASE_URL"]}')
+    print(f'runs:           {args.runs}')
+    for key, label in (('import_seconds', 'import app'), ('create_seconds', 'create_app()'),
+                       ('first_request_seconds', 'first request')):
+        values = [run[key] * 1000 for run in runs]
+        print(f'{label + ":":<15} median {statistics.median(values):7.1f} ms  max {max(values):7.1f} ms')
+    for key in ('connections', 'statements', 'hashes'):
+        print(f'{key + ":":<15} {max(run[key] for run in runs)} before the first request')
+
+
+if __name__ == '__main__':
+    main()
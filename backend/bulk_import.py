@@ -0,0 +1,305 @@
+"""Bulk import of students and mentors from CSV or NDJSON.
+
+Records are parsed one at a time and processed in batches. Each batch:
+
+1. drops rows whose email is already registered, with one SELECT ... IN;
+2. hashes the supplied passwords across the password hashing pool, or gives
+   rows without a password an invite token to redeem at
+   ``POST /api/auth/invite/accept``;
+3. inserts the users, then their student/mentor profiles, with executemany
+   INSERTs in a single transaction, adjusting the dashboard counters and the
+   mentor search index in the same transaction.
+
+``import_users`` yields report entries as it goes: one ``error`` per
+rejected row, one ``invite`` per generated token, a ``progress`` entry per
+batch and a final ``summary``. Hashing dominates the cost of rows with
+passwords; rows with invites are limited by the INSERTs alone.
+
+Fields: name, email, role (student or mentor), password (optional),
+phone_number, and the profile fields accepted by ``/api/auth/register``.
+"""
+import csv
+import hashlib
+import io
+import json
+import secrets
+import time
+import uuid
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Student, Mentor
+from counters import adjust_counters, counter_name
+from passwords import hash_passwords
+from search import index_new_mentors
+
+FORMATS = ('csv', 'ndjson')
+ROLES = ('student', 'mentor')
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+STUDENT_FIELDS = ('educational_background', 'career_interests', 'goals')
+MENTOR_FIELDS = ('professional_title', 'industry', 'bio', 'expertise')
+
+# Stored instead of a password hash until the invite is accepted;
+# check_password_hash rejects it, so invitees cannot log in before then
+INVITE_PLACEHOLDER = '!invite'
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename=None, content_type=None):
+    name = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return 'csv'
+
+
+def read_records(stream, fmt):
+    """Yield ``(row_number, record, error)`` from a binary stream."""
+    if fmt not in FORMATS:
+        raise ImportFormatError(f'format must be one of: {", ".join(FORMATS)}')
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for row_number, record in enumerate(csv.DictReader(text_stream), start=1):
+            yield row_number, {k: v for k, v in record.items() if k and v != ''}, None
+        return
+    for row_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, 'Each line must be a JSON object'
+            continue
+        yield row_number, record, None
+
+
+# The column each field is stored in, for per-row type and length checks:
+# a value the INSERT would reject must fail its row, not the whole batch
+USER_COLUMNS = {f: User.__table__.c[f] for f in ('name', 'email', 'phone_number')}
+PROFILE_COLUMNS = {
+    'student': {f: Student.__table__.c[f] for f in STUDENT_FIELDS},
+    'mentor': {f: Mentor.__table__.c[f] for f in MENTOR_FIELDS},
+}
+
+
+def _check_column(field, column, value):
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return f'{field} must be a string'
+    length = getattr(column.type, 'length', None)
+    if length and len(value) > length:
+        return f'{field} must be at most {length} characters'
+    return None
+
+
+def _validate(record):
+    for field in ('name', 'email', 'role'):
+        if not isinstance(record.get(field), str) or not record[field].strip():
+            return f'Missing required field: {field}'
+    if record['role'] not in ROLES:
+        return f'role must be one of: {", ".join(ROLES)}'
+    if '@' not in record['email']:
+        return 'Invalid email'
+    if record.get('password') is not None and not isinstance(record['password'], str):
+        return 'password must be a string'
+    columns = dict(USER_COLUMNS, **PROFILE_COLUMNS[record['role']])
+    for field, column in columns.items():
+        problem = _check_column(field, column, record.get(field))
+        if problem:
+            return problem
+    return None
+
+
+def hash_invite_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class _Importer:
+    def __init__(self, batch_size, invite):
+        self.batch_size = batch_size
+        self.invite = invite
+        self.seen = set()
+        self.processed = 0
+        self.created = 0
+        self.invited = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    def error(self, row_number, email, message):
+        self.failed += 1
+        return {'type': 'error', 'row': row_number, 'email': email, 'error': message}
+
+    def progress(self, kind='progress'):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'type': kind,
+            'processed': self.processed,
+            'created': self.created,
+            'invited': self.invited,
+            'failed': self.failed,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.processed / elapsed, 1) if elapsed else None
+        }
+
+    def run(self, records):
+        batch = []
+        for row_number, record, parse_error in records:
+            self.processed += 1
+            email = record.get('email') if record else None
+            problem = parse_error or _validate(record)
+            if not problem and email in self.seen:
+                problem = 'Duplicate email in import'
+            if problem:
+                yield self.error(row_number, email, problem)
+                continue
+            self.seen.add(email)
+            batch.append((row_number, record))
+            if len(batch) >= self.batch_size:
+                yield from self.flush(batch)
+                batch = []
+        if batch:
+            yield from self.flush(batch)
+        yield self.progress('summary')
+
+    def _drop_registered(self, batch):
+        emails = [record['email'] for _, record in batch]
+        registered = set(db.session.execute(
+            select(User.email).where(User.email.in_(emails))
+        ).scalars())
+        kept, errors = [], []
+        for row_number, record in batch:
+            if record['email'] in registered:
+                errors.append(self.error(row_number, record['email'], 'Email already registered'))
+            else:
+                kept.append((row_number, record))
+        return kept, errors
+
+    def flush(self, batch, retry=True):
+        batch, errors = self._drop_registered(batch)
+        yield from errors
+
+        missing = [i for i, (_, record) in enumerate(batch) if not record.get('password')]
+        if missing and not self.invite:
+            for i in missing:
+                yield self.error(batch[i][0], batch[i][1]['email'], 'Missing required field: password')
+            batch = [entry for entry in batch if entry[1].get('password')]
+        if not batch:
+            yield self.progress()
+            return
+
+        with_password = [record['password'] for _, record in batch if record.get('password')]
+        hashes = iter(hash_passwords(with_password))
+        invites = []
+        user_rows = []
+        for row_number, record in batch:
+            row = {
+                'user_id': str(uuid.uuid4()),
+                'name': record['name'].strip(),
+                'email': record['email'],
+                'phone_number': record.get('phone_number'),
+                'role': record['role'],
+                'invite_token_hash': None
+            }
+            if record.get('password'):
+                row['password_hash'] = next(hashes)
+            else:
+                token = secrets.token_urlsafe(32)
+                row['password_hash'] = INVITE_PLACEHOLDER
+                row['invite_token_hash'] = hash_invite_token(token)
+                invites.append({'type': 'invite', 'row': row_number, 'email': record['email'], 'invite_token': token})
+            user_rows.append(row)
+
+        try:
+            self._insert(batch, user_rows)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            if retry:
+                # Someone registered one of these emails since the dedup SELECT
+                yield from self.flush(batch, retry=False)
+                return
+            for row_number, record in batch:
+                yield self.error(row_number, record['email'], 'Could not insert row')
+            yield self.progress()
+            return
+
+        self.created += len(batch)
+        self.invited += len(invites)
+        yield from invites
+        yield self.progress()
+
+    def _insert(self, batch, user_rows):
+        users = User.__table__
+        ids = db.session.execute(
+            insert(users).returning(users.c.id, sort_by_parameter_order=True), user_rows
+        ).scalars().all()
+
+        students, mentors = [], []
+        for user_id, (_, record) in zip(ids, batch):
+            if record['role'] == 'student':
+                students.append({'user_id': user_id, **{f: record.get(f) for f in STUDENT_FIELDS}})
+            else:
+                mentors.append({
+                    'user_id': user_id, 'verification_status': 'pending',
+                    **{f: record.get(f) for f in MENTOR_FIELDS}
+                })
+        if students:
+            db.session.execute(insert(Student.__table__), students)
+        if mentors:
+            mentor_table = Mentor.__table__
+            mentor_ids = db.session.execute(
+                insert(mentor_table).returning(mentor_table.c.id, sort_by_parameter_order=True), mentors
+            ).scalars().all()
+            names = {user_id: record['name'].strip() for user_id, (_, record) in zip(ids, batch)}
+            index_new_mentors([
+                {'rowid': mentor_id, 'name': names[row['user_id']], **row}
+                for mentor_id, row in zip(mentor_ids, mentors)
+            ])
+
+        adjust_counters(db.session.connection(), {
+            counter_name('users'): len(user_rows),
+            counter_name('users', 'student'): len(students),
+            counter_name('users', 'mentor'): len(mentors),
+            counter_name('mentors'): len(mentors),
+            counter_name('mentors', 'pending'): len(mentors),
+        })
+
+
+def import_users(records, batch_size=DEFAULT_BATCH_SIZE, invite=True):
+    """Import ``(row_number, record, error)`` tuples from ``read_records``,
+    yielding report entries. With ``invite=False`` rows need a password."""
+    return _Importer(batch_size, invite).run(records)
+
+
+@click.command('import-users')
+@click.argument('path', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Defaults to the file extension.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True)
+@click.option('--invite/--no-invite', default=True, show_default=True,
+              help='Issue invite tokens to rows without a password.')
+@with_appcontext
+def import_users_command(path, fmt, batch_size, invite):
+    """Import users from a CSV or NDJSON file (- for stdin).
+
+    Errors and invite tokens are written to stdout as NDJSON; progress goes
+    to stderr.
+    """
+    fmt = fmt or detect_format(path.name)
+    for entry in import_users(read_records(path, fmt), min(batch_size, MAX_BATCH_SIZE), invite):
+        if entry['type'] in ('progress', 'summary'):
+            click.echo(
+                f"{entry['processed']} rows, {entry['created']} created, {entry['failed']} failed "
+                f"({entry['rows_per_second']} rows/s)", err=True
+            )
+        if entry['type'] != 'progress':
+            click.echo(json.dumps(entry))
@@ -5,9 +5,65 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///careerconnect.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Connection pool for server databases (Postgres, MySQL): connections kept
+    # open, extra connections allowed under load, seconds to wait for one,
+    # seconds before a connection is replaced, and a liveness check on checkout
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['true', 'on', '1']
+    
+    # SQLite: WAL lets reads run alongside a write; NORMAL sync is durable in
+    # WAL mode except on power loss; writers wait up to the busy timeout (ms)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 5000)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
+    # Password hashing: werkzeug method string, size of the hashing process
+    # pool (0 hashes in the request thread) and seconds to wait for a slot
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT') or 10)
+    
+    # Server-sent events: 'memory' (single process), 'database' (shared across
+    # gunicorn workers; gunicorn.conf.py picks it for more than one worker)
+    # or a 'module:Class' path to a custom broker
+    EVENT_BROKER = os.environ.get('EVENT_BROKER') or 'memory'
+    EVENT_STREAM_TIMEOUT = int(os.environ.get('EVENT_STREAM_TIMEOUT') or 300)
+    EVENT_HEARTBEAT_INTERVAL = int(os.environ.get('EVENT_HEARTBEAT_INTERVAL') or 15)
+    EVENT_RETENTION_SECONDS = int(os.environ.get('EVENT_RETENTION_SECONDS') or 3600)
+    # Database broker: deliver events only once they are this old (ms), so
+    # ids committed out of order are not skipped; unset means 0 on SQLite,
+    # where commits are serialized, and 500 elsewhere
+    EVENT_VISIBILITY_LAG_MS = (
+        int(os.environ['EVENT_VISIBILITY_LAG_MS']) if os.environ.get('EVENT_VISIBILITY_LAG_MS') else None
+    )
+    
+    # Per-process cache of serialized mentor search responses
+    SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE') or 256)
+    SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL') or 60)
+    
+    # Per-process TF-IDF mentor recommendation index: changes applied
+    # incrementally before a full rebuild, and the maximum index age
+    RECOMMENDER_MAX_PENDING = int(os.environ.get('RECOMMENDER_MAX_PENDING') or 1000)
+    RECOMMENDER_REFRESH_SECONDS = int(os.environ.get('RECOMMENDER_REFRESH_SECONDS') or 300)
+    
+    # Prometheus metrics at /api/admin/metrics; scrapers authenticate with
+    # 'Authorization: Bearer <METRICS_TOKEN>', people with an admin JWT
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Log statements slower than SLOW_QUERY_MS, and requests repeating one
+    # statement shape more than N_PLUS_ONE_THRESHOLD times (0 disables
+    # either); strict mode raises instead so tests fail on N+1 queries
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS') or 250)
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD') or 10)
+    N_PLUS_ONE_STRICT = os.environ.get('N_PLUS_ONE_STRICT', 'false').lower() in ['true', 'on', '1']
+    
     # Mail settings
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -0,0 +1,136 @@
+"""Incrementally maintained row counters for the admin dashboard.
+
+Totals and per-role/per-status breakdowns are kept in the ``stat_counters``
+table. A session ``after_flush`` hook adjusts them inside the same
+transaction as the rows being inserted, updated or deleted, so the dashboard
+can read every statistic with one SELECT. ``recompute_counters`` rebuilds
+the table from scratch to repair any drift.
+"""
+from sqlalchemy import event, func, inspect, insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm.base import NO_VALUE
+from models import db, User, Mentor, Session, Message, MentorshipRequest, StatCounter
+
+# model -> (counter prefix, attribute broken down by value or None)
+TRACKED_MODELS = {
+    User: ('users', 'role'),
+    Mentor: ('mentors', 'verification_status'),
+    Session: ('sessions', 'status'),
+    Message: ('messages', None),
+    MentorshipRequest: ('mentorship_requests', 'status'),
+}
+
+
+def counter_name(prefix, value=None):
+    return prefix if value is None else f'{prefix}:{value}'
+
+
+def _add(deltas, name, delta):
+    deltas[name] = deltas.get(name, 0) + delta
+
+
+def _current_value(obj, attr):
+    value = inspect(obj).attrs[attr].loaded_value
+    return None if value is NO_VALUE else value
+
+
+def _after_flush(session, flush_context):
+    deltas = {}
+    for obj in session.new:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked:
+            prefix, attr = tracked
+            _add(deltas, prefix, 1)
+            if attr and _current_value(obj, attr) is not None:
+                _add(deltas, counter_name(prefix, _current_value(obj, attr)), 1)
+    for obj in session.deleted:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked:
+            prefix, attr = tracked
+            _add(deltas, prefix, -1)
+            if attr:
+                history = inspect(obj).attrs[attr].history
+                old = history.deleted[0] if history.deleted else _current_value(obj, attr)
+                if old is not None:
+                    _add(deltas, counter_name(prefix, old), -1)
+    for obj in session.dirty:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked and tracked[1]:
+            prefix, attr = tracked
+            history = inspect(obj).attrs[attr].history
+            if history.deleted or history.added:
+                for old in history.deleted:
+                    if old is not None:
+                        _add(deltas, counter_name(prefix, old), -1)
+                for new in history.added:
+                    if new is not None:
+                        _add(deltas, counter_name(prefix, new), 1)
+
+    adjust_counters(session.connection(), deltas)
+
+
+def adjust_counters(connection, deltas):
+    """Apply ``{counter name: delta}`` in the connection's transaction.
+
+    Writes that bypass the ORM unit of work (bulk inserts) call this
+    directly; everything else goes through the after_flush hook.
+    """
+    rows = [{'name': name, 'value': delta} for name, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    # One upsert: a counter's first two writers cannot both insert it, and
+    # rows are locked in name order so concurrent flushes do not deadlock
+    table = StatCounter.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        stmt = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name], set_={'value': table.c.value + stmt.excluded.value}
+        )
+    elif dialect in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(value=table.c.value + stmt.inserted.value)
+    else:
+        # No portable upsert; ensure_counters has created the common rows
+        for row in rows:
+            result = connection.execute(
+                update(table).where(table.c.name == row['name']).values(value=table.c.value + row['value'])
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(table).values(row))
+        return
+    connection.execute(stmt)
+
+
+def init_counters():
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+
+def recompute_counters():
+    """Rebuild every counter with grouped COUNT queries; caller commits."""
+    values = {}
+    for model, (prefix, attr) in TRACKED_MODELS.items():
+        values[counter_name(prefix)] = db.session.query(func.count(model.id)).scalar()
+        if attr:
+            column = getattr(model, attr)
+            rows = db.session.query(column, func.count(model.id)).group_by(column).all()
+            for value, count in rows:
+                if value is not None:
+                    values[counter_name(prefix, value)] = count
+    db.session.execute(StatCounter.__table__.delete())
+    db.session.execute(
+        insert(StatCounter.__table__), [{'name': n, 'value': v} for n, v in sorted(values.items())]
+    )
+    return values
+
+
+def ensure_counters():
+    # Seed the table on first run against an existing database
+    if db.session.query(StatCounter.name).first() is None:
+        recompute_counters()
+        db.session.commit()
+
+
+def read_counters():
+    return dict(db.session.query(StatCounter.name, StatCounter.value).all())
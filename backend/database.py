@@ -0,0 +1,94 @@
+"""Database engine configuration.
+
+Engine options come from the environment (see ``Config``):
+
+- SQLite files run in WAL mode, so readers never block the writer, with a
+  busy timeout so concurrent writers from several gunicorn workers wait for
+  the lock instead of failing with "database is locked".
+- Server databases get a sized connection pool with pre-ping and recycling,
+  so connections dropped by the server or a proxy are replaced transparently.
+
+Connections must not be shared across ``fork()``. ``create_app`` itself does
+not connect, but anything that runs in a preloading master before the fork
+may; each child drops the inherited pool (without closing the parent's
+sockets) and opens its own.
+"""
+import os
+import weakref
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from models import db
+
+JOURNAL_MODES = ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'OFF')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+_engines = weakref.WeakSet()
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(config):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for the configured database."""
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        # pysqlite's own busy handler; the pragma below covers raw connections
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args.setdefault('timeout', config['SQLITE_BUSY_TIMEOUT'] / 1000)
+        options['connect_args'] = connect_args
+        return options
+    options.setdefault('pool_size', config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+    options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+    return options
+
+
+def _choice(config, name, choices):
+    value = config[name].upper()
+    if value not in choices:
+        raise ValueError(f'{name} must be one of: {", ".join(choices)}')
+    return value
+
+
+def _sqlite_pragmas(config):
+    return [
+        # Persistent in the database file; in-memory databases ignore it
+        f'PRAGMA journal_mode = {_choice(config, "SQLITE_JOURNAL_MODE", JOURNAL_MODES)}',
+        f'PRAGMA synchronous = {_choice(config, "SQLITE_SYNCHRONOUS", SYNCHRONOUS_MODES)}',
+        f'PRAGMA busy_timeout = {int(config["SQLITE_BUSY_TIMEOUT"])}',
+    ]
+
+
+def _listen_sqlite(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _dispose_after_fork():
+    for engine in list(_engines):
+        # close=False: the sockets still belong to the parent's pool
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def init_database(app):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    db.init_app(app)
+    with app.app_context():
+        engine = db.engine
+    if is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        _listen_sqlite(engine, _sqlite_pragmas(app.config))
+    _engines.add(engine)
+
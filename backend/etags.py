@@ -0,0 +1,40 @@
+"""Strong ETags for profile reads.
+
+ETags are derived from the ``version`` counters bumped on every
+UPDATE of ``User``, ``Student`` and ``Mentor``, so a matching
+``If-None-Match`` can be answered with 304 before anything is serialized.
+"""
+import hashlib
+from flask import jsonify, make_response, request
+
+
+def compute_etag(*parts):
+    return hashlib.sha1('/'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def profile_etag(user, profile):
+    return compute_etag(
+        'user', user.id, user.version,
+        profile.id if profile else None, profile.version if profile else None
+    )
+
+
+def etag_matches(etag):
+    # Weak comparison (RFC 9110 13.1.2): a W/ prefix added on the way, e.g.
+    # by a compressing proxy, still matches, and so does "*"
+    return request.if_none_match.contains_weak(etag)
+
+
+def _cache_headers(response, etag):
+    response.set_etag(etag)
+    # Always revalidate; the response is per-user
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag):
+    return _cache_headers(make_response('', 304), etag)
+
+
+def etag_response(body, etag, status=200):
+    return _cache_headers(make_response(jsonify(body), status), etag)
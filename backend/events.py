@@ -0,0 +1,146 @@
+"""Event brokers behind the server-sent events stream.
+
+Routes publish small deltas (a new message, a session or mentorship request
+change) to per-user channels after their transaction commits; the stream
+endpoint reads them back in id order so clients can resume from the
+``Last-Event-ID`` they last saw.
+
+``MemoryBroker`` only reaches streams served by the same process. Set
+``EVENT_BROKER = 'database'`` to share events between gunicorn workers
+through the ``stream_events`` table, or point it at a ``module:Class`` that
+implements ``publish`` and ``read``.
+"""
+import importlib
+import json
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from models import db, StreamEvent
+
+Event = namedtuple('Event', ['id', 'channel', 'event_type', 'data'])
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class MemoryBroker:
+    """In-process broker keeping the most recent events in a ring buffer."""
+
+    def __init__(self, app=None, history=1000):
+        self._events = deque(maxlen=history)
+        self._condition = threading.Condition()
+        self._last_id = 0
+
+    def publish(self, channel, event_type, data):
+        with self._condition:
+            self._last_id += 1
+            self._events.append(Event(self._last_id, channel, event_type, data))
+            self._condition.notify_all()
+            return self._last_id
+
+    def _pending(self, channels, last_id):
+        return [e for e in self._events if e.id > last_id and e.channel in channels]
+
+    def read(self, channels, last_id, timeout):
+        with self._condition:
+            if last_id > self._last_id:
+                # Ids restart with the process; a stale client id replays nothing
+                last_id = self._last_id
+            events = self._pending(channels, last_id)
+            if not events:
+                self._condition.wait(timeout)
+                events = self._pending(channels, last_id)
+            return events
+
+
+class DatabaseBroker:
+    """Broker backed by the stream_events table, shared by all workers.
+
+    Readers resume from the highest id they have seen, which is only safe if
+    ids become visible in order. On SQLite they do (writers are serialized);
+    on Postgres an id is taken at insert but seen at commit, so a lower id
+    can appear after a higher one was read. Events are therefore delivered
+    only once they are ``EVENT_VISIBILITY_LAG_MS`` old, by which time every
+    publish that took an earlier id has committed: each publish is a single
+    INSERT in its own short transaction.
+    """
+
+    def __init__(self, app=None, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        config = app.config if app else {}
+        self.retention = timedelta(seconds=config.get('EVENT_RETENTION_SECONDS', 3600))
+        lag = config.get('EVENT_VISIBILITY_LAG_MS')
+        if lag is None:
+            lag = 0 if config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite') else 500
+        self.visibility_lag = timedelta(milliseconds=lag)
+        self._publishes = 0
+
+    def publish(self, channel, event_type, data):
+        table = StreamEvent.__table__
+        with db.engine.begin() as connection:
+            result = connection.execute(insert(table).values(
+                channel=channel, event_type=event_type,
+                data=json.dumps(data), created_at=datetime.utcnow()
+            ))
+        self._publishes += 1
+        if self._publishes % 100 == 0:
+            # Separately, so the insert's transaction stays short (see above)
+            with db.engine.begin() as connection:
+                connection.execute(delete(table).where(
+                    table.c.created_at < datetime.utcnow() - self.retention
+                ))
+        return result.inserted_primary_key[0]
+
+    def read(self, channels, last_id, timeout):
+        table = StreamEvent.__table__
+        query = select(table.c.id, table.c.channel, table.c.event_type, table.c.data).where(
+            table.c.channel.in_(list(channels)), table.c.id > last_id
+        ).order_by(table.c.id).limit(100)
+        deadline = time.monotonic() + timeout
+        while True:
+            visible = query
+            if self.visibility_lag:
+                visible = query.where(table.c.created_at <= datetime.utcnow() - self.visibility_lag)
+            with db.engine.connect() as connection:
+                rows = connection.execute(visible).all()
+            if rows or time.monotonic() >= deadline:
+                return [Event(r.id, r.channel, r.event_type, json.loads(r.data)) for r in rows]
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+
+
+BROKERS = {
+    'memory': MemoryBroker,
+    'database': DatabaseBroker,
+}
+
+
+def init_events(app):
+    name = app.config.get('EVENT_BROKER', 'memory')
+    if name in BROKERS:
+        broker_class = BROKERS[name]
+    else:
+        module_name, _, class_name = name.partition(':')
+        broker_class = getattr(importlib.import_module(module_name), class_name)
+    app.extensions['event_broker'] = broker_class(app)
+
+
+def get_broker():
+    return current_app.extensions['event_broker']
+
+
+def publish_event(user_ids, event_type, data):
+    # Called after commit; a broker failure must not fail the request
+    try:
+        broker = get_broker()
+        for user_id in set(user_ids):
+            broker.publish(user_channel(user_id), event_type, data)
+    except Exception:
+        current_app.logger.exception('Failed to publish %s event', event_type)
+
+
+def format_event(event):
+    return f'id: {event.id}\nevent: {event.event_type}\ndata: {json.dumps(event.data)}\n\n'
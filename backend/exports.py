@@ -0,0 +1,162 @@
+"""Streaming CSV/NDJSON exports for admin reports.
+
+Each export is a single Core SELECT with the student and mentor names joined
+in, ordered by primary key. Rows are read through a server-side cursor
+(``stream_results``) and encoded a chunk at a time, so memory stays flat no
+matter how many rows match.
+"""
+import csv
+import io
+import json
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+from models import db, User, Student, Mentor, Session, Message, MentorshipRequest
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 1000
+
+
+class ExportError(ValueError):
+    pass
+
+
+# build() -> select ordered by id; filters apply to date_column/status_column.
+# status_values maps accepted ?status= values to stored ones (None: as given)
+Export = namedtuple('Export', ['build', 'date_column', 'status_column', 'status_values'])
+
+
+def _with_names(stmt, student_fk, mentor_fk):
+    student_users = User.__table__.alias('student_users')
+    mentor_users = User.__table__.alias('mentor_users')
+    students, mentors = Student.__table__, Mentor.__table__
+    return stmt.add_columns(
+        student_users.c.name.label('student_name'),
+        mentor_users.c.name.label('mentor_name')
+    ).outerjoin(students, students.c.id == student_fk) \
+        .outerjoin(student_users, student_users.c.id == students.c.user_id) \
+        .outerjoin(mentors, mentors.c.id == mentor_fk) \
+        .outerjoin(mentor_users, mentor_users.c.id == mentors.c.user_id)
+
+
+def _sessions():
+    t = Session.__table__
+    stmt = select(t.c.id, t.c.session_id, t.c.student_id, t.c.mentor_id).select_from(t)
+    stmt = _with_names(stmt, t.c.student_id, t.c.mentor_id)
+    return stmt.add_columns(
+        t.c.date_time, t.c.end_time, t.c.status, t.c.notes, t.c.created_at
+    ).order_by(t.c.id)
+
+
+def _users():
+    t = User.__table__
+    return select(
+        t.c.id, t.c.user_id, t.c.name, t.c.email, t.c.phone_number, t.c.role, t.c.created_at
+    ).order_by(t.c.id)
+
+
+def _messages():
+    # Metadata only; message bodies stay out of reports
+    t = Message.__table__
+    stmt = select(t.c.id, t.c.message_id, t.c.sender_id, t.c.receiver_id).select_from(t)
+    stmt = _with_names(stmt, t.c.sender_id, t.c.receiver_id)
+    return stmt.add_columns(
+        t.c.timestamp, t.c.read, func.length(t.c.content).label('content_length')
+    ).order_by(t.c.id)
+
+
+def _mentorship_requests():
+    t = MentorshipRequest.__table__
+    stmt = select(t.c.id, t.c.student_id, t.c.mentor_id).select_from(t)
+    stmt = _with_names(stmt, t.c.student_id, t.c.mentor_id)
+    return stmt.add_columns(t.c.status, t.c.created_at, t.c.updated_at).order_by(t.c.id)
+
+
+EXPORTS = {
+    'sessions': Export(_sessions, Session.__table__.c.date_time, Session.__table__.c.status, None),
+    'users': Export(_users, User.__table__.c.created_at, User.__table__.c.role, None),
+    'messages': Export(
+        _messages, Message.__table__.c.timestamp, Message.__table__.c.read, {'read': True, 'unread': False}
+    ),
+    'mentorship_requests': Export(
+        _mentorship_requests, MentorshipRequest.__table__.c.created_at,
+        MentorshipRequest.__table__.c.status, None
+    ),
+}
+
+
+def _parse_bound(value, name, end=False):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f'{name} must be an ISO date or datetime')
+    if end and len(value) == 10:
+        # A bare end date includes that whole day
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def build_export(name, start=None, end=None, status=None):
+    """Return the filtered SELECT for export ``name``.
+
+    ``start`` is inclusive, ``end`` exclusive (a bare date covers the day);
+    ``status`` is a comma-separated list.
+    """
+    export = EXPORTS.get(name)
+    if export is None:
+        raise ExportError(f'Unknown export: {name}. Available: {", ".join(EXPORTS)}')
+    stmt = export.build()
+    if start:
+        stmt = stmt.where(export.date_column >= _parse_bound(start, 'start'))
+    if end:
+        stmt = stmt.where(export.date_column < _parse_bound(end, 'end', end=True))
+    if status:
+        values = [v.strip() for v in status.split(',') if v.strip()]
+        if export.status_values is not None:
+            unknown = [v for v in values if v not in export.status_values]
+            if unknown:
+                raise ExportError(f'status must be one of: {", ".join(export.status_values)}')
+            values = [export.status_values[v] for v in values]
+        stmt = stmt.where(export.status_column.in_(values))
+    return stmt
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(columns, rows, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(['' if v is None else _plain(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(columns, rows, header):
+    return ''.join(
+        json.dumps({c: _plain(v) for c, v in zip(columns, row)}) + '\n' for row in rows
+    )
+
+
+def stream_export(stmt, fmt, chunk_size=CHUNK_SIZE):
+    """Yield encoded chunks of ``stmt``'s rows in ``fmt``."""
+    if fmt not in FORMATS:
+        raise ExportError(f'format must be one of: {", ".join(FORMATS)}')
+    encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+    columns = [c.name for c in stmt.selected_columns]
+    # Own connection: the cursor lives exactly as long as this generator
+    with db.engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(stmt)
+        header = True
+        for rows in result.partitions(chunk_size):
+            yield encode(columns, rows, header)
+            header = False
+        if header and fmt == 'csv':
+            yield encode(columns, [], header)
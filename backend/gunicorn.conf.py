@@ -0,0 +1,25 @@
+"""Gunicorn settings, read automatically when gunicorn starts in this directory.
+
+An open event stream (``/api/communications/stream``) occupies whatever
+serves it for up to ``EVENT_STREAM_TIMEOUT`` seconds, so workers are
+threaded: a sync worker would be tied up entirely by one browser tab. Size
+``GUNICORN_THREADS`` for the open streams plus concurrent API requests you
+expect per worker. Streams hold no database connection, so only the API
+requests count against the ``DB_POOL_SIZE + DB_MAX_OVERFLOW`` pool. With
+``EVENT_BROKER = 'database'`` streams can instead be served by a separate
+gunicorn instance behind the proxy.
+
+The in-memory event broker only reaches streams in the worker that published
+the event, so with more than one worker ``EVENT_BROKER`` defaults to
+``'database'`` instead.
+"""
+import os
+
+workers = int(os.environ.get('WEB_CONCURRENCY') or 2)
+if workers > 1:
+    # Read by Config when the app is imported, which happens after this file
+    os.environ.setdefault('EVENT_BROKER', 'database')
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or 32)
+# Import the app once in the master; create_app does not touch the database
+preload_app = True
@@ -0,0 +1,166 @@
+"""Partial updates of JSON columns with JSON-Pointer style operations.
+
+Operations follow a subset of RFC 6902::
+
+    {"op": "replace", "path": "/milestones/2/completed", "value": true}
+    {"op": "add", "path": "/goals/-", "value": {"text": "...", "completed": false}}
+    {"op": "add", "path": "/milestones/0/note", "value": "..."}
+    {"op": "remove", "path": "/goals/1"}
+
+The first path segment names the column. ``add`` appends to arrays (``-``)
+or sets an object key; inserting at an array index is not supported, so an
+``add`` whose path ends in a number is rejected rather than applied as a
+``replace``.
+``replace`` and ``remove`` ignore paths that do not exist.
+
+On SQLite the operations compile to nested ``json_set``/``json_replace``/
+``json_insert``/``json_remove`` calls, and on PostgreSQL to ``jsonb_set``/
+``jsonb_insert``/``#-``, so the row is patched inside a single UPDATE; other
+backends apply them to the loaded value. A column holding SQL NULL or JSON
+``null`` (how the ORM stores ``None``) is patched as an empty array.
+"""
+import copy
+import json
+from sqlalchemy import ARRAY, Text, case, func, literal
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+OPS = ('add', 'replace', 'remove')
+
+
+def parse_operations(operations, columns):
+    """Validate ``operations`` and return ``(column, op, tokens, value)`` tuples."""
+    if not isinstance(operations, list) or not operations:
+        raise JsonPatchError('operations must be a non-empty list')
+    parsed = []
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get('op') not in OPS:
+            raise JsonPatchError(f'op must be one of: {", ".join(OPS)}')
+        path = operation.get('path')
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise JsonPatchError('path must be a JSON pointer such as /goals/0')
+        column, *tokens = [t.replace('~1', '/').replace('~0', '~') for t in path[1:].split('/')]
+        if column not in columns:
+            raise JsonPatchError(f'path must start with one of: {", ".join(columns)}')
+        op = operation['op']
+        if op != 'remove' and 'value' not in operation:
+            raise JsonPatchError(f'{op} requires a value')
+        if '-' in tokens[:-1] or (tokens and tokens[-1] == '-' and op != 'add'):
+            raise JsonPatchError("'-' may only end the path of an add")
+        if not tokens and op != 'replace':
+            raise JsonPatchError(f'{op} needs a path inside the column')
+        if op == 'add' and _is_index(tokens[-1]):
+            raise JsonPatchError("add cannot insert at an array index; append with '-' or use replace")
+        parsed.append((column, op, tokens, operation.get('value')))
+    return parsed
+
+
+def _is_index(token):
+    return token.isdigit()
+
+
+def _sqlite_path(tokens):
+    path = '$'
+    for token in tokens:
+        if token == '-':
+            path += '[#]'
+        elif _is_index(token):
+            path += f'[{token}]'
+        else:
+            path += '."%s"' % token.replace('"', '\\"')
+    return path
+
+
+def sqlite_update_values(model, operations):
+    """Map column -> SQL expression applying the operations in order, for
+    ``Query.update``."""
+    values = {}
+    for column, op, tokens, value in operations:
+        attribute = getattr(model, column)
+        if attribute not in values:
+            values[attribute] = case(
+                (func.coalesce(func.json_type(attribute), 'null') == 'null', '[]'),
+                else_=attribute
+            )
+        expression = values[attribute]
+        path = _sqlite_path(tokens)
+        if op == 'remove':
+            expression = func.json_remove(expression, path)
+        else:
+            json_value = func.json(json.dumps(value))
+            if op == 'replace':
+                expression = func.json_replace(expression, path, json_value)
+            elif tokens[-1] == '-':
+                expression = func.json_insert(expression, path, json_value)
+            else:
+                expression = func.json_set(expression, path, json_value)
+        values[attribute] = expression
+    return values
+
+
+def postgresql_update_values(model, operations):
+    """The ``sqlite_update_values`` counterpart for JSONB columns."""
+    values = {}
+    for column, op, tokens, value in operations:
+        attribute = getattr(model, column)
+        if attribute not in values:
+            values[attribute] = case(
+                (func.coalesce(func.jsonb_typeof(attribute), 'null') == 'null', literal([], JSONB)),
+                else_=attribute
+            )
+        expression = values[attribute]
+        if op != 'remove':
+            json_value = literal(value, JSONB)
+        if not tokens:
+            values[attribute] = json_value
+            continue
+        # '-' becomes the last element, with the value inserted after it
+        path = literal([('-1' if token == '-' else token) for token in tokens], ARRAY(Text))
+        if op == 'remove':
+            expression = expression.op('#-', return_type=JSONB)(path)
+        elif tokens[-1] == '-':
+            expression = func.jsonb_insert(expression, path, json_value, True, type_=JSONB)
+        else:
+            # replace leaves missing paths alone; add creates the object key
+            expression = func.jsonb_set(expression, path, json_value, op == 'add', type_=JSONB)
+        values[attribute] = expression
+    return values
+
+
+def _apply(document, op, tokens, value):
+    if not tokens:
+        return copy.deepcopy(value)
+    parent = document
+    for token in tokens[:-1]:
+        try:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return document
+    last = tokens[-1]
+    if isinstance(parent, list):
+        if last == '-':
+            parent.append(copy.deepcopy(value))
+        elif _is_index(last) and int(last) < len(parent):
+            if op == 'remove':
+                del parent[int(last)]
+            else:
+                parent[int(last)] = copy.deepcopy(value)
+    elif isinstance(parent, dict):
+        if op == 'remove':
+            parent.pop(last, None)
+        elif op == 'add' or last in parent:
+            parent[last] = copy.deepcopy(value)
+    return document
+
+
+def apply_operations(target, operations):
+    """Apply the operations to ``target``'s attributes in Python."""
+    for column, op, tokens, value in operations:
+        document = copy.deepcopy(getattr(target, column))
+        if document is None:
+            document = []
+        setattr(target, column, _apply(document, op, tokens, value))
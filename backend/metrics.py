@@ -0,0 +1,128 @@
+"""Request metrics in Prometheus text format.
+
+Every request records, labelled by Flask endpoint (``blueprint.view``):
+response latency, responses by status, SQL statements per request and time
+spent executing SQL. The time each engine takes to hand out a connection
+(pool checkout wait, plus connecting when the pool opens a new one) is
+recorded too.
+
+Under gunicorn, point ``PROMETHEUS_MULTIPROC_DIR`` at an empty directory,
+cleared on every deploy, before the app is imported. Each worker then writes
+its samples to memory-mapped files there, and a scrape served by any worker
+reports the totals of all of them.
+
+Scrape ``GET /api/admin/metrics`` with an admin JWT, or with
+``Authorization: Bearer <METRICS_TOKEN>`` from Prometheus.
+"""
+import hmac
+import os
+import time
+from flask import current_app, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from models import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_SECONDS = Histogram(
+    'careerconnect_request_duration_seconds',
+    'Time to produce a response; streamed bodies are not included',
+    ['endpoint', 'method'], buckets=LATENCY_BUCKETS
+)
+RESPONSES = Counter(
+    'careerconnect_responses', 'Responses by status code', ['endpoint', 'method', 'status']
+)
+REQUEST_STATEMENTS = Histogram(
+    'careerconnect_request_sql_statements', 'SQL statements executed per request',
+    ['endpoint'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+SQL_SECONDS = Counter(
+    'careerconnect_sql_seconds', 'Time spent executing SQL while serving requests', ['endpoint']
+)
+POOL_CHECKOUT_SECONDS = Histogram(
+    'careerconnect_db_pool_checkout_seconds', 'Time to obtain a database connection from the pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_statements = 0
+    g.metrics_sql_seconds = 0.0
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    endpoint = _endpoint()
+    REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - started)
+    RESPONSES.labels(endpoint, request.method, str(response.status_code)).inc()
+    REQUEST_STATEMENTS.labels(endpoint).observe(g.metrics_statements)
+    if g.metrics_sql_seconds:
+        SQL_SECONDS.labels(endpoint).inc(g.metrics_sql_seconds)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'metrics_started', None)
+    if started is None or not has_request_context() or 'metrics_started' not in g:
+        return
+    g.metrics_statements += 1
+    g.metrics_sql_seconds += time.perf_counter() - started
+
+
+def _time_checkouts(engine):
+    # The pool has no event before a checkout starts, so time the call the
+    # engine makes for every new Connection instead
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+    engine.raw_connection = timed_raw_connection
+
+
+def init_metrics(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    _time_checkouts(engine)
+
+
+def scrape_token_matches(header):
+    token = current_app.config['METRICS_TOKEN']
+    if not token or not header or not header.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(header[len('Bearer '):].encode(), token.encode())
+
+
+def render_metrics():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Aggregate the files written by every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,267 @@
+"""Schema migrations for existing databases.
+
+``db.create_all()`` creates missing tables but never alters tables that
+already exist. Each function registered with ``@migration`` runs once, in
+order, inside its own transaction, and is recorded in ``schema_migrations``.
+
+``create_app`` does not touch the database, so workers start without a round
+trip. Run ``flask --app wsgi init-db`` once per deploy, before the workers
+start, to create tables, apply migrations and seed first-run data.
+"""
+from datetime import datetime
+import json
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from models import db, SchemaMigration, User
+from scoring import public_questionnaire
+
+DEFAULT_ADMIN_EMAIL = 'admin@careerconnect.com'
+DEFAULT_ADMIN_PASSWORD = 'admin123'
+
+MIGRATIONS = []
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def migration(fn):
+    MIGRATIONS.append(fn)
+    return fn
+
+
+def create_missing_indexes(connection):
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            # Indexes on columns a later migration adds are created by it
+            if all(c.name in existing for c in index.columns):
+                index.create(connection, checkfirst=True)
+
+
+def add_column_if_missing(connection, table, column, ddl):
+    columns = {c['name'] for c in inspect(connection).get_columns(table)}
+    if column not in columns:
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+@migration
+def add_hot_path_indexes(connection):
+    # Foreign-key, status/role and (owner, sort key) indexes from models.py
+    create_missing_indexes(connection)
+
+
+@migration
+def add_row_versions(connection):
+    for table in ('users', 'students', 'mentors'):
+        add_column_if_missing(connection, table, 'version', 'INTEGER NOT NULL DEFAULT 1')
+
+
+@migration
+def add_unread_message_indexes(connection):
+    create_missing_indexes(connection)
+
+
+@migration
+def add_conversation_index(connection):
+    create_missing_indexes(connection)
+
+
+JSON_COLUMNS = {
+    'career_assessments': ('questionnaire', 'results', 'recommendations'),
+    'progress_trackers': ('goals', 'milestones'),
+}
+
+
+def _invalid_json_rows(connection, table, column):
+    rows = connection.execute(text(f'SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL'))
+    invalid = []
+    for row_id, value in rows:
+        if not isinstance(value, str):
+            # Already a JSON type (a new Postgres database), decoded by the driver
+            continue
+        try:
+            json.loads(value)
+        except (TypeError, ValueError):
+            invalid.append(row_id)
+    return invalid
+
+
+@migration
+def convert_json_columns(connection):
+    # Rows already hold json.dumps text. SQLite reads that as JSON as-is;
+    # Postgres needs the columns retyped so they can be patched in place.
+    # Either way a value that is not JSON would break patches (or the cast),
+    # and it is data we cannot repair here: stop and name the rows.
+    problems = []
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            invalid = _invalid_json_rows(connection, table, column)
+            if invalid:
+                problems.append(f'{table}.{column} (id {", ".join(map(str, invalid))})')
+    if problems:
+        raise MigrationError(
+            'Values that are not valid JSON in ' + '; '.join(problems) +
+            '. Correct or clear them, then run init-db again.'
+        )
+    if connection.dialect.name == 'postgresql':
+        for table, columns in JSON_COLUMNS.items():
+            for column in columns:
+                connection.execute(text(
+                    f'ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb'
+                ))
+
+
+@migration
+def add_invite_tokens(connection):
+    add_column_if_missing(connection, 'users', 'invite_token_hash', 'VARCHAR(64)')
+    create_missing_indexes(connection)
+
+
+@migration
+def add_session_report_index(connection):
+    create_missing_indexes(connection)
+
+
+@migration
+def add_session_end_times(connection):
+    # Existing sessions get the default length so conflict checks see them
+    add_column_if_missing(connection, 'sessions', 'end_time', 'TIMESTAMP')
+    if connection.dialect.name == 'sqlite':
+        end = "datetime(date_time, '+60 minutes')"
+    else:
+        end = "date_time + INTERVAL '60 minutes'"
+    connection.execute(text(f'UPDATE sessions SET end_time = {end} WHERE end_time IS NULL'))
+    create_missing_indexes(connection)
+
+
+@migration
+def add_assessment_answers(connection):
+    # Clients used to send their answers as 'results'; keep them as the
+    # input to server-side scoring. Run 'flask rescore-assessments' after
+    # upgrading to replace the old results with computed ones.
+    json_type = 'JSONB' if connection.dialect.name == 'postgresql' else 'JSON'
+    add_column_if_missing(connection, 'career_assessments', 'answers', json_type)
+    connection.execute(text('UPDATE career_assessments SET answers = results WHERE answers IS NULL'))
+
+
+@migration
+def page_progress_by_created_at(connection):
+    # updated_at changes on every edit, so it cannot be a stable page key
+    connection.execute(text('DROP INDEX IF EXISTS ix_progress_trackers_student_updated'))
+    create_missing_indexes(connection)
+
+
+# (table, column) pairs list endpoints page on; see pagination.py
+SORT_KEYS = (
+    ('users', 'created_at'),
+    ('career_assessments', 'created_at'),
+    ('progress_trackers', 'created_at'),
+    ('messages', 'timestamp'),
+    ('resources', 'upload_date'),
+    ('mentorship_requests', 'created_at'),
+)
+
+
+@migration
+def require_sort_keys(connection):
+    # Keyset pages compare (sort, id) as a row, which an index serves only if
+    # the sort key is never NULL. Rows without one used to be listed last,
+    # so they get the earliest possible value; SQLite cannot add NOT NULL
+    # to an existing column, every new row gets the model default anyway.
+    for table, column in SORT_KEYS:
+        connection.execute(
+            text(f'UPDATE {table} SET {column} = :earliest WHERE {column} IS NULL'),
+            {'earliest': datetime(1970, 1, 1)}
+        )
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL'))
+
+
+@migration
+def add_questionnaire_versions(connection):
+    # Rows used to carry a copy of the served questionnaire; the questions
+    # live in scoring.py, so keep only the version that was answered
+    add_column_if_missing(connection, 'career_assessments', 'questionnaire_version', 'INTEGER')
+    served = public_questionnaire()
+    rows = connection.execute(text(
+        'SELECT id, questionnaire FROM career_assessments '
+        'WHERE questionnaire IS NOT NULL AND questionnaire_version IS NULL'
+    ))
+    copies = [
+        {'row_id': row_id, 'version': served['version']} for row_id, value in rows
+        if (json.loads(value) if isinstance(value, str) else value) == served
+    ]
+    if copies:
+        connection.execute(text(
+            'UPDATE career_assessments SET questionnaire = NULL, questionnaire_version = :version WHERE id = :row_id'
+        ), copies)
+
+
+def run_migrations():
+    """Apply pending migrations; returns the names applied."""
+    table = SchemaMigration.__table__
+    with db.engine.connect() as connection:
+        applied = set(connection.execute(select(table.c.name)).scalars())
+    newly_applied = []
+    for fn in MIGRATIONS:
+        if fn.__name__ in applied:
+            continue
+        try:
+            with db.engine.begin() as connection:
+                fn(connection)
+                connection.execute(insert(table).values(name=fn.__name__, applied_at=datetime.utcnow()))
+        except IntegrityError:
+            # Another process recorded the same migration first
+            continue
+        newly_applied.append(fn.__name__)
+    return newly_applied
+
+
+def create_default_admin():
+    """Add the default admin account if missing; returns it, or None if it existed."""
+    if db.session.query(User.id).filter_by(email=DEFAULT_ADMIN_EMAIL).first():
+        return None
+    admin = User(
+        user_id='admin-001',
+        name='Admin User',
+        email=DEFAULT_ADMIN_EMAIL,
+        role='admin'
+    )
+    admin.set_password(DEFAULT_ADMIN_PASSWORD)
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+def init_db():
+    """Create missing tables, apply migrations and seed first-run data.
+
+    Safe to run repeatedly. Returns ``(migrations applied, admin created)``.
+    """
+    from search import init_search_index
+    from counters import ensure_counters
+    db.create_all()
+    applied = run_migrations()
+    init_search_index()
+    ensure_counters()
+    admin = create_default_admin()
+    return applied, admin is not None
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create tables, apply migrations and seed the default admin."""
+    try:
+        applied, admin_created = init_db()
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    for name in applied:
+        click.echo(f'Applied migration {name}')
+    if admin_created:
+        click.echo(f'Default admin user created: {DEFAULT_ADMIN_EMAIL} / {DEFAULT_ADMIN_PASSWORD}')
+    click.echo('Database is up to date')
@@ -1,11 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from passwords import hash_password, verify_password
 
 db = SQLAlchemy()
 
+# JSON text on SQLite (queryable with the json1 functions), JSONB on Postgres
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
+
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_created_at', 'role', 'created_at'),
+        db.Index('ix_users_created_at', 'created_at'),
+        db.Index('ix_users_invite_token_hash', 'invite_token_hash', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(50), unique=True, nullable=False)
@@ -14,17 +25,21 @@ class User(db.Model):
     phone_number = db.Column(db.String(20))
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # student, mentor, admin
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Bumped on every UPDATE (see _bump_version); used to build profile ETags
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # SHA-256 of the invite token for bulk-imported users without a password
+    invite_token_hash = db.Column(db.String(64))
     
     # Relationships
     student_profile = db.relationship('Student', backref='user', uselist=False, cascade='all, delete-orphan')
     mentor_profile = db.relationship('Mentor', backref='user', uselist=False, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -39,12 +54,16 @@ class User(db.Model):
 
 class Student(db.Model):
     __tablename__ = 'students'
+    __table_args__ = (
+        db.Index('ix_students_user_id', 'user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     educational_background = db.Column(db.Text)
     career_interests = db.Column(db.Text)
     goals = db.Column(db.Text)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Relationships
     assessments = db.relationship('CareerAssessment', backref='student', cascade='all, delete-orphan')
@@ -63,6 +82,10 @@ class Student(db.Model):
 
 class Mentor(db.Model):
     __tablename__ = 'mentors'
+    __table_args__ = (
+        db.Index('ix_mentors_user_id', 'user_id'),
+        db.Index('ix_mentors_verification_status', 'verification_status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -71,11 +94,13 @@ class Mentor(db.Model):
     verification_status = db.Column(db.String(20), default='pending')  # pending, verified, rejected
     bio = db.Column(db.Text)
     expertise = db.Column(db.Text)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Relationships
     resources = db.relationship('Resource', backref='mentor', cascade='all, delete-orphan')
     received_messages = db.relationship('Message', foreign_keys='Message.receiver_id', backref='receiver', cascade='all, delete-orphan')
     sessions_as_mentor = db.relationship('Session', foreign_keys='Session.mentor_id', backref='mentor', cascade='all, delete-orphan')
+    availability = db.relationship('MentorAvailability', backref='mentor', cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -90,14 +115,22 @@ class Mentor(db.Model):
 
 class CareerAssessment(db.Model):
     __tablename__ = 'career_assessments'
+    __table_args__ = (
+        db.Index('ix_career_assessments_student_created', 'student_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     assessment_id = db.Column(db.String(50), unique=True, nullable=False)
-    questionnaire = db.Column(db.Text)
-    results = db.Column(db.Text)
-    recommendations = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # What older clients sent; newer rows record which version of
+    # scoring.QUESTIONNAIRE was answered instead of a copy of it
+    questionnaire = db.Column(JSONType)
+    questionnaire_version = db.Column(db.Integer)
+    answers = db.Column(JSONType)
+    # Computed from answers by scoring.py
+    results = db.Column(JSONType)
+    recommendations = db.Column(JSONType)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     def to_dict(self):
         return {
@@ -105,6 +138,8 @@ class CareerAssessment(db.Model):
             'student_id': self.student_id,
             'assessment_id': self.assessment_id,
             'questionnaire': self.questionnaire,
+            'questionnaire_version': self.questionnaire_version,
+            'answers': self.answers,
             'results': self.results,
             'recommendations': self.recommendations,
             'created_at': self.created_at.isoformat() if self.created_at else None
@@ -112,14 +147,17 @@ class CareerAssessment(db.Model):
 
 class ProgressTracker(db.Model):
     __tablename__ = 'progress_trackers'
+    __table_args__ = (
+        db.Index('ix_progress_trackers_student_created', 'student_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     tracker_id = db.Column(db.String(50), unique=True, nullable=False)
-    goals = db.Column(db.Text)
-    milestones = db.Column(db.Text)
+    goals = db.Column(JSONType)
+    milestones = db.Column(JSONType)
     mentor_feedback = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
@@ -136,13 +174,22 @@ class ProgressTracker(db.Model):
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        db.Index('ix_messages_receiver_timestamp', 'receiver_id', 'timestamp'),
+        db.Index('ix_messages_sender_timestamp', 'sender_id', 'timestamp'),
+        # Unread summaries read only the unread slice of an inbox
+        db.Index('ix_messages_receiver_read_sender', 'receiver_id', 'read', 'sender_id'),
+        db.Index('ix_messages_sender_read_receiver', 'sender_id', 'read', 'receiver_id'),
+        db.Index('ix_messages_conversation', 'sender_id', 'receiver_id', 'timestamp'),
+        db.Index('ix_messages_receiver_conversation', 'receiver_id', 'sender_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     message_id = db.Column(db.String(50), unique=True, nullable=False)
     sender_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey('mentors.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     read = db.Column(db.Boolean, default=False)
     
     def to_dict(self):
@@ -158,12 +205,19 @@ class Message(db.Model):
 
 class Session(db.Model):
     __tablename__ = 'sessions'
+    __table_args__ = (
+        db.Index('ix_sessions_mentor_date_time', 'mentor_id', 'date_time'),
+        db.Index('ix_sessions_student_date_time', 'student_id', 'date_time'),
+        # Admin session report, newest first across all mentors
+        db.Index('ix_sessions_date_time', 'date_time'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(50), unique=True, nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     mentor_id = db.Column(db.Integer, db.ForeignKey('mentors.id'), nullable=False)
     date_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='pending')  # pending, scheduled, completed, cancelled
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -175,13 +229,39 @@ class Session(db.Model):
             'student_id': self.student_id,
             'mentor_id': self.mentor_id,
             'date_time': self.date_time.isoformat() if self.date_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
             'status': self.status,
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class MentorAvailability(db.Model):
+    __tablename__ = 'mentor_availability'
+    __table_args__ = (
+        db.Index('ix_mentor_availability_mentor_start', 'mentor_id', 'start_time'),
+    )
+    
+    # A window in which the mentor accepts session bookings
+    id = db.Column(db.Integer, primary_key=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('mentors.id'), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mentor_id': self.mentor_id,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class Resource(db.Model):
     __tablename__ = 'resources'
+    __table_args__ = (
+        db.Index('ix_resources_mentor_upload_date', 'mentor_id', 'upload_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     resource_id = db.Column(db.String(50), unique=True, nullable=False)
@@ -189,7 +269,7 @@ class Resource(db.Model):
     title = db.Column(db.String(200), nullable=False)
     file_type = db.Column(db.String(50))
     description = db.Column(db.Text)
-    upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    upload_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     file_url = db.Column(db.String(500))
     
     def to_dict(self):
@@ -206,13 +286,17 @@ class Resource(db.Model):
 
 class MentorshipRequest(db.Model):
     __tablename__ = 'mentorship_requests'
+    __table_args__ = (
+        db.Index('ix_mentorship_requests_student_mentor_status', 'student_id', 'mentor_id', 'status'),
+        db.Index('ix_mentorship_requests_mentor_created', 'mentor_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
     mentor_id = db.Column(db.Integer, db.ForeignKey('mentors.id'), nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
     message = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     student = db.relationship('Student', backref='mentorship_requests')
@@ -228,3 +312,39 @@ class MentorshipRequest(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class StatCounter(db.Model):
+    __tablename__ = 'stat_counters'
+    
+    # e.g. 'users' (total) or 'users:student' (per role/status)
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class StreamEvent(db.Model):
+    __tablename__ = 'stream_events'
+    
+    # Event log for the database-backed event broker (see events.py)
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(50), nullable=False, index=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    data = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+    
+    # Migrations applied by migrations.py, by function name
+    name = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def _bump_version(mapper, connection, target):
+    # Incremented in the UPDATE itself rather than used as a version_id_col,
+    # which would also check it: concurrent writers (a profile edit racing a
+    # verification or a login rehash) both succeed instead of one failing
+    if object_session(target).is_modified(target, include_collections=False):
+        target.version = mapper.class_.version + 1
+
+
+for _model in (User, Student, Mentor):
+    event.listen(_model, 'before_update', _bump_version)
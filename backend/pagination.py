@@ -0,0 +1,73 @@
+"""Opaque-cursor keyset pagination for list endpoints.
+
+Lists are ordered newest first on a sort column with the primary key as a
+tie-breaker. The cursor encodes the (sort value, id) of the last row on the
+page, so fetching the next page is an indexed range scan no matter how deep
+the client has paged. Sort columns must be NOT NULL: the page predicate is a
+plain ``(sort, id) < (value, id)`` row comparison, which is what lets the
+``(owner, sort)`` indexes bound the scan.
+"""
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import tuple_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (TypeError, ValueError):
+        raise PaginationError('Invalid cursor')
+
+
+def get_limit():
+    limit = request.args.get('limit')
+    if limit is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise PaginationError('Invalid limit')
+    if limit < 1:
+        raise PaginationError('Invalid limit')
+    return min(limit, MAX_LIMIT)
+
+
+def paginate(query, sort_column, id_column):
+    """Apply the request's cursor and limit to ``query``.
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    Raises PaginationError for a malformed ``cursor`` or ``limit`` argument.
+    """
+    limit = get_limit()
+    cursor = request.args.get('cursor')
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, last_id))
+
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
@@ -0,0 +1,144 @@
+"""Password hashing service.
+
+Hashing and verification run in a small process pool so a burst of logins
+cannot monopolise the CPU of the worker serving other routes. The algorithm
+and cost come from ``PASSWORD_HASH_METHOD`` (any werkzeug method string, e.g.
+``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``); ``needs_rehash`` tells
+the login route when a stored hash uses older parameters.
+
+Set ``PASSWORD_HASH_WORKERS = 0`` to hash inline in the request thread.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHashingBusy(RuntimeError):
+    pass
+
+
+_pool = None
+_pool_pid = None
+_slots = None
+_lock = threading.Lock()
+_normalized_methods = {}
+
+
+def _get_pool(workers):
+    # Pools do not survive fork; each gunicorn worker lazily builds its own
+    global _pool, _pool_pid, _slots
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # fork avoids re-importing the app's __main__ in every hashing process
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(start_method)
+            )
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(workers * 2)
+        return _pool, _slots
+
+
+def shutdown_pool():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _discard_pool(pool):
+    # A hashing process died (e.g. OOM-killed); the executor is unusable, so
+    # the next call builds a fresh one. Another thread may already have.
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(fn, *args):
+    config = current_app.config
+    workers = config.get('PASSWORD_HASH_WORKERS', 0)
+    if not workers:
+        return fn(*args)
+    pool, slots = _get_pool(workers)
+    timeout = config.get('PASSWORD_HASH_TIMEOUT', 10)
+    # Bound the queue: callers wait for a slot rather than piling up work
+    if not slots.acquire(timeout=timeout):
+        raise PasswordHashingBusy('Password hashing is busy, try again shortly')
+    try:
+        future = pool.submit(fn, *args)
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise PasswordHashingBusy('Password hashing is busy, try again shortly')
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise PasswordHashingBusy('Password hashing is unavailable, try again shortly')
+    finally:
+        slots.release()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def hash_passwords(passwords):
+    """Hash many passwords for a bulk import.
+
+    Goes through the same slots and timeout as ``hash_password``, with at
+    most ``PASSWORD_HASH_WORKERS`` hashes in flight, so an import keeps the
+    pool busy without starving logins: they queue behind at most one hash
+    per process rather than behind the whole batch.
+    """
+    config = current_app.config
+    method = config['PASSWORD_HASH_METHOD']
+    workers = config.get('PASSWORD_HASH_WORKERS', 0)
+    if not workers or len(passwords) < 2:
+        return [generate_password_hash(p, method) for p in passwords]
+    pool, slots = _get_pool(workers)
+    timeout = config.get('PASSWORD_HASH_TIMEOUT', 10)
+    futures = []
+    try:
+        for i, password in enumerate(passwords):
+            if i >= workers:
+                # Wait for the oldest hash before starting another
+                futures[i - workers].result(timeout=timeout)
+            if not slots.acquire(timeout=timeout):
+                raise PasswordHashingBusy('Password hashing is busy, try again shortly')
+            try:
+                future = pool.submit(generate_password_hash, password, method)
+            except BaseException:
+                slots.release()
+                raise
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        return [future.result(timeout=timeout) for future in futures]
+    except FutureTimeout:
+        for future in futures:
+            future.cancel()
+        raise PasswordHashingBusy('Password hashing is busy, try again shortly')
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise PasswordHashingBusy('Password hashing is unavailable, try again shortly')
+
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+
+def _normalized_method(method):
+    # werkzeug records defaulted parameters, e.g. 'pbkdf2:sha256' -> 'pbkdf2:sha256:600000'
+    if method not in _normalized_methods:
+        _normalized_methods[method] = generate_password_hash('', method).split('$', 1)[0]
+    return _normalized_methods[method]
+
+
+def needs_rehash(password_hash):
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    return password_hash.split('$', 1)[0] != _normalized_method(method)
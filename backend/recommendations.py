@@ -0,0 +1,323 @@
+"""Mentor recommendations from TF-IDF similarity of free-text profiles.
+
+Verified mentors are indexed as L2-normalised TF-IDF rows of a sparse CSR
+matrix over their expertise, industry, title and bio (expertise and industry
+weighted higher). A student's career interests, goals and background form the
+query vector, and cosine similarity is one sparse-matrix x dense-matrix
+product for a whole batch of students, followed by an ``argpartition`` top-k
+per student.
+
+The matrix is built once per process, on first use. Profile edits and
+verification changes are applied incrementally: the mentor's old row is
+masked and the new vector kept in a small pending matrix that is scored
+alongside it. After ``RECOMMENDER_MAX_PENDING`` changes, or
+``RECOMMENDER_REFRESH_SECONDS`` (which also bounds how stale other gunicorn
+workers can be), the matrix is rebuilt from the database.
+
+A rebuild runs without holding the lock scoring and updates take, and is
+swapped in at the end. Only the first build makes requests wait; during a
+later one, the request that started it is the only one delayed, and others
+keep scoring against the current index. Changes recorded while a rebuild
+reads the database are carried over to the new index, since the read may
+have missed them.
+
+``scipy.sparse`` is imported by the methods that need it, so workers only
+pay for the import once recommendations are first used.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from models import db, Mentor
+
+_TOKEN_RE = re.compile(r'[a-z][a-z0-9+#]+')
+
+STOPWORDS = frozenset('''
+    a an and are as at be been but by for from has have i in into is it its
+    my of on or our that the their this to was we were will with you your
+    am me want like would about also can more work working
+'''.split())
+
+# Field weights applied to term counts
+MENTOR_FIELDS = (('expertise', 3), ('industry', 2), ('professional_title', 1), ('bio', 1))
+STUDENT_FIELDS = (('career_interests', 2), ('goals', 1), ('educational_background', 1))
+
+QUERY_BATCH_SIZE = 16
+
+_State = namedtuple('_State', [
+    'matrix',          # csr (rows x terms), float32, rows L2-normalised
+    'row_ids',         # mentor id of each matrix row
+    'masked',          # bool per row: superseded by a pending change
+    'pending_ids',     # mentor ids with a pending vector
+    'pending_matrix',  # csr (len(pending_ids) x terms) or None
+    'built_at',
+])
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+def weighted_terms(fields):
+    """``fields`` is ``[(text, weight), ...]``; returns a term -> count Counter."""
+    counts = Counter()
+    for text, weight in fields:
+        for term in tokenize(text):
+            counts[term] += weight
+    return counts
+
+
+def mentor_terms(mentor):
+    return weighted_terms([(getattr(mentor, name), weight) for name, weight in MENTOR_FIELDS])
+
+
+def student_terms(student):
+    return weighted_terms([(getattr(student, name), weight) for name, weight in STUDENT_FIELDS])
+
+
+class MentorRecommender:
+    def __init__(self, max_pending=1000, refresh_seconds=300):
+        self.max_pending = max_pending
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._vocab = {}
+        self._idf = np.zeros(0, dtype=np.float32)
+        # mentor id -> (change number, Counter or None if removed)
+        self._pending = {}
+        self._changes = 0
+        self._state = None
+
+    # -- building ---------------------------------------------------------
+
+    def load_arrays(self, row_ids, indptr, columns, counts, vocab, keep_changes_after=None):
+        """Build the index from CSR-style term counts.
+
+        ``columns`` index into ``vocab`` (term -> column); ``counts`` are the
+        weighted term counts of each row. Pending changes numbered above
+        ``keep_changes_after`` are re-applied to the new index; the rest are
+        assumed to be part of the data.
+        """
+        import scipy.sparse as sp
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        counts = sp.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), np.asarray(columns, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(len(row_ids), len(vocab))
+        )
+        counts.sum_duplicates()
+        if np.any(row_ids[1:] < row_ids[:-1]):
+            # Keep rows in id order, as the database build yields them
+            order = np.argsort(row_ids, kind='stable')
+            row_ids, counts = row_ids[order], counts[order]
+        n_docs = len(row_ids)
+        df = np.bincount(counts.indices, minlength=len(vocab))
+        idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        matrix = self._normalise(self._tfidf(counts, idf))
+        with self._lock:
+            self._vocab = dict(vocab)
+            self._idf = idf
+            if keep_changes_after is None:
+                self._pending = {}
+            else:
+                self._pending = {
+                    mentor_id: change for mentor_id, change in self._pending.items()
+                    if change[0] > keep_changes_after
+                }
+            self._state = self._with_pending(_State(
+                matrix, row_ids, np.zeros(n_docs, dtype=bool), [], None, time.monotonic()
+            ))
+
+    def build(self, documents, keep_changes_after=None):
+        """Build from ``(mentor_id, Counter)`` pairs."""
+        vocab = {}
+        row_ids, indptr, columns, counts = [], [0], [], []
+        for mentor_id, terms in documents:
+            row_ids.append(mentor_id)
+            for term, count in terms.items():
+                columns.append(vocab.setdefault(term, len(vocab)))
+                counts.append(count)
+            indptr.append(len(columns))
+        self.load_arrays(row_ids, indptr, columns, counts, vocab, keep_changes_after)
+
+    def build_from_database(self, chunk_size=1000):
+        fields = [getattr(Mentor, name) for name, _ in MENTOR_FIELDS]
+        query = select(Mentor.id, *fields).where(
+            Mentor.verification_status == 'verified'
+        ).order_by(Mentor.id).execution_options(yield_per=chunk_size)
+        weights = [weight for _, weight in MENTOR_FIELDS]
+        with self._lock:
+            # Changes from here on may or may not be in what the query reads
+            started_after = self._changes
+        self.build(
+            ((row[0], weighted_terms(zip(row[1:], weights))) for row in db.session.execute(query)),
+            keep_changes_after=started_after
+        )
+
+    def _needs_build(self):
+        state = self._state
+        return (state is None or len(self._pending) > self.max_pending
+                or time.monotonic() - state.built_at > self.refresh_seconds)
+
+    def ensure_built(self):
+        if not self._needs_build():
+            return
+        if self._state is None:
+            # Nothing to score against yet: wait for the first build
+            with self._build_lock:
+                # Another thread may have built while this one waited
+                if self._needs_build():
+                    self.build_from_database()
+        elif self._build_lock.acquire(blocking=False):
+            # A stale index still answers; only one thread refreshes it
+            try:
+                if self._needs_build():
+                    self.build_from_database()
+            finally:
+                self._build_lock.release()
+
+    @staticmethod
+    def _tfidf(counts, idf):
+        counts = counts.copy()
+        counts.data = (1 + np.log(counts.data)) * idf[counts.indices]
+        return counts
+
+    @staticmethod
+    def _normalise(matrix):
+        import scipy.sparse as sp
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sp.csr_matrix(sp.diags(1 / norms).dot(matrix), dtype=np.float32)
+
+    # -- incremental updates ----------------------------------------------
+
+    def update_mentor(self, mentor):
+        """Re-index ``mentor`` after a profile or verification change."""
+        if mentor.verification_status != 'verified':
+            self.remove_mentor(mentor.id)
+            return
+        self._set_pending(mentor.id, mentor_terms(mentor))
+
+    def remove_mentor(self, mentor_id):
+        self._set_pending(mentor_id, None)
+
+    def _set_pending(self, mentor_id, terms):
+        with self._lock:
+            if self._state is None and not self._build_lock.locked():
+                # Nothing built or building; the first build reads the new state
+                return
+            self._changes += 1
+            self._pending[mentor_id] = (self._changes, terms)
+            if self._state is not None:
+                self._state = self._with_pending(self._state)
+
+    def _with_pending(self, state):
+        """``state`` with the pending changes applied; call with the lock held."""
+        import scipy.sparse as sp
+        for _, terms in self._pending.values():
+            for term in terms or ():
+                if term not in self._vocab:
+                    # New terms get the idf of a term seen in one document
+                    self._vocab[term] = len(self._vocab)
+                    self._idf = np.append(
+                        self._idf, np.float32(math.log((1 + len(state.row_ids)) / 2) + 1)
+                    )
+        pending_ids = [i for i, (_, terms) in self._pending.items() if terms]
+        rows = [self._vector(self._pending[i][1]) for i in pending_ids]
+        return state._replace(
+            masked=np.isin(state.row_ids, list(self._pending)),
+            pending_ids=pending_ids,
+            pending_matrix=sp.vstack(rows, format='csr') if rows else None
+        )
+
+    # -- scoring ----------------------------------------------------------
+
+    def _vector(self, terms):
+        import scipy.sparse as sp
+        columns, values = [], []
+        for term, count in terms.items():
+            column = self._vocab.get(term)
+            if column is not None:
+                columns.append(column)
+                values.append((1 + math.log(count)) * self._idf[column])
+        vector = sp.csr_matrix(
+            (np.asarray(values, dtype=np.float32), (np.zeros(len(columns), dtype=np.int32), columns)),
+            shape=(1, len(self._vocab))
+        )
+        return self._normalise(vector)
+
+    def top_k(self, queries, k=10):
+        """Best ``k`` ``(mentor_id, score)`` pairs for each Counter in
+        ``queries``, highest score first. Zero scores are dropped."""
+        import scipy.sparse as sp
+        state = self._state
+        if state is None:
+            return [[] for _ in queries]
+        with self._lock:
+            vectors = [self._vector(terms) for terms in queries]
+        results = []
+        for offset in range(0, len(vectors), QUERY_BATCH_SIZE):
+            batch = sp.vstack(vectors[offset:offset + QUERY_BATCH_SIZE], format='csr')
+            results.extend(self._score_batch(state, batch, k))
+        return results
+
+    def _score_batch(self, state, batch, k):
+        width = state.matrix.shape[1]
+        # Dense (terms x batch) query block: the product is a dense
+        # (mentors x batch) score block, ranked per column
+        query_block = batch[:, :width].T.toarray()
+        scores = state.matrix.dot(query_block)
+        if state.masked.any():
+            scores[state.masked] = 0
+        pending_scores = None
+        if state.pending_matrix is not None:
+            pending_width = state.pending_matrix.shape[1]
+            pending_scores = state.pending_matrix.dot(batch[:, :pending_width].T.toarray())
+
+        results = []
+        for column in range(batch.shape[0]):
+            candidates = self._best(scores[:, column], state.row_ids, k)
+            if pending_scores is not None:
+                candidates += self._best(pending_scores[:, column], np.asarray(state.pending_ids), k)
+                candidates.sort(key=lambda pair: -pair[1])
+            results.append(candidates[:k])
+        return results
+
+    @staticmethod
+    def _best(column_scores, ids, k):
+        if len(column_scores) > k:
+            top = np.argpartition(column_scores, -k)[-k:]
+        else:
+            top = np.arange(len(column_scores))
+        top = top[np.argsort(-column_scores[top], kind='stable')]
+        return [(int(ids[i]), float(column_scores[i])) for i in top if column_scores[i] > 0]
+
+    def stats(self):
+        state = self._state
+        return {
+            'mentors': 0 if state is None else int(len(state.row_ids) - state.masked.sum() + len(state.pending_ids)),
+            'terms': len(self._vocab),
+            'pending_changes': len(self._pending),
+            'age_seconds': None if state is None else round(time.monotonic() - state.built_at, 1)
+        }
+
+
+def init_recommender(app):
+    app.extensions['mentor_recommender'] = MentorRecommender(
+        max_pending=app.config['RECOMMENDER_MAX_PENDING'],
+        refresh_seconds=app.config['RECOMMENDER_REFRESH_SECONDS']
+    )
+
+
+def get_recommender():
+    return current_app.extensions['mentor_recommender']
+
+
+def recommend_mentors(student, k=10):
+    recommender = get_recommender()
+    recommender.ensure_built()
+    return recommender.top_k([student_terms(student)], k)[0]
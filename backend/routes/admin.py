@@ -1,18 +1,29 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Mentor, Student, Session, Message, MentorshipRequest
-from sqlalchemy import func
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
+from models import db, User, Mentor, Session
+from sqlalchemy.orm import joinedload
+from search import index_mentor, remove_mentor
+from search_cache import get_search_cache
+from recommendations import get_recommender
+from pagination import paginate, PaginationError
+from serialization import SESSION_LIST, session_list_query
+from user_loader import get_current_user
+from counters import counter_name, read_counters, recompute_counters
+from bulk_import import (
+    DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE, FORMATS, detect_format, import_users, read_records
+)
+from exports import FORMATS as EXPORT_FORMATS, ExportError, build_export, stream_export
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics, scrape_token_matches
+from datetime import datetime
+import json
+import shutil
+import tempfile
 
 admin_bp = Blueprint('admin', __name__)
 
 def admin_required():
-    # Convert JWT identity (string) back to int and validate admin role
-    user_id = get_jwt_identity()
-    try:
-        user_id = int(user_id)
-    except (TypeError, ValueError):
-        return None
-    user = User.query.get(user_id)
+    # Resolve the JWT identity (cached per request) and validate admin role
+    user = get_current_user()
     if not user or user.role != 'admin':
         return None
     return user
@@ -27,11 +38,11 @@ def get_users():
         
         role = request.args.get('role')
         
-        query = User.query
+        query = User.query.options(joinedload(User.student_profile), joinedload(User.mentor_profile))
         if role:
             query = query.filter_by(role=role)
         
-        users = query.order_by(User.created_at.desc()).all()
+        users, next_cursor = paginate(query, User.created_at, User.id)
         
         result = []
         for u in users:
@@ -42,8 +53,10 @@ def get_users():
                 user_data['profile'] = u.mentor_profile.to_dict()
             result.append(user_data)
         
-        return jsonify({'users': result}), 200
+        return jsonify({'users': result, 'next_cursor': next_cursor}), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -63,9 +76,17 @@ def delete_user(user_id):
         if user.role == 'admin':
             return jsonify({'error': 'Cannot delete admin users'}), 400
         
+        mentor_id = user.mentor_profile.id if user.mentor_profile else None
+        if mentor_id:
+            remove_mentor(mentor_id)
+        
         db.session.delete(user)
         db.session.commit()
         
+        if mentor_id:
+            get_search_cache().invalidate_mentor(mentor_id)
+            get_recommender().remove_mentor(mentor_id)
+        
         return jsonify({'message': 'User deleted successfully'}), 200
         
     except Exception as e:
@@ -92,8 +113,12 @@ def verify_mentor(mentor_id):
             return jsonify({'error': 'Invalid status'}), 400
         
         mentor.verification_status = status
+        index_mentor(mentor)
         db.session.commit()
         
+        get_search_cache().invalidate_mentor(mentor.id, mentor)
+        get_recommender().update_mentor(mentor)
+        
         return jsonify({
             'message': f'Mentor {status}',
             'mentor': mentor.to_dict()
@@ -111,7 +136,9 @@ def get_pending_mentors():
         if not user:
             return jsonify({'error': 'Unauthorized - Admin access required'}), 403
         
-        mentors = Mentor.query.filter_by(verification_status='pending').all()
+        mentors = Mentor.query.options(joinedload(Mentor.user)).filter_by(
+            verification_status='pending'
+        ).all()
         
         result = []
         for mentor in mentors:
@@ -124,6 +151,51 @@ def get_pending_mentors():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/users/import', methods=['POST'])
+@jwt_required()
+def import_users_endpoint():
+    # Body is a CSV or NDJSON file, either raw or as the 'file' form field.
+    # The report streams back as NDJSON: error/invite lines per row, a
+    # progress line per batch and a final summary.
+    user = admin_required()
+    if not user:
+        return jsonify({'error': 'Unauthorized - Admin access required'}), 403
+    
+    upload = request.files.get('file')
+    fmt = request.args.get('format') or detect_format(
+        upload.filename if upload else None, upload.mimetype if upload else request.mimetype
+    )
+    if fmt not in FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(FORMATS)}'}), 400
+    try:
+        batch_size = min(int(request.args.get('batch_size', DEFAULT_BATCH_SIZE)), MAX_BATCH_SIZE)
+        if batch_size < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'error': 'batch_size must be a positive integer'}), 400
+    invite = request.args.get('invite', 'true').lower() in ('true', '1', 'yes')
+    
+    if upload:
+        stream = upload.stream
+    else:
+        # Receive the whole body before answering so clients that do not
+        # read while uploading cannot deadlock; large bodies spill to disk
+        stream = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        shutil.copyfileobj(request.stream, stream)
+        stream.seek(0)
+    
+    def generate():
+        try:
+            for entry in import_users(read_records(stream, fmt), batch_size, invite):
+                yield json.dumps(entry) + '\n'
+        except Exception as e:
+            db.session.rollback()
+            yield json.dumps({'type': 'error', 'row': None, 'error': str(e)}) + '\n'
+        finally:
+            stream.close()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @admin_bp.route('/dashboard/stats', methods=['GET'])
 @jwt_required()
 def get_dashboard_stats():
@@ -132,34 +204,59 @@ def get_dashboard_stats():
         if not user:
             return jsonify({'error': 'Unauthorized - Admin access required'}), 403
         
-        # Get counts
-        total_users = User.query.count()
-        total_students = User.query.filter_by(role='student').count()
-        total_mentors = User.query.filter_by(role='mentor').count()
-        verified_mentors = Mentor.query.filter_by(verification_status='verified').count()
-        pending_mentors = Mentor.query.filter_by(verification_status='pending').count()
-        total_sessions = Session.query.count()
-        completed_sessions = Session.query.filter_by(status='completed').count()
-        total_messages = Message.query.count()
-        pending_requests = MentorshipRequest.query.filter_by(status='pending').count()
+        # Maintained incrementally by the counters module; one SELECT
+        counts = read_counters()
+        
+        def stat(prefix, value=None):
+            return counts.get(counter_name(prefix, value), 0)
         
         return jsonify({
             'stats': {
-                'total_users': total_users,
-                'total_students': total_students,
-                'total_mentors': total_mentors,
-                'verified_mentors': verified_mentors,
-                'pending_mentors': pending_mentors,
-                'total_sessions': total_sessions,
-                'completed_sessions': completed_sessions,
-                'total_messages': total_messages,
-                'pending_requests': pending_requests
+                'total_users': stat('users'),
+                'total_students': stat('users', 'student'),
+                'total_mentors': stat('users', 'mentor'),
+                'verified_mentors': stat('mentors', 'verified'),
+                'pending_mentors': stat('mentors', 'pending'),
+                'total_sessions': stat('sessions'),
+                'completed_sessions': stat('sessions', 'completed'),
+                'total_messages': stat('messages'),
+                'pending_requests': stat('mentorship_requests', 'pending')
             }
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/dashboard/stats/recompute', methods=['POST'])
+@jwt_required()
+def recompute_dashboard_stats():
+    try:
+        user = admin_required()
+        if not user:
+            return jsonify({'error': 'Unauthorized - Admin access required'}), 403
+        
+        counts = recompute_counters()
+        db.session.commit()
+        
+        return jsonify({'message': 'Counters recomputed', 'counters': counts}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/cache/search', methods=['GET'])
+@jwt_required()
+def get_search_cache_stats():
+    try:
+        user = admin_required()
+        if not user:
+            return jsonify({'error': 'Unauthorized - Admin access required'}), 403
+        
+        return jsonify({'stats': get_search_cache().stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/reports/sessions', methods=['GET'])
 @jwt_required()
 def get_session_report():
@@ -168,20 +265,52 @@ def get_session_report():
         if not user:
             return jsonify({'error': 'Unauthorized - Admin access required'}), 403
         
-        sessions = Session.query.order_by(Session.date_time.desc()).limit(100).all()
+        rows, next_cursor = paginate(session_list_query(), Session.date_time, Session.id)
         
-        result = []
-        for session in sessions:
-            session_data = session.to_dict()
-            session_data['student_name'] = session.student.user.name
-            session_data['mentor_name'] = session.mentor.user.name
-            result.append(session_data)
-        
-        return jsonify({'sessions': result}), 200
+        return jsonify({'sessions': SESSION_LIST.dump(rows), 'next_cursor': next_cursor}), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/exports/<name>', methods=['GET'])
+@jwt_required()
+def export_report(name):
+    # Full reports (sessions, users, messages, mentorship_requests) streamed
+    # as CSV or NDJSON; filters: start, end, status (comma-separated)
+    user = admin_required()
+    if not user:
+        return jsonify({'error': 'Unauthorized - Admin access required'}), 403
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+    try:
+        stmt = build_export(
+            name, request.args.get('start'), request.args.get('end'), request.args.get('status')
+        )
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f'{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}'
+    return Response(
+        stream_with_context(stream_export(stmt, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text format; the scrape token or an admin JWT is required
+    if not scrape_token_matches(request.headers.get('Authorization')):
+        verify_jwt_in_request()
+        if not admin_required():
+            return jsonify({'error': 'Unauthorized - Admin access required'}), 403
+    
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 
 @admin_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import create_access_token, jwt_required
 from models import db, User, Student, Mentor
+from user_loader import load_current_user
+from passwords import needs_rehash, PasswordHashingBusy
+from etags import profile_etag, etag_matches, etag_response, not_modified
+from bulk_import import hash_invite_token
 import uuid
 
 auth_bp = Blueprint('auth', __name__)
@@ -64,6 +68,42 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/invite/accept', methods=['POST'])
+def accept_invite():
+    # Bulk-imported users without a password set one with their invite token
+    try:
+        data = request.get_json() or {}
+        
+        if not data.get('token') or not data.get('password'):
+            return jsonify({'error': 'Token and password required'}), 400
+        
+        user = User.query.filter_by(invite_token_hash=hash_invite_token(data['token'])).first()
+        
+        if not user:
+            return jsonify({'error': 'Invalid or already used invite'}), 400
+        
+        user.set_password(data['password'])
+        user.invite_token_hash = None
+        db.session.commit()
+        
+        access_token = create_access_token(identity=str(user.id))
+        
+        return jsonify({
+            'message': 'Invite accepted',
+            'access_token': access_token,
+            'user': user.to_dict()
+        }), 200
+        
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -81,6 +121,11 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with older algorithm/cost settings
+        if needs_rehash(user.password_hash):
+            user.set_password(data['password'])
+            db.session.commit()
+        
         access_token = create_access_token(identity=str(user.id))
         
         # Get profile data
@@ -96,35 +141,38 @@ def login():
             'profile': profile
         }), 200
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@load_current_user
 def get_current_user():
     try:
-        # JWT identity is stored as a string; convert back to int for DB lookup
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Get profile data
         profile = None
-        if user.role == 'student' and user.student_profile:
-            profile = user.student_profile.to_dict()
-        elif user.role == 'mentor' and user.mentor_profile:
-            profile = user.mentor_profile.to_dict()
+        if user.role == 'student':
+            profile = user.student_profile
+        elif user.role == 'mentor':
+            profile = user.mentor_profile
         
-        return jsonify({
+        etag = profile_etag(user, profile)
+        if etag_matches(etag):
+            return not_modified(etag)
+        
+        return etag_response({
             'user': user.to_dict(),
-            'profile': profile
-        }), 200
+            'profile': profile.to_dict() if profile else None
+        }, etag)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,21 +1,27 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, jsonify, g, stream_with_context
+from flask_jwt_extended import jwt_required
 from models import db, User, Message, Session, Student, Mentor
-from datetime import datetime
+from pagination import paginate, PaginationError
+from user_loader import load_current_user
+from events import format_event, get_broker, publish_event, user_channel
+from scheduling import (
+    INACTIVE_STATUSES, SchedulingError, find_conflict, parse_datetime, session_end, within_availability
+)
+from sqlalchemy import and_, func, or_, select
+from serialization import MESSAGE, SESSION_LIST, MentorUser, StudentUser, session_list_query
+import time
 import uuid
 
 communications_bp = Blueprint('communications', __name__)
 
+MESSAGE_LIST = MESSAGE.extend(sender_name=StudentUser.name, receiver_name=MentorUser.name)
+
 @communications_bp.route('/messages', methods=['GET', 'POST'])
 @jwt_required()
+@load_current_user
 def messages():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -24,30 +30,31 @@ def messages():
             # Get messages for the user
             if user.role == 'student':
                 if not user.student_profile:
-                    return jsonify({'messages': []}), 200
+                    return jsonify({'messages': [], 'next_cursor': None}), 200
                 
-                messages = Message.query.filter_by(
-                    sender_id=user.student_profile.id
-                ).order_by(Message.timestamp.desc()).all()
+                condition = Message.sender_id == user.student_profile.id
                 
             elif user.role == 'mentor':
                 if not user.mentor_profile:
-                    return jsonify({'messages': []}), 200
+                    return jsonify({'messages': [], 'next_cursor': None}), 200
                 
-                messages = Message.query.filter_by(
-                    receiver_id=user.mentor_profile.id
-                ).order_by(Message.timestamp.desc()).all()
+                condition = Message.receiver_id == user.mentor_profile.id
             else:
-                return jsonify({'messages': []}), 200
+                return jsonify({'messages': [], 'next_cursor': None}), 200
             
-            result = []
-            for msg in messages:
-                msg_data = msg.to_dict()
-                msg_data['sender_name'] = msg.sender.user.name
-                msg_data['receiver_name'] = msg.receiver.user.name
-                result.append(msg_data)
+            # Plain rows with the sender's and receiver's names joined in
+            query = (
+                MESSAGE_LIST.query()
+                .select_from(Message)
+                .join(Student, Message.sender_id == Student.id)
+                .join(StudentUser, Student.user_id == StudentUser.id)
+                .join(Mentor, Message.receiver_id == Mentor.id)
+                .join(MentorUser, Mentor.user_id == MentorUser.id)
+                .filter(condition)
+            )
+            rows, next_cursor = paginate(query, Message.timestamp, Message.id)
             
-            return jsonify({'messages': result}), 200
+            return jsonify({'messages': MESSAGE_LIST.dump(rows), 'next_cursor': next_cursor}), 200
         
         elif request.method == 'POST':
             # Send a message (student to mentor)
@@ -79,25 +86,27 @@ def messages():
             db.session.add(message)
             db.session.commit()
             
+            event_data = message.to_dict()
+            event_data['sender_name'] = user.name
+            publish_event([mentor.user_id], 'message', event_data)
+            
             return jsonify({
                 'message': 'Message sent',
                 'data': message.to_dict()
             }), 201
             
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @communications_bp.route('/messages/<int:message_id>/read', methods=['PUT'])
 @jwt_required()
+@load_current_user
 def mark_message_read(message_id):
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'mentor':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -119,16 +128,128 @@ def mark_message_read(message_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def inbox_side(user):
+    # (owner column, partner column, owner profile id, partner model) for the
+    # user's side of their conversations, or None without a profile
+    if user.role == 'mentor' and user.mentor_profile:
+        return Message.receiver_id, Message.sender_id, user.mentor_profile.id, Student
+    if user.role == 'student' and user.student_profile:
+        return Message.sender_id, Message.receiver_id, user.student_profile.id, Mentor
+    return None
+
+@communications_bp.route('/messages/unread', methods=['GET'])
+@jwt_required()
+@load_current_user
+def unread_summary():
+    # Unread counts per conversation partner plus the newest message time.
+    # For mentors these are messages they have not read; for students, sent
+    # messages their mentors have not read yet. Both queries walk indexes
+    # bounded by the unread slice, not the whole inbox.
+    try:
+        user = g.current_user
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        side = inbox_side(user)
+        if not side:
+            return jsonify({'unread_total': 0, 'latest_timestamp': None, 'conversations': []}), 200
+        owner_column, partner_column, owner_id, partner_model = side
+        
+        # Grouped in index order, then partner names joined onto the result
+        counts = db.session.query(
+            partner_column.label('partner_id'), func.count(Message.id).label('unread')
+        ).filter(
+            owner_column == owner_id, Message.read.is_(False)
+        ).group_by(partner_column).subquery()
+        
+        rows = db.session.query(
+            counts.c.partner_id, User.name, counts.c.unread
+        ).join(
+            partner_model, partner_model.id == counts.c.partner_id
+        ).join(
+            User, User.id == partner_model.user_id
+        ).all()
+        
+        latest = db.session.query(func.max(Message.timestamp)).filter(owner_column == owner_id).scalar()
+        
+        conversations = [
+            {'partner_id': partner_id, 'partner_name': name, 'unread': unread}
+            for partner_id, name, unread in rows
+        ]
+        
+        return jsonify({
+            'unread_total': sum(c['unread'] for c in conversations),
+            'latest_timestamp': latest.isoformat() if latest else None,
+            'conversations': conversations
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+MAX_BULK_READ_IDS = 1000
+
+@communications_bp.route('/messages/read', methods=['PUT'])
+@jwt_required()
+@load_current_user
+def mark_messages_read():
+    # Mark many messages read in one UPDATE: either a list of ids or every
+    # message up to and including the watermark message (inbox order)
+    try:
+        user = g.current_user
+        
+        if not user or user.role != 'mentor':
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        if not user.mentor_profile:
+            return jsonify({'error': 'Mentor profile not found'}), 404
+        
+        data = request.get_json() or {}
+        message_ids = data.get('message_ids')
+        up_to = data.get('up_to')
+        
+        query = Message.query.filter(
+            Message.receiver_id == user.mentor_profile.id,
+            Message.read.is_(False)
+        )
+        
+        if message_ids is not None:
+            if (not isinstance(message_ids, list)
+                    or not all(isinstance(i, int) and not isinstance(i, bool) for i in message_ids)):
+                return jsonify({'error': 'message_ids must be a list of integers'}), 400
+            if len(message_ids) > MAX_BULK_READ_IDS:
+                return jsonify({'error': f'At most {MAX_BULK_READ_IDS} message_ids per request'}), 400
+            query = query.filter(Message.id.in_(message_ids))
+        elif up_to is not None:
+            if not isinstance(up_to, int) or isinstance(up_to, bool):
+                return jsonify({'error': 'up_to must be a message id'}), 400
+            # Watermark timestamp, resolved inside the UPDATE; NULL (and so
+            # no rows) if the message is not in this mentor's inbox
+            watermark = select(Message.timestamp).where(
+                Message.id == up_to, Message.receiver_id == user.mentor_profile.id
+            ).scalar_subquery()
+            query = query.filter(or_(
+                Message.timestamp < watermark,
+                and_(Message.timestamp == watermark, Message.id <= up_to)
+            ))
+        else:
+            return jsonify({'error': 'message_ids or up_to required'}), 400
+        
+        updated = query.update({Message.read: True}, synchronize_session=False)
+        db.session.commit()
+        
+        return jsonify({'message': 'Messages marked as read', 'updated': updated}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @communications_bp.route('/sessions', methods=['GET', 'POST'])
 @jwt_required()
+@load_current_user
 def sessions():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -137,30 +258,21 @@ def sessions():
             # Get sessions for the user
             if user.role == 'student':
                 if not user.student_profile:
-                    return jsonify({'sessions': []}), 200
+                    return jsonify({'sessions': [], 'next_cursor': None}), 200
                 
-                sessions = Session.query.filter_by(
-                    student_id=user.student_profile.id
-                ).order_by(Session.date_time.desc()).all()
+                condition = Session.student_id == user.student_profile.id
                 
             elif user.role == 'mentor':
                 if not user.mentor_profile:
-                    return jsonify({'sessions': []}), 200
+                    return jsonify({'sessions': [], 'next_cursor': None}), 200
                 
-                sessions = Session.query.filter_by(
-                    mentor_id=user.mentor_profile.id
-                ).order_by(Session.date_time.desc()).all()
+                condition = Session.mentor_id == user.mentor_profile.id
             else:
-                return jsonify({'sessions': []}), 200
+                return jsonify({'sessions': [], 'next_cursor': None}), 200
             
-            result = []
-            for session in sessions:
-                session_data = session.to_dict()
-                session_data['student_name'] = session.student.user.name
-                session_data['mentor_name'] = session.mentor.user.name
-                result.append(session_data)
+            rows, next_cursor = paginate(session_list_query().filter(condition), Session.date_time, Session.id)
             
-            return jsonify({'sessions': result}), 200
+            return jsonify({'sessions': SESSION_LIST.dump(rows), 'next_cursor': next_cursor}), 200
         
         elif request.method == 'POST':
             # Create a session (student requests)
@@ -177,47 +289,56 @@ def sessions():
             if not mentor_id or not date_time_str:
                 return jsonify({'error': 'Mentor ID and date_time required'}), 400
             
-            # Verify mentor exists
-            mentor = Mentor.query.get(mentor_id)
+            # Verify mentor exists; the row lock serializes bookings per mentor
+            mentor = Mentor.query.filter_by(id=mentor_id).with_for_update().first()
             if not mentor:
                 return jsonify({'error': 'Mentor not found'}), 404
             
-            # Parse datetime
-            try:
-                date_time = datetime.fromisoformat(date_time_str.replace('Z', '+00:00'))
-            except:
-                return jsonify({'error': 'Invalid date_time format'}), 400
+            date_time = parse_datetime(date_time_str)
+            end_time = session_end(date_time, data.get('duration_minutes'))
+            
+            if not within_availability(mentor.id, date_time, end_time):
+                return jsonify({'error': 'Mentor is not available at that time'}), 409
             
             session = Session(
                 session_id=str(uuid.uuid4()),
                 student_id=user.student_profile.id,
-                mentor_id=mentor_id,
+                mentor_id=mentor.id,
                 date_time=date_time,
+                end_time=end_time,
                 status='pending'
             )
             
             db.session.add(session)
+            # Insert first: once the row is flushed this transaction holds the
+            # write lock (SQLite) or the mentor row lock (below), so a
+            # concurrent booking cannot slip in between check and commit
+            db.session.flush()
+            if find_conflict(mentor.id, date_time, end_time, exclude_id=session.id):
+                db.session.rollback()
+                return jsonify({'error': 'Mentor already has a session at that time'}), 409
             db.session.commit()
             
+            publish_event([mentor.user_id], 'session', session.to_dict())
+            
             return jsonify({
                 'message': 'Session requested',
                 'session': session.to_dict()
             }), 201
             
+    except (PaginationError, SchedulingError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @communications_bp.route('/sessions/<int:session_id>', methods=['PUT'])
 @jwt_required()
+@load_current_user
 def update_session(session_id):
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         session = Session.query.get(session_id)
         
@@ -233,7 +354,20 @@ def update_session(session_id):
             
             if 'status' in data:
                 if data['status'] in ['scheduled', 'completed', 'cancelled']:
+                    reviving = session.status in INACTIVE_STATUSES and data['status'] not in INACTIVE_STATUSES
+                    if reviving:
+                        # Same locking as booking: the mentor row lock, then the
+                        # flushed row, so a concurrent booking cannot slip in
+                        Mentor.query.filter_by(id=session.mentor_id).with_for_update().first()
                     session.status = data['status']
+                    if reviving:
+                        db.session.flush()
+                        # Reviving a cancelled session must not double-book
+                        if find_conflict(session.mentor_id, session.date_time,
+                                         session.end_time or session_end(session.date_time),
+                                         exclude_id=session.id):
+                            db.session.rollback()
+                            return jsonify({'error': 'Mentor already has a session at that time'}), 409
             
             if 'notes' in data:
                 session.notes = data['notes']
@@ -248,6 +382,8 @@ def update_session(session_id):
         
         db.session.commit()
         
+        publish_event([session.student.user_id, session.mentor.user_id], 'session', session.to_dict())
+        
         return jsonify({
             'message': 'Session updated',
             'session': session.to_dict()
@@ -256,3 +392,174 @@ def update_session(session_id):
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@communications_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+@load_current_user
+def event_stream():
+    # Server-sent events for the current user. EventSource cannot set headers,
+    # so the token may also be passed as ?jwt=<token>.
+    user = g.current_user
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or 0)
+    except ValueError:
+        return jsonify({'error': 'Invalid last event id'}), 400
+    
+    broker = get_broker()
+    channels = {user_channel(user.id)}
+    stream_timeout = current_app.config['EVENT_STREAM_TIMEOUT']
+    heartbeat = current_app.config['EVENT_HEARTBEAT_INTERVAL']
+    # The stream outlives the request; give its connection back to the pool
+    # now rather than holding it (idle in transaction) for the whole stream.
+    # The database broker opens a short connection per poll.
+    db.session.remove()
+    
+    def generate(last_id):
+        # Bounded stream lifetime frees the worker; the browser reconnects
+        # with Last-Event-ID and resumes where it left off
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + stream_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            events = broker.read(channels, last_id, min(heartbeat, remaining))
+            if not events:
+                yield ': keep-alive\n\n'
+            for event in events:
+                last_id = event.id
+                yield format_event(event)
+    
+    return Response(
+        stream_with_context(generate(last_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@communications_bp.route('/conversations', methods=['GET'])
+@jwt_required()
+@load_current_user
+def conversations():
+    # One row per (student, mentor) pair, newest conversation first: last
+    # message, unread count and partner name. Pages are keyed on the
+    # partner's latest message time, so only the page's partners are read
+    # past the (owner, partner, timestamp) index.
+    try:
+        user = g.current_user
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        side = inbox_side(user)
+        if not side:
+            return jsonify({'conversations': [], 'next_cursor': None}), 200
+        owner_column, partner_column, owner_id, partner_model = side
+        
+        # Newest message time per partner, from the index alone
+        latest = db.session.query(
+            partner_column.label('partner_id'), func.max(Message.timestamp).label('latest')
+        ).filter(owner_column == owner_id).group_by(partner_column).subquery()
+        
+        partners, next_cursor = paginate(
+            db.session.query(latest.c.partner_id, latest.c.latest, User.name).join(
+                partner_model, partner_model.id == latest.c.partner_id
+            ).join(
+                User, User.id == partner_model.user_id
+            ),
+            latest.c.latest, latest.c.partner_id
+        )
+        
+        last_messages, unread = {}, {}
+        if partners:
+            page_ids = [p.partner_id for p in partners]
+            # One (owner, partner, timestamp) index seek per partner; equal
+            # timestamps are settled by the higher id
+            messages = Message.query.filter(or_(*(
+                and_(owner_column == owner_id, partner_column == p.partner_id, Message.timestamp == p.latest)
+                for p in partners
+            )))
+            for msg in messages:
+                partner_id = getattr(msg, partner_column.key)
+                if partner_id not in last_messages or msg.id > last_messages[partner_id].id:
+                    last_messages[partner_id] = msg
+            unread = dict(db.session.query(partner_column, func.count(Message.id)).filter(
+                owner_column == owner_id, partner_column.in_(page_ids), Message.read.is_(False)
+            ).group_by(partner_column).all())
+        
+        result = []
+        for partner in partners:
+            msg = last_messages[partner.partner_id]
+            result.append({
+                'partner_id': partner.partner_id,
+                'partner_name': partner.name,
+                'unread': unread.get(partner.partner_id, 0),
+                'last_message': {
+                    'id': msg.id,
+                    'sender_id': msg.sender_id,
+                    'content': msg.content,
+                    'timestamp': msg.timestamp.isoformat(),
+                    'read': msg.read
+                }
+            })
+        
+        return jsonify({'conversations': result, 'next_cursor': next_cursor}), 200
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@communications_bp.route('/conversations/<int:partner_id>/messages', methods=['GET'])
+@jwt_required()
+@load_current_user
+def conversation_messages(partner_id):
+    try:
+        user = g.current_user
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        side = inbox_side(user)
+        if not side:
+            return jsonify({'error': 'Profile not found'}), 404
+        owner_column, partner_column, owner_id, partner_model = side
+        
+        partner_name = db.session.query(User.name).join(
+            partner_model, partner_model.user_id == User.id
+        ).filter(partner_model.id == partner_id).scalar()
+        
+        if partner_name is None:
+            return jsonify({'error': 'Conversation not found'}), 404
+        
+        messages, next_cursor = paginate(
+            Message.query.filter(owner_column == owner_id, partner_column == partner_id),
+            Message.timestamp, Message.id
+        )
+        
+        # Both names are known up front; no per-row relationship loads
+        if user.role == 'student':
+            sender_name, receiver_name = user.name, partner_name
+        else:
+            sender_name, receiver_name = partner_name, user.name
+        
+        result = []
+        for msg in messages:
+            msg_data = msg.to_dict()
+            msg_data['sender_name'] = sender_name
+            msg_data['receiver_name'] = receiver_name
+            result.append(msg_data)
+        
+        return jsonify({
+            'partner': {'id': partner_id, 'name': partner_name},
+            'messages': result,
+            'next_cursor': next_cursor
+        }), 200
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,21 +1,33 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Mentor, Student, Resource, MentorshipRequest
+from flask import Blueprint, current_app, request, jsonify, g
+from flask_jwt_extended import jwt_required
+from models import db, User, Mentor, Student, Resource, MentorshipRequest, MentorAvailability
 from sqlalchemy import or_
+from search import index_mentor, search_mentors as search_mentor_index
+from search_cache import get_search_cache, normalize_query
+from recommendations import get_recommender, recommend_mentors
+from pagination import paginate, PaginationError
+from serialization import MENTORSHIP_REQUEST, STUDENT, USER
+from user_loader import load_current_user
+from events import publish_event
+from etags import compute_etag, profile_etag, etag_matches, etag_response, not_modified
+from sqlalchemy.orm import joinedload
+from scheduling import (
+    DEFAULT_SESSION_MINUTES, MAX_SESSION_MINUTES, MAX_SLOT_RANGE, MAX_WINDOW,
+    SchedulingError, free_slots, parse_datetime
+)
+from datetime import datetime
 import uuid
 
 mentors_bp = Blueprint('mentors', __name__)
 
+REQUEST_LIST = MENTORSHIP_REQUEST.extend(student_user=USER, student_profile=STUDENT)
+
 @mentors_bp.route('/profile', methods=['GET', 'PUT'])
 @jwt_required()
+@load_current_user
 def mentor_profile():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'mentor':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -24,10 +36,14 @@ def mentor_profile():
             if not user.mentor_profile:
                 return jsonify({'error': 'Profile not found'}), 404
             
-            return jsonify({
+            etag = profile_etag(user, user.mentor_profile)
+            if etag_matches(etag):
+                return not_modified(etag)
+            
+            return etag_response({
                 'user': user.to_dict(),
                 'profile': user.mentor_profile.to_dict()
-            }), 200
+            }, etag)
         
         elif request.method == 'PUT':
             data = request.get_json()
@@ -54,8 +70,12 @@ def mentor_profile():
             if 'phone_number' in data:
                 user.phone_number = data['phone_number']
             
+            index_mentor(mentor)
             db.session.commit()
             
+            get_search_cache().invalidate_mentor(mentor.id, mentor)
+            get_recommender().update_mentor(mentor)
+            
             return jsonify({
                 'message': 'Profile updated successfully',
                 'user': user.to_dict(),
@@ -71,25 +91,69 @@ def mentor_profile():
 def search_mentors():
     try:
         # Get query parameters
+        q = request.args.get('q')
         industry = request.args.get('industry')
         expertise = request.args.get('expertise')
         
-        # Build query
-        query = Mentor.query.filter_by(verification_status='verified')
+        cache = get_search_cache()
+        key = normalize_query(q, industry, expertise)
+        body = cache.get(key)
         
-        if industry:
-            query = query.filter(Mentor.industry.ilike(f'%{industry}%'))
-        if expertise:
-            query = query.filter(Mentor.expertise.ilike(f'%{expertise}%'))
+        if body is None:
+            generation = cache.generation
+            # Ranked full-text match; each mentor's user is loaded in the same SELECT
+            mentors = search_mentor_index(q=q, industry=industry, expertise=expertise).all()
+            
+            # Get user data for each mentor
+            result = []
+            for mentor in mentors:
+                mentor_data = mentor.to_dict()
+                mentor_data['user'] = mentor.user.to_dict()
+                result.append(mentor_data)
+            
+            body = current_app.json.dumps({'mentors': result})
+            cache.set(key, [m.id for m in mentors], body, generation)
         
-        mentors = query.all()
+        return current_app.response_class(body + '\n', mimetype='application/json'), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@mentors_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+@load_current_user
+def get_recommendations():
+    # Verified mentors ranked by TF-IDF similarity to the student's interests
+    try:
+        user = g.current_user
+        
+        if not user or user.role != 'student':
+            return jsonify({'error': 'Only students can get recommendations'}), 403
+        
+        if not user.student_profile:
+            return jsonify({'error': 'Student profile not found'}), 404
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        ranked = recommend_mentors(user.student_profile, limit)
+        mentors = {
+            m.id: m for m in Mentor.query.options(joinedload(Mentor.user)).filter(
+                Mentor.id.in_([mentor_id for mentor_id, _ in ranked]),
+                Mentor.verification_status == 'verified'
+            )
+        } if ranked else {}
         
-        # Get user data for each mentor
         result = []
-        for mentor in mentors:
-            mentor_data = mentor.to_dict()
-            mentor_data['user'] = mentor.user.to_dict()
-            result.append(mentor_data)
+        for mentor_id, score in ranked:
+            mentor = mentors.get(mentor_id)
+            if mentor:
+                mentor_data = mentor.to_dict()
+                mentor_data['user'] = mentor.user.to_dict()
+                mentor_data['score'] = round(score, 4)
+                result.append(mentor_data)
         
         return jsonify({'mentors': result}), 200
         
@@ -100,7 +164,17 @@ def search_mentors():
 @jwt_required()
 def get_mentor(mentor_id):
     try:
-        mentor = Mentor.query.get(mentor_id)
+        # Conditional requests only need the row versions to answer 304
+        if request.if_none_match:
+            versions = db.session.query(Mentor.version, User.id, User.version).join(
+                User, Mentor.user
+            ).filter(Mentor.id == mentor_id).first()
+            if versions:
+                etag = compute_etag('mentor', mentor_id, *versions)
+                if etag_matches(etag):
+                    return not_modified(etag)
+        
+        mentor = db.session.get(Mentor, mentor_id, options=[joinedload(Mentor.user)])
         
         if not mentor:
             return jsonify({'error': 'Mentor not found'}), 404
@@ -108,21 +182,18 @@ def get_mentor(mentor_id):
         mentor_data = mentor.to_dict()
         mentor_data['user'] = mentor.user.to_dict()
         
-        return jsonify({'mentor': mentor_data}), 200
+        etag = compute_etag('mentor', mentor.id, mentor.version, mentor.user.id, mentor.user.version)
+        return etag_response({'mentor': mentor_data}, etag)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @mentors_bp.route('/request', methods=['POST'])
 @jwt_required()
+@load_current_user
 def request_mentorship():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'student':
             return jsonify({'error': 'Only students can request mentorship'}), 403
@@ -166,6 +237,8 @@ def request_mentorship():
         db.session.add(mentorship_request)
         db.session.commit()
         
+        publish_event([mentor.user_id], 'mentorship_request', mentorship_request.to_dict())
+        
         return jsonify({
             'message': 'Mentorship request sent',
             'request': mentorship_request.to_dict()
@@ -177,14 +250,10 @@ def request_mentorship():
 
 @mentors_bp.route('/requests', methods=['GET'])
 @jwt_required()
+@load_current_user
 def get_mentorship_requests():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'mentor':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -192,32 +261,31 @@ def get_mentorship_requests():
         if not user.mentor_profile:
             return jsonify({'error': 'Mentor profile not found'}), 404
         
-        requests = MentorshipRequest.query.filter_by(
-            mentor_id=user.mentor_profile.id
-        ).order_by(MentorshipRequest.created_at.desc()).all()
-        
-        result = []
-        for req in requests:
-            req_data = req.to_dict()
-            req_data['student_user'] = req.student.user.to_dict()
-            req_data['student_profile'] = req.student.to_dict()
-            result.append(req_data)
+        query = (
+            REQUEST_LIST.query()
+            .select_from(MentorshipRequest)
+            .join(Student, MentorshipRequest.student_id == Student.id)
+            .join(User, Student.user_id == User.id)
+            .filter(MentorshipRequest.mentor_id == user.mentor_profile.id)
+        )
+        status = request.args.get('status')
+        if status:
+            query = query.filter(MentorshipRequest.status == status)
+        rows, next_cursor = paginate(query, MentorshipRequest.created_at, MentorshipRequest.id)
         
-        return jsonify({'requests': result}), 200
+        return jsonify({'requests': REQUEST_LIST.dump(rows), 'next_cursor': next_cursor}), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @mentors_bp.route('/requests/<int:request_id>', methods=['PUT'])
 @jwt_required()
+@load_current_user
 def respond_to_request(request_id):
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'mentor':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -239,6 +307,8 @@ def respond_to_request(request_id):
         mentorship_request.status = status
         db.session.commit()
         
+        publish_event([mentorship_request.student.user_id], 'mentorship_request', mentorship_request.to_dict())
+        
         return jsonify({
             'message': f'Request {status}',
             'request': mentorship_request.to_dict()
@@ -250,14 +320,10 @@ def respond_to_request(request_id):
 
 @mentors_bp.route('/resources', methods=['GET', 'POST'])
 @jwt_required()
+@load_current_user
 def mentor_resources():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'mentor':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -266,12 +332,14 @@ def mentor_resources():
             return jsonify({'error': 'Mentor profile not found'}), 404
         
         if request.method == 'GET':
-            resources = Resource.query.filter_by(
-                mentor_id=user.mentor_profile.id
-            ).order_by(Resource.upload_date.desc()).all()
+            resources, next_cursor = paginate(
+                Resource.query.filter_by(mentor_id=user.mentor_profile.id),
+                Resource.upload_date, Resource.id
+            )
             
             return jsonify({
-                'resources': [r.to_dict() for r in resources]
+                'resources': [r.to_dict() for r in resources],
+                'next_cursor': next_cursor
             }), 200
         
         elif request.method == 'POST':
@@ -294,6 +362,129 @@ def mentor_resources():
                 'resource': resource.to_dict()
             }), 201
             
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _date_range():
+    # ?start=&end= as ISO datetimes; defaults to the next MAX_SLOT_RANGE
+    start = parse_datetime(request.args['start'], 'start') if request.args.get('start') else datetime.utcnow()
+    end = parse_datetime(request.args['end'], 'end') if request.args.get('end') else start + MAX_SLOT_RANGE
+    if end <= start:
+        raise SchedulingError('end must be after start')
+    return start, end
+
+@mentors_bp.route('/availability', methods=['GET', 'POST'])
+@jwt_required()
+@load_current_user
+def mentor_availability():
+    try:
+        user = g.current_user
+        
+        if not user or user.role != 'mentor':
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        if not user.mentor_profile:
+            return jsonify({'error': 'Mentor profile not found'}), 404
+        
+        mentor_id = user.mentor_profile.id
+        
+        if request.method == 'GET':
+            start, end = _date_range()
+            windows = MentorAvailability.query.filter(
+                MentorAvailability.mentor_id == mentor_id,
+                MentorAvailability.start_time > start - MAX_WINDOW,
+                MentorAvailability.start_time < end,
+                MentorAvailability.end_time > start
+            ).order_by(MentorAvailability.start_time).all()
+            
+            return jsonify({'windows': [w.to_dict() for w in windows]}), 200
+        
+        elif request.method == 'POST':
+            data = request.get_json() or {}
+            
+            windows = []
+            for item in data.get('windows') or []:
+                start = parse_datetime(item.get('start_time'), 'start_time')
+                end = parse_datetime(item.get('end_time'), 'end_time')
+                if end <= start or end - start > MAX_WINDOW:
+                    return jsonify({
+                        'error': f'Each window must end after it starts and last at most {int(MAX_WINDOW.total_seconds() // 3600)} hours'
+                    }), 400
+                windows.append(MentorAvailability(mentor_id=mentor_id, start_time=start, end_time=end))
+            
+            if not windows:
+                return jsonify({'error': 'windows required'}), 400
+            
+            db.session.add_all(windows)
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Availability added',
+                'windows': [w.to_dict() for w in windows]
+            }), 201
+            
+    except SchedulingError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@mentors_bp.route('/availability/<int:window_id>', methods=['DELETE'])
+@jwt_required()
+@load_current_user
+def delete_availability(window_id):
+    try:
+        user = g.current_user
+        
+        if not user or user.role != 'mentor' or not user.mentor_profile:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        window = db.session.get(MentorAvailability, window_id)
+        
+        if not window:
+            return jsonify({'error': 'Availability window not found'}), 404
+        
+        if window.mentor_id != user.mentor_profile.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        db.session.delete(window)
+        db.session.commit()
+        
+        return jsonify({'message': 'Availability removed'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@mentors_bp.route('/<int:mentor_id>/slots', methods=['GET'])
+@jwt_required()
+def get_free_slots(mentor_id):
+    # Open intervals inside the mentor's availability, minus booked sessions
+    try:
+        start, end = _date_range()
+        try:
+            duration = int(request.args.get('duration_minutes', DEFAULT_SESSION_MINUTES))
+        except ValueError:
+            duration = 0
+        if not 0 < duration <= MAX_SESSION_MINUTES:
+            return jsonify({'error': f'duration_minutes must be between 1 and {MAX_SESSION_MINUTES}'}), 400
+        
+        if db.session.get(Mentor, mentor_id) is None:
+            return jsonify({'error': 'Mentor not found'}), 404
+        
+        slots = free_slots(mentor_id, start, end, duration)
+        
+        return jsonify({
+            'mentor_id': mentor_id,
+            'duration_minutes': duration,
+            'slots': [{'start_time': s.isoformat(), 'end_time': e.isoformat()} for s, e in slots]
+        }), 200
+        
+    except SchedulingError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
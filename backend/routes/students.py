@@ -1,21 +1,24 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required
 from models import db, User, Student, CareerAssessment, ProgressTracker, Mentor, MentorshipRequest
+from pagination import paginate, PaginationError
+from user_loader import load_current_user
+from etags import profile_etag, etag_matches, etag_response, not_modified
+from json_patch import (
+    parse_operations, sqlite_update_values, postgresql_update_values, apply_operations, JsonPatchError
+)
+from scoring import QUESTIONNAIRE, public_questionnaire, score_answers
+from datetime import datetime
 import uuid
-import json
 
 students_bp = Blueprint('students', __name__)
 
 @students_bp.route('/profile', methods=['GET', 'PUT'])
 @jwt_required()
+@load_current_user
 def student_profile():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'student':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -24,10 +27,14 @@ def student_profile():
             if not user.student_profile:
                 return jsonify({'error': 'Profile not found'}), 404
             
-            return jsonify({
+            etag = profile_etag(user, user.student_profile)
+            if etag_matches(etag):
+                return not_modified(etag)
+            
+            return etag_response({
                 'user': user.to_dict(),
                 'profile': user.student_profile.to_dict()
-            }), 200
+            }, etag)
         
         elif request.method == 'PUT':
             data = request.get_json()
@@ -66,14 +73,10 @@ def student_profile():
 
 @students_bp.route('/assessment', methods=['POST'])
 @jwt_required()
+@load_current_user
 def create_assessment():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'student':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -81,15 +84,23 @@ def create_assessment():
         if not user.student_profile:
             return jsonify({'error': 'Student profile not found'}), 404
         
-        data = request.get_json()
+        data = request.get_json() or {}
+        
+        # Older clients send their answers as 'results'
+        answers = data.get('answers', data.get('results'))
+        if not isinstance(answers, dict):
+            return jsonify({'error': 'answers must be an object of question id -> answer'}), 400
+        
+        results, recommendations = score_answers(answers)
         
         # Create assessment
         assessment = CareerAssessment(
             student_id=user.student_profile.id,
             assessment_id=str(uuid.uuid4()),
-            questionnaire=json.dumps(data.get('questionnaire', {})),
-            results=json.dumps(data.get('results', {})),
-            recommendations=json.dumps(data.get('recommendations', []))
+            questionnaire_version=QUESTIONNAIRE['version'],
+            answers=answers,
+            results=results,
+            recommendations=recommendations
         )
         
         db.session.add(assessment)
@@ -104,16 +115,17 @@ def create_assessment():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@students_bp.route('/assessment/questionnaire', methods=['GET'])
+@jwt_required()
+def get_questionnaire():
+    return jsonify({'questionnaire': public_questionnaire()}), 200
+
 @students_bp.route('/assessments', methods=['GET'])
 @jwt_required()
+@load_current_user
 def get_assessments():
     try:
-        user_id = get_jwt_identity()
-        try:
-            user_id = int(user_id)
-        except (TypeError, ValueError):
-            return jsonify({'error': 'Invalid token identity'}), 422
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'student':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -121,23 +133,27 @@ def get_assessments():
         if not user.student_profile:
             return jsonify({'error': 'Student profile not found'}), 404
         
-        assessments = CareerAssessment.query.filter_by(
-            student_id=user.student_profile.id
-        ).order_by(CareerAssessment.created_at.desc()).all()
+        assessments, next_cursor = paginate(
+            CareerAssessment.query.filter_by(student_id=user.student_profile.id),
+            CareerAssessment.created_at, CareerAssessment.id
+        )
         
         return jsonify({
-            'assessments': [a.to_dict() for a in assessments]
+            'assessments': [a.to_dict() for a in assessments],
+            'next_cursor': next_cursor
         }), 200
         
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @students_bp.route('/progress', methods=['GET', 'POST'])
 @jwt_required()
+@load_current_user
 def progress_tracker():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'student':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -146,12 +162,14 @@ def progress_tracker():
             return jsonify({'error': 'Student profile not found'}), 404
         
         if request.method == 'GET':
-            trackers = ProgressTracker.query.filter_by(
-                student_id=user.student_profile.id
-            ).order_by(ProgressTracker.updated_at.desc()).all()
+            trackers, next_cursor = paginate(
+                ProgressTracker.query.filter_by(student_id=user.student_profile.id),
+                ProgressTracker.created_at, ProgressTracker.id
+            )
             
             return jsonify({
-                'trackers': [t.to_dict() for t in trackers]
+                'trackers': [t.to_dict() for t in trackers],
+                'next_cursor': next_cursor
             }), 200
         
         elif request.method == 'POST':
@@ -160,8 +178,8 @@ def progress_tracker():
             tracker = ProgressTracker(
                 student_id=user.student_profile.id,
                 tracker_id=str(uuid.uuid4()),
-                goals=json.dumps(data.get('goals', [])),
-                milestones=json.dumps(data.get('milestones', []))
+                goals=data.get('goals', []),
+                milestones=data.get('milestones', [])
             )
             
             db.session.add(tracker)
@@ -172,16 +190,18 @@ def progress_tracker():
                 'tracker': tracker.to_dict()
             }), 201
             
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @students_bp.route('/progress/<tracker_id>', methods=['PUT'])
 @jwt_required()
+@load_current_user
 def update_progress(tracker_id):
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = g.current_user
         
         if not user or user.role != 'student':
             return jsonify({'error': 'Unauthorized'}), 403
@@ -197,9 +217,59 @@ def update_progress(tracker_id):
         data = request.get_json()
         
         if 'goals' in data:
-            tracker.goals = json.dumps(data['goals'])
+            tracker.goals = data['goals']
         if 'milestones' in data:
-            tracker.milestones = json.dumps(data['milestones'])
+            tracker.milestones = data['milestones']
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Progress updated',
+            'tracker': tracker.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@students_bp.route('/progress/<tracker_id>', methods=['PATCH'])
+@jwt_required()
+@load_current_user
+def patch_progress(tracker_id):
+    """Update individual goal or milestone entries, e.g.
+    {"operations": [{"op": "replace", "path": "/milestones/2/completed", "value": true}]}"""
+    try:
+        user = g.current_user
+        
+        if not user or user.role != 'student' or not user.student_profile:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        data = request.get_json() or {}
+        operations = parse_operations(data.get('operations'), ('goals', 'milestones'))
+        owned = ProgressTracker.query.filter_by(
+            tracker_id=tracker_id, student_id=user.student_profile.id
+        )
+        
+        update_values = {
+            'sqlite': sqlite_update_values, 'postgresql': postgresql_update_values
+        }.get(db.engine.dialect.name)
+        if update_values:
+            # One UPDATE edits the stored JSON; the blob never round-trips
+            values = update_values(ProgressTracker, operations)
+            values[ProgressTracker.updated_at] = datetime.utcnow()
+            updated = owned.update(values, synchronize_session=False)
+            tracker = owned.populate_existing().first() if updated else None
+        else:
+            tracker = owned.with_for_update().first()
+            if tracker:
+                apply_operations(tracker, operations)
+                tracker.updated_at = datetime.utcnow()
+        
+        if not tracker:
+            db.session.rollback()
+            if ProgressTracker.query.filter_by(tracker_id=tracker_id).first() is None:
+                return jsonify({'error': 'Tracker not found'}), 404
+            return jsonify({'error': 'Unauthorized'}), 403
         
         db.session.commit()
         
@@ -208,6 +278,8 @@ def update_progress(tracker_id):
             'tracker': tracker.to_dict()
         }), 200
         
+    except JsonPatchError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,133 @@
+"""Mentor availability, booking conflicts and free slots.
+
+Sessions store their end time, and both sessions and availability windows
+have a bounded length. That bound turns "does anything overlap [start, end)"
+into an index range scan on ``(mentor_id, start)``: an overlapping row must
+start after ``start - max length`` and before ``end``. Conflict checks and
+free-slot lookups therefore read only the rows near the requested range,
+however long the mentor's history is.
+
+All times are naive UTC, like the rest of the schema.
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from models import db, Session, MentorAvailability
+
+DEFAULT_SESSION_MINUTES = 60
+MAX_SESSION_MINUTES = 240
+MAX_WINDOW = timedelta(hours=24)
+MAX_SLOT_RANGE = timedelta(days=31)
+
+# Statuses that no longer hold the mentor's time
+INACTIVE_STATUSES = ('cancelled',)
+
+
+class SchedulingError(ValueError):
+    pass
+
+
+def parse_datetime(value, name='date_time'):
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise SchedulingError(f'Invalid {name} format')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def session_end(start, duration_minutes=None):
+    minutes = DEFAULT_SESSION_MINUTES if duration_minutes is None else duration_minutes
+    if not isinstance(minutes, int) or isinstance(minutes, bool) or not 0 < minutes <= MAX_SESSION_MINUTES:
+        raise SchedulingError(f'duration_minutes must be between 1 and {MAX_SESSION_MINUTES}')
+    return start + timedelta(minutes=minutes)
+
+
+def _overlapping_sessions(mentor_id, start, end):
+    return select(Session.id, Session.date_time, Session.end_time).where(
+        Session.mentor_id == mentor_id,
+        Session.date_time > start - timedelta(minutes=MAX_SESSION_MINUTES),
+        Session.date_time < end,
+        Session.end_time > start,
+        Session.status.notin_(INACTIVE_STATUSES)
+    ).order_by(Session.date_time)
+
+
+def _overlapping_windows(mentor_id, start, end):
+    return select(MentorAvailability.start_time, MentorAvailability.end_time).where(
+        MentorAvailability.mentor_id == mentor_id,
+        MentorAvailability.start_time > start - MAX_WINDOW,
+        MentorAvailability.start_time < end,
+        MentorAvailability.end_time > start
+    ).order_by(MentorAvailability.start_time)
+
+
+def find_conflict(mentor_id, start, end, exclude_id=None):
+    """Return the id of an active session of the mentor overlapping
+    [start, end), or None."""
+    query = _overlapping_sessions(mentor_id, start, end)
+    if exclude_id is not None:
+        query = query.where(Session.id != exclude_id)
+    return db.session.execute(query.limit(1)).scalar()
+
+
+def _merge(intervals):
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _publishes_availability(mentor_id):
+    return db.session.execute(
+        select(MentorAvailability.id).where(MentorAvailability.mentor_id == mentor_id).limit(1)
+    ).first() is not None
+
+
+def within_availability(mentor_id, start, end):
+    """True if the mentor publishes no availability at all, or [start, end)
+    lies inside their (merged) windows."""
+    windows = db.session.execute(_overlapping_windows(mentor_id, start, end)).all()
+    if not windows:
+        return not _publishes_availability(mentor_id)
+    return any(s <= start and end <= e for s, e in _merge(windows))
+
+
+def free_slots(mentor_id, start, end, min_minutes=DEFAULT_SESSION_MINUTES):
+    """Open intervals of at least ``min_minutes`` inside the mentor's
+    availability between ``start`` and ``end``. A mentor who publishes no
+    availability is bookable at any time (see ``within_availability``), so
+    their whole range is one window."""
+    if end <= start:
+        raise SchedulingError('end must be after start')
+    if end - start > MAX_SLOT_RANGE:
+        raise SchedulingError(f'range must be at most {MAX_SLOT_RANGE.days} days')
+    windows = _merge(
+        (max(s, start), min(e, end))
+        for s, e in db.session.execute(_overlapping_windows(mentor_id, start, end))
+    )
+    if not windows and not _publishes_availability(mentor_id):
+        windows = [[start, end]]
+    busy = _merge(
+        (s, e) for _, s, e in db.session.execute(_overlapping_sessions(mentor_id, start, end))
+    )
+    minimum = timedelta(minutes=min_minutes)
+    slots = []
+    i = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        # Both lists are sorted, so each busy interval is visited once
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < window_end:
+            if busy[j][0] - cursor >= minimum:
+                slots.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if window_end - cursor >= minimum:
+            slots.append((cursor, window_end))
+    return slots
@@ -0,0 +1,247 @@
+"""Server-side scoring of career assessments.
+
+The questionnaire is declarative: every choice option, and every keyword in
+a free-text answer, adds weight to one or more traits. Career profiles are
+trait vectors too. Scoring a batch of assessments builds one
+(assessments x traits) matrix and ranks careers by cosine similarity with a
+single matrix product, so re-scoring the whole table is a chunked loop over
+that product.
+
+Bump ``SCORING_VERSION`` whenever the definitions below change, then run
+``flask rescore-assessments`` to recompute stored results.
+"""
+import re
+import click
+import numpy as np
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, select, update
+from models import db, CareerAssessment
+
+SCORING_VERSION = 1
+
+TRAITS = ('people', 'data', 'technical', 'creative', 'business', 'care', 'outdoor')
+
+QUESTIONNAIRE = {
+    'version': SCORING_VERSION,
+    'questions': [
+        {
+            'id': 1, 'text': 'What subjects interest you the most?', 'type': 'text',
+            'keywords': {
+                'math': {'data': 2, 'technical': 1}, 'statistics': {'data': 2},
+                'computer': {'technical': 2}, 'programming': {'technical': 2}, 'science': {'data': 1, 'technical': 1},
+                'biology': {'care': 1, 'data': 1}, 'health': {'care': 2}, 'medicine': {'care': 2},
+                'art': {'creative': 2}, 'design': {'creative': 2}, 'music': {'creative': 2}, 'writing': {'creative': 1},
+                'economics': {'business': 2, 'data': 1}, 'business': {'business': 2}, 'finance': {'business': 2, 'data': 1},
+                'psychology': {'people': 2, 'care': 1}, 'history': {'people': 1}, 'languages': {'people': 1},
+                'environment': {'outdoor': 2}, 'geography': {'outdoor': 1}, 'agriculture': {'outdoor': 2},
+            },
+        },
+        {
+            'id': 2, 'text': 'Do you prefer working with people or data?', 'type': 'choice',
+            'options': {
+                'People': {'people': 3},
+                'Data': {'data': 3},
+                'Both': {'people': 1.5, 'data': 1.5},
+            },
+        },
+        {
+            'id': 3, 'text': 'What are your strongest skills?', 'type': 'text',
+            'keywords': {
+                'communication': {'people': 2}, 'leadership': {'people': 1, 'business': 1}, 'teamwork': {'people': 1},
+                'analysis': {'data': 2}, 'analytical': {'data': 2}, 'research': {'data': 1},
+                'coding': {'technical': 2}, 'problem': {'technical': 1, 'data': 1}, 'engineering': {'technical': 2},
+                'creativity': {'creative': 2}, 'drawing': {'creative': 2}, 'writing': {'creative': 1},
+                'negotiation': {'business': 2}, 'sales': {'business': 2}, 'organization': {'business': 1},
+                'empathy': {'care': 2, 'people': 1}, 'listening': {'care': 1, 'people': 1},
+            },
+        },
+        {
+            'id': 4, 'text': 'Where do you see yourself in 5 years?', 'type': 'text',
+            'keywords': {
+                'manager': {'business': 2, 'people': 1}, 'lead': {'people': 1, 'business': 1},
+                'startup': {'business': 2, 'technical': 1}, 'company': {'business': 1},
+                'engineer': {'technical': 2}, 'developer': {'technical': 2}, 'scientist': {'data': 2},
+                'teacher': {'people': 2, 'care': 1}, 'doctor': {'care': 3}, 'nurse': {'care': 3},
+                'designer': {'creative': 2}, 'artist': {'creative': 3},
+                'helping': {'care': 2}, 'outdoors': {'outdoor': 2},
+            },
+        },
+        {
+            'id': 5, 'text': 'What type of work environment do you prefer?', 'type': 'choice',
+            'options': {
+                'Office': {'business': 1, 'people': 0.5},
+                'Remote': {'technical': 1, 'data': 0.5},
+                'Hybrid': {'people': 0.5, 'technical': 0.5},
+                'Outdoor': {'outdoor': 3},
+            },
+        },
+    ],
+}
+
+CAREER_PROFILES = {
+    'Human Resources': {'people': 3, 'business': 1, 'care': 1},
+    'Teaching': {'people': 3, 'care': 2, 'creative': 1},
+    'Sales': {'people': 2, 'business': 3},
+    'Data Science': {'data': 3, 'technical': 2},
+    'Analytics': {'data': 3, 'business': 1},
+    'Research': {'data': 2, 'technical': 1, 'outdoor': 0.5},
+    'Software Engineering': {'technical': 3, 'data': 1},
+    'Design': {'creative': 3, 'technical': 1},
+    'Healthcare': {'care': 3, 'people': 2},
+    'Environmental Science': {'outdoor': 3, 'data': 1},
+    'Business Management': {'business': 3, 'people': 1},
+    'Marketing': {'business': 2, 'creative': 2, 'people': 1},
+    'Consulting': {'business': 2, 'data': 1, 'people': 1},
+}
+
+# Used when the answers carry no trait signal at all
+DEFAULT_RECOMMENDATIONS = ['Business Management', 'Marketing', 'Consulting']
+TOP_CAREERS = 3
+
+_TOKEN_RE = re.compile(r'[a-z]+')
+_TRAIT_INDEX = {trait: i for i, trait in enumerate(TRAITS)}
+_QUESTIONS = {str(q['id']): q for q in QUESTIONNAIRE['questions']}
+_CAREERS = list(CAREER_PROFILES)
+
+
+def _trait_vector(weights):
+    vector = np.zeros(len(TRAITS))
+    for trait, weight in weights.items():
+        vector[_TRAIT_INDEX[trait]] += weight
+    return vector
+
+
+def _normalise_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+_CAREER_MATRIX = _normalise_rows(np.array([_trait_vector(CAREER_PROFILES[c]) for c in _CAREERS]))
+_OPTION_VECTORS = {
+    (qid, option.lower()): _trait_vector(weights)
+    for qid, q in _QUESTIONS.items() if q['type'] == 'choice'
+    for option, weights in q['options'].items()
+}
+_KEYWORD_VECTORS = {
+    (qid, keyword): _trait_vector(weights)
+    for qid, q in _QUESTIONS.items() if q['type'] == 'text'
+    for keyword, weights in q['keywords'].items()
+}
+
+
+def public_questionnaire():
+    """The questionnaire as served to clients, without scoring weights."""
+    questions = []
+    for q in QUESTIONNAIRE['questions']:
+        question = {'id': q['id'], 'text': q['text'], 'type': q['type']}
+        if q['type'] == 'choice':
+            question['options'] = list(q['options'])
+        questions.append(question)
+    return {'version': QUESTIONNAIRE['version'], 'questions': questions}
+
+
+def answer_vector(answers):
+    """Trait totals for one ``{question id: answer}`` mapping."""
+    vector = np.zeros(len(TRAITS))
+    if not isinstance(answers, dict):
+        return vector
+    for qid, answer in answers.items():
+        qid = str(qid)
+        question = _QUESTIONS.get(qid)
+        if question is None or not isinstance(answer, str):
+            continue
+        if question['type'] == 'choice':
+            option = _OPTION_VECTORS.get((qid, answer.strip().lower()))
+            if option is not None:
+                vector += option
+        else:
+            for token in set(_TOKEN_RE.findall(answer.lower())):
+                # Plural keywords ('designs') match their singular
+                keyword = _KEYWORD_VECTORS.get((qid, token))
+                if keyword is None:
+                    keyword = _KEYWORD_VECTORS.get((qid, token.rstrip('s')))
+                if keyword is not None:
+                    vector += keyword
+    return vector
+
+
+def score_batch(answer_sets):
+    """Score many answer mappings at once.
+
+    Returns ``(results, recommendations)`` lists aligned with the input.
+    """
+    if not answer_sets:
+        return [], []
+    traits = np.array([answer_vector(answers) for answers in answer_sets])
+    similarity = _normalise_rows(traits) @ _CAREER_MATRIX.T
+    order = np.argsort(-similarity, axis=1, kind='stable')
+    peaks = traits.max(axis=1)
+    # Round and convert whole matrices at once; per-element float()/round()
+    # would dominate the cost of large batches
+    trait_shares = np.round(np.divide(
+        traits, peaks[:, None], out=np.zeros_like(traits), where=peaks[:, None] > 0
+    ), 4).tolist()
+    ranked_scores = np.round(np.take_along_axis(similarity, order, axis=1), 4).tolist()
+    order = order.tolist()
+
+    results, recommendations = [], []
+    for row, ranking in enumerate(order):
+        if peaks[row] <= 0:
+            careers = DEFAULT_RECOMMENDATIONS
+            scores = {}
+        else:
+            careers = [_CAREERS[i] for i in ranking[:TOP_CAREERS]]
+            scores = dict(zip((_CAREERS[i] for i in ranking), ranked_scores[row]))
+        results.append({
+            'scoring_version': SCORING_VERSION,
+            'traits': dict(zip(TRAITS, trait_shares[row])),
+            'career_scores': scores,
+        })
+        recommendations.append(list(careers))
+    return results, recommendations
+
+
+def score_answers(answers):
+    results, recommendations = score_batch([answers])
+    return results[0], recommendations[0]
+
+
+def rescore_assessments(chunk_size=1000):
+    """Recompute results and recommendations for every stored assessment.
+
+    Walks the table in primary-key order, ``chunk_size`` rows at a time, with
+    one executemany UPDATE and commit per chunk; yields the running count.
+    """
+    table = CareerAssessment.__table__
+    statement = update(table).where(table.c.id == bindparam('row_id')).values(
+        results=bindparam('results'), recommendations=bindparam('recommendations')
+    )
+    last_id = 0
+    done = 0
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.answers).where(table.c.id > last_id)
+            .order_by(table.c.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        results, recommendations = score_batch([row.answers for row in rows])
+        db.session.execute(statement, [
+            {'row_id': row.id, 'results': result, 'recommendations': recs}
+            for row, result, recs in zip(rows, results, recommendations)
+        ])
+        db.session.commit()
+        last_id = rows[-1].id
+        done += len(rows)
+        yield done
+
+
+@click.command('rescore-assessments')
+@click.option('--chunk-size', default=1000, show_default=True)
+@with_appcontext
+def rescore_assessments_command(chunk_size):
+    """Recompute every stored assessment with the current scoring rules."""
+    done = 0
+    for done in rescore_assessments(chunk_size):
+        click.echo(f'{done} assessments rescored', err=True)
+    click.echo(f'Rescored {done} assessments (scoring version {SCORING_VERSION})')
@@ -0,0 +1,159 @@
+"""Full-text search over mentor profiles.
+
+On SQLite the index is an FTS5 virtual table whose rowid is the mentor id.
+Other backends (or SQLite builds without FTS5) fall back to per-term ILIKE
+matching with a simple match-count relevance score.
+"""
+import re
+from flask import current_app
+from sqlalchemy import and_, case, column, literal, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import contains_eager, joinedload
+from models import db, User, Mentor
+
+FTS_TABLE = 'mentors_fts'
+FTS_COLUMNS = ('name', 'professional_title', 'industry', 'expertise', 'bio')
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts_table_exists():
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+    ).first() is not None
+
+
+def _fts_enabled():
+    # Looked up on first use rather than at startup; init_search_index
+    # (run by 'flask init-db') creates the table
+    enabled = current_app.extensions.get('mentor_fts')
+    if enabled is None:
+        enabled = db.engine.dialect.name == 'sqlite' and _fts_table_exists()
+        current_app.extensions['mentor_fts'] = enabled
+    return enabled
+
+
+def tokenize(value):
+    return _TOKEN_RE.findall(value or '')
+
+
+def _mentor_row(mentor):
+    return {
+        'rowid': mentor.id,
+        'name': mentor.user.name if mentor.user else '',
+        'professional_title': mentor.professional_title or '',
+        'industry': mentor.industry or '',
+        'expertise': mentor.expertise or '',
+        'bio': mentor.bio or ''
+    }
+
+
+def init_search_index():
+    # Create the FTS5 table on first run and fill it from the mentors table
+    enabled = False
+    if db.engine.dialect.name == 'sqlite':
+        try:
+            if not _fts_table_exists():
+                db.session.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    f"{', '.join(FTS_COLUMNS)}, tokenize = 'unicode61', prefix = '2 3')"
+                ))
+                current_app.extensions['mentor_fts'] = True
+                rebuild_search_index()
+            db.session.commit()
+            enabled = True
+        except OperationalError:
+            # SQLite compiled without FTS5
+            db.session.rollback()
+    current_app.extensions['mentor_fts'] = enabled
+
+
+def rebuild_search_index():
+    if not _fts_enabled():
+        return
+    db.session.execute(text(f'DELETE FROM {FTS_TABLE}'))
+    mentors = Mentor.query.options(joinedload(Mentor.user)).all()
+    if mentors:
+        db.session.execute(_insert_statement(), [_mentor_row(m) for m in mentors])
+
+
+def _insert_statement():
+    return text(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES (:rowid, {', '.join(':' + c for c in FTS_COLUMNS)})"
+    )
+
+
+def index_mentor(mentor):
+    # Call before commit so the index update shares the row's transaction
+    if not _fts_enabled():
+        return
+    if mentor.id is None:
+        db.session.flush()
+    db.session.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid = :rowid'), {'rowid': mentor.id})
+    db.session.execute(_insert_statement(), _mentor_row(mentor))
+
+
+def index_new_mentors(rows):
+    """Index mentors inserted in bulk; rows are dicts with ``rowid`` (the
+    mentor id) and the ``FTS_COLUMNS`` values."""
+    if not _fts_enabled() or not rows:
+        return
+    db.session.execute(_insert_statement(), [
+        {'rowid': row['rowid'], **{c: row.get(c) or '' for c in FTS_COLUMNS}} for row in rows
+    ])
+
+
+def remove_mentor(mentor_id):
+    if not _fts_enabled():
+        return
+    db.session.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid = :rowid'), {'rowid': mentor_id})
+
+
+def _fts_match(q, industry, expertise):
+    # Every token is quoted and prefix-matched; all clauses must match
+    clauses = ['"%s"*' % t for t in tokenize(q)]
+    clauses += ['industry : "%s"*' % t for t in tokenize(industry)]
+    clauses += ['expertise : "%s"*' % t for t in tokenize(expertise)]
+    return ' AND '.join(clauses)
+
+
+def _like(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def search_mentors(q=None, industry=None, expertise=None):
+    """Return a query of verified mentors (with users loaded) matching the
+    terms, best matches first."""
+    if _fts_enabled():
+        match = _fts_match(q, industry, expertise)
+        query = Mentor.query.options(joinedload(Mentor.user)).filter(
+            Mentor.verification_status == 'verified'
+        )
+        if not match:
+            return query.order_by(Mentor.id)
+        fts = table(FTS_TABLE, column('rowid'), column('rank'))
+        ranked = select(
+            fts.c.rowid.label('mentor_id'), fts.c.rank.label('rank')
+        ).where(text(f'{FTS_TABLE} MATCH :match').bindparams(match=match)).subquery()
+        return query.join(ranked, ranked.c.mentor_id == Mentor.id).order_by(ranked.c.rank, Mentor.id)
+
+    # Portable fallback: each term must appear in some indexed column
+    query = Mentor.query.join(Mentor.user).options(contains_eager(Mentor.user)).filter(
+        Mentor.verification_status == 'verified'
+    )
+    searchable = [User.name, Mentor.professional_title, Mentor.industry, Mentor.expertise, Mentor.bio]
+    conditions = []
+    score = literal(0)
+    for term in tokenize(q):
+        pattern = _like(term)
+        conditions.append(or_(*[col.ilike(pattern, escape='\\') for col in searchable]))
+        for col in searchable:
+            score = score + case((col.ilike(pattern, escape='\\'), 1), else_=0)
+    for col, value in ((Mentor.industry, industry), (Mentor.expertise, expertise)):
+        for term in tokenize(value):
+            conditions.append(col.ilike(_like(term), escape='\\'))
+    if not conditions:
+        return query.order_by(Mentor.id)
+    return query.filter(and_(*conditions)).order_by(score.desc(), Mentor.id)
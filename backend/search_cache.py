@@ -0,0 +1,147 @@
+"""Bounded LRU/TTL cache of serialized mentor search responses.
+
+Entries are keyed by the normalized query (lower-cased token sets for ``q``,
+``industry`` and ``expertise``) and remember which mentors they contain.
+When a mentor changes, only entries that contained it, or whose terms could
+match its new profile, are dropped. A response computed by a request that
+started before an invalidation is not stored, since it may have read the
+mentor's old row. The cache is per process; on other gunicorn workers
+``SEARCH_CACHE_TTL`` bounds how long a stale page lives.
+"""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from flask import current_app
+from search import tokenize
+
+
+def normalize_query(q=None, industry=None, expertise=None):
+    return tuple(
+        tuple(sorted({t.lower() for t in tokenize(value)}))
+        for value in (q, industry, expertise)
+    )
+
+
+def fold(value):
+    """Case- and accent-insensitive form of ``value``.
+
+    The FTS5 ``unicode61`` tokenizer removes diacritics, so ``resume``
+    matches ``Résumé``; this folds at least as much.
+    """
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _mentor_text(mentor):
+    user = mentor.user
+    return {
+        'any': fold(' '.join(filter(None, [
+            user.name if user else None, mentor.professional_title,
+            mentor.industry, mentor.expertise, mentor.bio
+        ]))),
+        'industry': fold(mentor.industry),
+        'expertise': fold(mentor.expertise),
+    }
+
+
+def _could_match(key, text):
+    # Containment of the folded term is looser than the FTS prefix match and
+    # the ILIKE fallback, so an entry the mentor now matches is dropped
+    q_terms, industry_terms, expertise_terms = key
+    return (
+        all(fold(t) in text['any'] for t in q_terms)
+        and all(fold(t) in text['industry'] for t in industry_terms)
+        and all(fold(t) in text['expertise'] for t in expertise_terms)
+    )
+
+
+class SearchCache:
+    def __init__(self, max_entries=256, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, mentor_ids, body)
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.discarded = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    @property
+    def generation(self):
+        """Read before querying and pass to ``set``."""
+        return self._generation
+
+    def set(self, key, mentor_ids, body, generation):
+        """Store ``body`` unless a mentor changed since ``generation``."""
+        with self._lock:
+            if generation != self._generation:
+                self.discarded += 1
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, frozenset(mentor_ids), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate_mentor(self, mentor_id, mentor=None):
+        """Drop entries affected by a change to ``mentor_id``.
+
+        ``mentor`` is its new state, or None if it was deleted.
+        """
+        text = _mentor_text(mentor) if mentor is not None and mentor.verification_status == 'verified' else None
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, (_, mentor_ids, _) in self._entries.items()
+                if mentor_id in mentor_ids or (text is not None and _could_match(key, text))
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'discarded': self.discarded
+            }
+
+
+def init_search_cache(app):
+    app.extensions['search_cache'] = SearchCache(
+        max_entries=app.config['SEARCH_CACHE_SIZE'], ttl=app.config['SEARCH_CACHE_TTL']
+    )
+
+
+def get_search_cache():
+    return current_app.extensions['search_cache']
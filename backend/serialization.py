@@ -0,0 +1,140 @@
+"""Column-projected serialization for list endpoints.
+
+A ``Schema`` maps response keys to the columns they are read from (or to a
+nested ``Schema`` for a nested object). ``Schema.query()`` selects only those
+columns, so rows come back as plain tuples instead of ORM objects: no
+identity map, no unused columns and no lazy loads. ``Schema.dump`` turns the
+rows into dicts.
+
+Datetimes are left as ``datetime`` objects; ``JSONProvider`` writes them as
+ISO 8601, the same text ``to_dict`` produces. It encodes with orjson when it
+is installed and falls back to the standard library otherwise.
+
+The model schemas below mirror each model's ``to_dict`` and must be kept in
+step with it; endpoints extend them with the joined columns they add.
+"""
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import aliased
+from models import db, User, Student, Mentor, Message, Session, MentorshipRequest
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Schema:
+    def __init__(self, **fields):
+        self.fields = fields
+        self._keys = tuple(fields)
+        self._nested = {name: value for name, value in fields.items() if isinstance(value, Schema)}
+        self.width = sum(value.width if name in self._nested else 1 for name, value in fields.items())
+
+    def extend(self, **fields):
+        return Schema(**self.fields, **fields)
+
+    def columns(self, prefix=''):
+        """The labelled columns to select, nested schemas flattened in place."""
+        columns = []
+        for name, value in self.fields.items():
+            if name in self._nested:
+                columns.extend(value.columns(f'{prefix}{name}__'))
+            else:
+                columns.append(value.label(prefix + name))
+        return columns
+
+    def query(self):
+        """A query selecting this schema's columns; add select_from, joins and filters."""
+        return db.session.query(*self.columns())
+
+    def dump_row(self, row):
+        if not self._nested:
+            return dict(zip(self._keys, row))
+        data = {}
+        index = 0
+        for name, value in self.fields.items():
+            if name in self._nested:
+                data[name] = value.dump_row(row[index:index + value.width])
+                index += value.width
+            else:
+                data[name] = row[index]
+                index += 1
+        return data
+
+    def dump(self, rows):
+        return [self.dump_row(row) for row in rows]
+
+
+USER = Schema(
+    id=User.id, user_id=User.user_id, name=User.name, email=User.email,
+    phone_number=User.phone_number, role=User.role, created_at=User.created_at
+)
+STUDENT = Schema(
+    id=Student.id, user_id=Student.user_id, educational_background=Student.educational_background,
+    career_interests=Student.career_interests, goals=Student.goals
+)
+MENTOR = Schema(
+    id=Mentor.id, user_id=Mentor.user_id, professional_title=Mentor.professional_title,
+    industry=Mentor.industry, verification_status=Mentor.verification_status,
+    bio=Mentor.bio, expertise=Mentor.expertise
+)
+MESSAGE = Schema(
+    id=Message.id, message_id=Message.message_id, sender_id=Message.sender_id,
+    receiver_id=Message.receiver_id, content=Message.content,
+    timestamp=Message.timestamp, read=Message.read
+)
+SESSION = Schema(
+    id=Session.id, session_id=Session.session_id, student_id=Session.student_id,
+    mentor_id=Session.mentor_id, date_time=Session.date_time, end_time=Session.end_time,
+    status=Session.status, notes=Session.notes, created_at=Session.created_at
+)
+MENTORSHIP_REQUEST = Schema(
+    id=MentorshipRequest.id, student_id=MentorshipRequest.student_id,
+    mentor_id=MentorshipRequest.mentor_id, status=MentorshipRequest.status,
+    message=MentorshipRequest.message, created_at=MentorshipRequest.created_at,
+    updated_at=MentorshipRequest.updated_at
+)
+
+# The users behind a row's student and mentor, for the names lists show
+StudentUser = aliased(User, name='student_user')
+MentorUser = aliased(User, name='mentor_user')
+
+SESSION_LIST = SESSION.extend(student_name=StudentUser.name, mentor_name=MentorUser.name)
+
+
+def session_list_query():
+    return (
+        SESSION_LIST.query()
+        .select_from(Session)
+        .join(Student, Session.student_id == Student.id)
+        .join(StudentUser, Student.user_id == StudentUser.id)
+        .join(Mentor, Session.mentor_id == Mentor.id)
+        .join(MentorUser, Mentor.user_id == MentorUser.id)
+    )
+
+
+def _default(value):
+    # Flask's provider writes dates as HTTP dates; to_dict uses ISO 8601
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+class JSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,121 @@
+"""Slow-query log and N+1 detector.
+
+Every SQL statement a request runs is reduced to a fingerprint: its text
+with literals and expanded ``IN (...)`` lists collapsed, so the statements a
+lazy relationship issues for each row share one fingerprint. When a request
+runs the same fingerprint more than ``N_PLUS_ONE_THRESHOLD`` times, a warning
+names the route, the statement and where it was issued. With
+``N_PLUS_ONE_STRICT`` the request raises ``NPlusOneError`` instead, so tests
+and development servers fail loudly.
+
+Statements slower than ``SLOW_QUERY_MS`` are logged with the route and a
+stack excerpt whether or not they run in a request.
+
+Only the view itself is checked; streamed response bodies (exports, the
+event stream) are not.
+"""
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+STACK_FRAMES = 6
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_NAMED_PARAM = re.compile(r'(?:%\(\w+\)s|:\w+|\$\d+|%s)')
+_SPACE = re.compile(r'\s+')
+
+# Frames from these paths are library internals, not the code that issued the query
+_SKIPPED_PATHS = (os.path.dirname(os.__file__), 'site-packages', os.path.abspath(__file__))
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+def fingerprint(statement):
+    """The statement's shape: parameters, literals and IN lists collapsed."""
+    shape = _STRING.sub('?', statement)
+    shape = _NAMED_PARAM.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def stack_excerpt(frames=STACK_FRAMES):
+    """The innermost application frames as ``file:line in function`` lines."""
+    stack = [
+        frame for frame in traceback.extract_stack()
+        if not any(path in frame.filename for path in _SKIPPED_PATHS)
+    ]
+    return '\n'.join(
+        f'  {os.path.relpath(frame.filename)}:{frame.lineno} in {frame.name}' for frame in stack[-frames:]
+    )
+
+
+def _route():
+    if has_request_context():
+        return f'{request.method} {request.path} ({request.endpoint})'
+    return '(no request)'
+
+
+def _start_request():
+    g.sql_fingerprints = Counter()
+    g.sql_repeat_stacks = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.monitor_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'monitor_started', None)
+    if started is None or not has_app_context():
+        return
+    config = current_app.config
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if config['SLOW_QUERY_MS'] and elapsed_ms >= config['SLOW_QUERY_MS']:
+        current_app.logger.warning(
+            'Slow query (%.0f ms) in %s:\n  %s\n%s',
+            elapsed_ms, _route(), _SPACE.sub(' ', statement)[:500], stack_excerpt()
+        )
+    if has_request_context() and 'sql_fingerprints' in g:
+        shape = fingerprint(statement)
+        g.sql_fingerprints[shape] += 1
+        threshold = config['N_PLUS_ONE_THRESHOLD']
+        if threshold and g.sql_fingerprints[shape] == threshold + 1:
+            # Captured once per shape, only when it crosses the threshold
+            g.sql_repeat_stacks[shape] = stack_excerpt()
+
+
+def _finish_request(response):
+    fingerprints = g.pop('sql_fingerprints', None)
+    stacks = g.pop('sql_repeat_stacks', None)
+    if not stacks:
+        return response
+    report = '\n'.join(
+        f'{fingerprints[shape]}x {shape[:300]}\n{stack}' for shape, stack in stacks.items()
+    )
+    message = f'Possible N+1 queries in {_route()}:\n{report}'
+    if current_app.config['N_PLUS_ONE_STRICT']:
+        raise NPlusOneError(message)
+    current_app.logger.warning(message)
+    return response
+
+
+def init_sql_monitor(app):
+    if not app.config['SLOW_QUERY_MS'] and not app.config['N_PLUS_ONE_THRESHOLD']:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
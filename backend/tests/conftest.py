@@ -0,0 +1,112 @@
+"""Shared fixtures: each test gets a fresh app on its own in-memory database.
+
+Run from the backend directory with ``python -m pytest``.
+"""
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Read by Config when it is imported, so set before the app is
+os.environ['DATABASE_URL'] = 'sqlite://'
+# Hashing cost is not what the tests exercise
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+# A request repeating one statement shape fails instead of logging a warning
+os.environ['N_PLUS_ONE_STRICT'] = 'true'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import create_app  # noqa: E402
+from counters import recompute_counters  # noqa: E402
+from migrations import init_db  # noqa: E402
+from models import db, User, Student, Mentor, Message, Session, MentorshipRequest  # noqa: E402
+from search import rebuild_search_index  # noqa: E402
+
+
+class StatementCounter:
+    """Records the SQL statements sent through an engine."""
+
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def reset(self):
+        del self.statements[:]
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def make_app():
+    """Factory for independent apps, each with its own empty database."""
+    def factory():
+        app = create_app()
+        with app.app_context():
+            init_db()
+            db.session.remove()
+        return app
+    return factory
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def auth_header(app, user_id):
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _user(role, name):
+    return User(user_id=str(uuid.uuid4()), name=name, email=f'{name}@test.local', password_hash='-', role=role)
+
+
+def seed(n):
+    """``n`` mentors (half pending) and students, each student with a message,
+    a session and a request to the first mentor."""
+    mentors = [
+        Mentor(user=_user('mentor', f'mentor{i}'), industry='Technology', expertise='python',
+               verification_status='verified' if i % 2 else 'pending')
+        for i in range(n)
+    ]
+    students = [Student(user=_user('student', f'student{i}'), career_interests='software') for i in range(n)]
+    db.session.add_all(mentors + students)
+    db.session.flush()
+    start = datetime(2030, 1, 1)
+    for i, student in enumerate(students):
+        mentor = mentors[0]
+        db.session.add_all([
+            Message(message_id=str(uuid.uuid4()), sender_id=student.id, receiver_id=mentor.id,
+                    content=f'message {i}', timestamp=start + timedelta(minutes=i)),
+            Session(session_id=str(uuid.uuid4()), student_id=student.id, mentor_id=mentors[i].id,
+                    date_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i, minutes=60)),
+            MentorshipRequest(student_id=student.id, mentor_id=mentor.id),
+        ])
+        # Give the first student every session and message too
+        if i:
+            db.session.add(Message(message_id=str(uuid.uuid4()), sender_id=students[0].id,
+                                   receiver_id=mentors[i].id, content='hello',
+                                   timestamp=start + timedelta(minutes=i)))
+            db.session.add(Session(session_id=str(uuid.uuid4()), student_id=students[0].id,
+                                   mentor_id=mentors[i].id, date_time=start + timedelta(days=1, hours=i)))
+    db.session.commit()
+    recompute_counters()
+    rebuild_search_index()
+    db.session.commit()
+    admin = User.query.filter_by(role='admin').first()
+    return {'admin': admin.id, 'mentor': mentors[0].user_id, 'student': students[0].user_id}
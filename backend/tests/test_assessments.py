@@ -0,0 +1,25 @@
+"""Assessments store the answers and the questionnaire version, not the questions."""
+from conftest import auth_header
+from models import db, CareerAssessment
+from scoring import QUESTIONNAIRE
+
+
+def test_assessment_records_the_questionnaire_version(app, client):
+    response = client.post('/api/auth/register', json={
+        'name': 'Student', 'email': 'student@test.local', 'password': 'password', 'role': 'student'
+    })
+    headers = auth_header(app, response.get_json()['user']['id'])
+    response = client.post('/api/students/assessment', headers=headers, json={
+        'answers': {'1': 'programming', '2': 'Data'},
+        # Older clients also sent the questions; they are not stored
+        'questionnaire': {'questions': ['What subjects interest you the most?']},
+    })
+    assert response.status_code == 201
+    assessment = response.get_json()['assessment']
+    assert (assessment['questionnaire'], assessment['questionnaire_version']) == (None, QUESTIONNAIRE['version'])
+    with app.app_context():
+        row = db.session.get(CareerAssessment, assessment['id'])
+        assert (row.questionnaire, row.answers) == (None, {'1': 'programming', '2': 'Data'})
+
+    questionnaire = client.get('/api/students/assessment/questionnaire', headers=headers).get_json()['questionnaire']
+    assert questionnaire['version'] == QUESTIONNAIRE['version']
@@ -0,0 +1,41 @@
+"""Bad rows are reported one by one and do not fail the rest of their batch."""
+import io
+import json
+from bulk_import import import_users, read_records
+from models import User
+
+
+def run_import(app, records):
+    stream = io.BytesIO('\n'.join(json.dumps(record) for record in records).encode())
+    with app.test_request_context():
+        return list(import_users(read_records(stream, 'ndjson')))
+
+
+def test_invalid_fields_fail_only_their_row(app):
+    def row(name, **fields):
+        return {'name': name, 'email': f'{name}@test.local', 'role': 'mentor', **fields}
+
+    report = run_import(app, [
+        row('good', phone_number='+1 555 0100', bio='Mentor'),
+        row('longphone', phone_number='1' * 21),
+        row('listbio', bio=['a', 'b']),
+        row('objectindustry', industry={'name': 'Tech'}),
+        row('numberphone', phone_number=5550100),
+        row('longtitle', professional_title='x' * 101),
+        {'name': 'student', 'email': 'student@test.local', 'role': 'student', 'goals': {'a': 1}},
+        # Fields of the other role are ignored, as on insert
+        {'name': 'ignored', 'email': 'ignored@test.local', 'role': 'student', 'bio': ['a']},
+    ])
+
+    errors = {entry['email']: entry['error'] for entry in report if entry['type'] == 'error'}
+    assert errors == {
+        'longphone@test.local': 'phone_number must be at most 20 characters',
+        'listbio@test.local': 'bio must be a string',
+        'objectindustry@test.local': 'industry must be a string',
+        'numberphone@test.local': 'phone_number must be a string',
+        'longtitle@test.local': 'professional_title must be at most 100 characters',
+        'student@test.local': 'goals must be a string',
+    }
+    assert report[-1]['created'] == 2
+    with app.app_context():
+        assert {u.email for u in User.query.filter(User.role != 'admin')} == {'good@test.local', 'ignored@test.local'}
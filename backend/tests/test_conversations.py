@@ -0,0 +1,48 @@
+"""Conversations page over partners, newest first, each with its last message."""
+import uuid
+from datetime import datetime, timedelta
+from conftest import auth_header
+from models import db, User, Message, Mentor, Student
+
+START = datetime(2030, 1, 1)
+
+
+def user(role, name):
+    return User(user_id=str(uuid.uuid4()), name=name, email=f'{name}@test.local', password_hash='-', role=role)
+
+
+def test_conversations_page_over_partners(app, client):
+    with app.app_context():
+        mentor = Mentor(user=user('mentor', 'mentor'), verification_status='verified')
+        students = [Student(user=user('student', f'student{i}')) for i in range(3)]
+        db.session.add_all([mentor, *students])
+        db.session.flush()
+
+        def message(student, minutes, content, read=False):
+            db.session.add(Message(message_id=str(uuid.uuid4()), sender_id=student.id, receiver_id=mentor.id,
+                                   content=content, timestamp=START + timedelta(minutes=minutes), read=read))
+            db.session.flush()
+
+        message(students[0], 0, 'old', read=True)
+        message(students[0], 30, 'first')
+        message(students[1], 10, 'middle')
+        message(students[2], 20, 'tie 1', read=True)
+        # Same time as the previous one; the later row is the last message
+        message(students[2], 20, 'tie 2')
+        db.session.commit()
+        headers = auth_header(app, mentor.user_id)
+        student_ids = [s.id for s in students]
+
+    pages, cursor = [], None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/api/communications/conversations', query_string=params, headers=headers).get_json()
+        pages.append([(c['partner_id'], c['partner_name'], c['unread'], c['last_message']['content'])
+                      for c in page['conversations']])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert pages == [
+        [(student_ids[0], 'student0', 1, 'first'), (student_ids[2], 'student2', 1, 'tie 2')],
+        [(student_ids[1], 'student1', 1, 'middle')],
+    ]
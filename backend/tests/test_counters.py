@@ -0,0 +1,83 @@
+"""The incrementally maintained counters agree with a full recount."""
+import io
+import json
+from sqlalchemy import insert
+from bulk_import import import_users, read_records
+from conftest import auth_header
+from counters import adjust_counters, read_counters, recompute_counters
+from models import db, User, StatCounter
+
+
+def nonzero(counters):
+    return {name: value for name, value in counters.items() if value}
+
+
+def assert_counters_match(app):
+    with app.app_context():
+        maintained = nonzero(read_counters())
+        recounted = nonzero(recompute_counters())
+        db.session.rollback()
+    assert maintained == recounted
+
+
+def register(client, name, role):
+    response = client.post('/api/auth/register', json={
+        'name': name, 'email': f'{name}@test.local', 'password': 'password', 'role': role
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['user']['id']
+
+
+def test_counters_follow_row_changes(app, client):
+    with app.app_context():
+        admin = auth_header(app, User.query.filter_by(role='admin').one().id)
+    student = register(client, 'student', 'student')
+    leaving = register(client, 'leaving', 'student')
+    mentors = [register(client, f'mentor{i}', 'mentor') for i in range(3)]
+    assert_counters_match(app)
+
+    assert client.put('/api/admin/mentors/verify/1', headers=admin, json={'status': 'verified'}).status_code == 200
+    assert client.put('/api/admin/mentors/verify/2', headers=admin, json={'status': 'rejected'}).status_code == 200
+    headers = auth_header(app, student)
+    client.post('/api/communications/messages', headers=headers, json={'receiver_id': 1, 'content': 'hi'})
+    assert client.post('/api/mentors/request', headers=headers, json={'mentor_id': 1}).status_code == 201
+    session = client.post('/api/communications/sessions', headers=headers,
+                          json={'mentor_id': 1, 'date_time': '2030-01-01T10:00:00'}).get_json()['session']
+    client.put(f'/api/communications/sessions/{session["id"]}', headers=auth_header(app, mentors[0]),
+               json={'status': 'scheduled'})
+    response = client.put('/api/mentors/requests/1', headers=auth_header(app, mentors[0]), json={'status': 'approved'})
+    assert response.status_code == 200
+    headers = auth_header(app, leaving)
+    client.post('/api/communications/messages', headers=headers, json={'receiver_id': 1, 'content': 'hi'})
+    client.post('/api/communications/sessions', headers=headers,
+                json={'mentor_id': 1, 'date_time': '2030-01-02T10:00:00'})
+    assert_counters_match(app)
+
+    with app.app_context():
+        db.session.get(User, mentors[2]).role = 'student'
+        db.session.commit()
+    assert client.delete(f'/api/admin/users/{mentors[1]}', headers=admin).status_code == 200
+    assert client.delete(f'/api/admin/users/{leaving}', headers=admin).status_code == 200
+    assert_counters_match(app)
+
+
+def test_counters_follow_bulk_import(app):
+    lines = [
+        {'name': 'Imported Student', 'email': 'imported.student@test.local', 'role': 'student'},
+        {'name': 'Imported Mentor', 'email': 'imported.mentor@test.local', 'role': 'mentor', 'password': 'pw'},
+        {'name': 'Bad Row', 'email': 'bad', 'role': 'student'},
+    ]
+    stream = io.BytesIO('\n'.join(json.dumps(line) for line in lines).encode())
+    with app.test_request_context():
+        report = list(import_users(read_records(stream, 'ndjson'), batch_size=2))
+    assert report[-1]['created'] == 2
+    assert_counters_match(app)
+
+
+def test_first_write_creates_the_counter(app):
+    with app.app_context():
+        db.session.execute(insert(StatCounter.__table__).values(name='existing', value=1))
+        adjust_counters(db.session.connection(), {'new': 1, 'existing': 2})
+        adjust_counters(db.session.connection(), {'new': 1, 'zero': 0})
+        counters = read_counters()
+    assert (counters['new'], counters['existing'], 'zero' in counters) == (2, 3, False)
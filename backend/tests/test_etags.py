@@ -0,0 +1,16 @@
+"""If-None-Match uses the weak comparison, so rewritten ETags still revalidate."""
+from conftest import auth_header
+from models import User
+
+
+def test_weak_and_wildcard_if_none_match(app, client):
+    with app.app_context():
+        headers = auth_header(app, User.query.filter_by(role='admin').one().id)
+    response = client.get('/api/auth/me', headers=headers)
+    etag = response.headers['ETag']
+    assert not etag.startswith('W/')
+
+    for if_none_match in [etag, f'W/{etag}', f'"other", W/{etag}', '*']:
+        response = client.get('/api/auth/me', headers={**headers, 'If-None-Match': if_none_match})
+        assert response.status_code == 304, if_none_match
+    assert client.get('/api/auth/me', headers={**headers, 'If-None-Match': '"other"'}).status_code == 200
@@ -0,0 +1,50 @@
+"""Event brokers deliver each event of a user's channels once, in id order."""
+import time
+from datetime import datetime
+import pytest
+from sqlalchemy import insert
+from events import DatabaseBroker, MemoryBroker, user_channel
+from models import db, StreamEvent
+
+
+@pytest.fixture(params=['memory', 'database'])
+def broker(request, app):
+    with app.app_context():
+        if request.param == 'memory':
+            yield MemoryBroker(app)
+        else:
+            yield DatabaseBroker(app, poll_interval=0.01)
+
+
+def test_reads_own_channels_in_order(broker):
+    mine, other = user_channel(1), user_channel(2)
+    first = broker.publish(mine, 'message', {'n': 1})
+    broker.publish(other, 'message', {'n': 2})
+    broker.publish(mine, 'session', {'n': 3})
+
+    events = broker.read({mine}, 0, 0)
+    assert [(e.event_type, e.data) for e in events] == [('message', {'n': 1}), ('session', {'n': 3})]
+    assert [e.data for e in broker.read({mine}, first, 0)] == [{'n': 3}]
+    assert broker.read({mine}, events[-1].id, 0.05) == []
+
+
+def test_database_broker_waits_for_late_commits(app):
+    app.config['EVENT_VISIBILITY_LAG_MS'] = 200
+    channel = user_channel(1)
+    row = dict(channel=channel, event_type='message', data='{}')
+    with app.app_context():
+        broker = DatabaseBroker(app, poll_interval=0.01)
+        # A later id commits first; the earlier one is still in flight
+        db.session.execute(insert(StreamEvent.__table__), [dict(row, id=3, created_at=datetime.utcnow())])
+        db.session.commit()
+        assert broker.read({channel}, 0, 0) == []
+
+        db.session.execute(insert(StreamEvent.__table__), [dict(row, id=2, created_at=datetime.utcnow())])
+        db.session.commit()
+        time.sleep(0.2)
+        assert [e.id for e in broker.read({channel}, 0, 0)] == [2, 3]
+
+
+def test_database_broker_has_no_lag_on_sqlite(app):
+    with app.app_context():
+        assert not DatabaseBroker(app).visibility_lag
@@ -0,0 +1,56 @@
+"""PATCH /progress/<id> edits the stored JSON the same way apply_operations does."""
+import copy
+import uuid
+import pytest
+from conftest import auth_header
+from json_patch import apply_operations, parse_operations
+from models import db, User, Student, ProgressTracker
+
+MILESTONES = [{'text': 'one'}, {'text': 'two'}, {'text': 'three', 'completed': False}]
+
+OPERATIONS = [
+    [{'op': 'add', 'path': '/goals/-', 'value': {'text': 'new', 'completed': False}}],
+    [{'op': 'replace', 'path': '/milestones/2/completed', 'value': True}],
+    [{'op': 'replace', 'path': '/milestones/9/completed', 'value': True}],
+    [{'op': 'add', 'path': '/milestones/0/note', 'value': 'started'}],
+    [{'op': 'remove', 'path': '/milestones/1'}],
+    [{'op': 'remove', 'path': '/goals/0'}],
+    [{'op': 'replace', 'path': '/goals', 'value': [{'text': 'only'}]}],
+    [{'op': 'add', 'path': '/goals/-', 'value': 'a'}, {'op': 'add', 'path': '/goals/-', 'value': 'b'},
+     {'op': 'remove', 'path': '/milestones/0'}],
+]
+
+
+def create_tracker(app, goals):
+    with app.app_context():
+        user = User(user_id=str(uuid.uuid4()), name='student', email='student@test.local',
+                    password_hash='-', role='student')
+        tracker = ProgressTracker(tracker_id=str(uuid.uuid4()), goals=goals,
+                                  milestones=copy.deepcopy(MILESTONES))
+        db.session.add(Student(user=user, progress_trackers=[tracker]))
+        db.session.commit()
+        return user.id, tracker.tracker_id
+
+
+@pytest.mark.parametrize('goals', [None, [], [{'text': 'first'}]])
+@pytest.mark.parametrize('operations', OPERATIONS)
+def test_patch_matches_apply_operations(app, client, goals, operations):
+    user_id, tracker_id = create_tracker(app, goals)
+    response = client.patch(f'/api/students/progress/{tracker_id}', json={'operations': operations},
+                            headers=auth_header(app, user_id))
+    assert response.status_code == 200, response.get_json()
+
+    expected = ProgressTracker(goals=copy.deepcopy(goals), milestones=copy.deepcopy(MILESTONES))
+    apply_operations(expected, parse_operations(operations, ('goals', 'milestones')))
+    tracker = response.get_json()['tracker']
+    assert tracker['goals'] == expected.goals
+    assert tracker['milestones'] == expected.milestones
+
+
+def test_add_at_an_array_index_is_rejected(app, client):
+    user_id, tracker_id = create_tracker(app, [{'text': 'first'}])
+    response = client.patch(f'/api/students/progress/{tracker_id}', headers=auth_header(app, user_id),
+                            json={'operations': [{'op': 'add', 'path': '/goals/0', 'value': {'text': 'new'}}]})
+    assert response.status_code == 400
+    with app.app_context():
+        assert ProgressTracker.query.filter_by(tracker_id=tracker_id).one().goals == [{'text': 'first'}]
@@ -0,0 +1,47 @@
+"""Migrations rewrite only the data they can, and refuse to discard the rest."""
+import json
+import pytest
+from sqlalchemy import delete, text
+from migrations import MigrationError, add_questionnaire_versions, convert_json_columns, run_migrations
+from models import db, SchemaMigration
+from scoring import public_questionnaire
+
+
+def test_invalid_json_stops_the_migration(app):
+    with app.app_context():
+        db.session.execute(text(
+            "INSERT INTO students (id, user_id) VALUES (1, 1)"
+        ))
+        db.session.execute(text(
+            "INSERT INTO progress_trackers (id, student_id, tracker_id, goals, milestones, created_at) "
+            "VALUES (1, 1, 't1', '[]', '[]', CURRENT_TIMESTAMP), "
+            "(2, 1, 't2', 'not json', '[]', CURRENT_TIMESTAMP)"
+        ))
+        db.session.execute(delete(SchemaMigration).where(SchemaMigration.name == convert_json_columns.__name__))
+        db.session.commit()
+
+        with pytest.raises(MigrationError, match=r'progress_trackers\.goals \(id 2\)'):
+            run_migrations()
+        assert db.session.execute(text('SELECT goals FROM progress_trackers WHERE id = 2')).scalar() == 'not json'
+
+        db.session.execute(text("UPDATE progress_trackers SET goals = '[]' WHERE id = 2"))
+        db.session.commit()
+        assert run_migrations() == [convert_json_columns.__name__]
+
+
+def test_served_questionnaire_copies_become_a_version(app):
+    served = json.dumps(public_questionnaire())
+    with app.app_context():
+        db.session.execute(text("INSERT INTO students (id, user_id) VALUES (1, 1)"))
+        db.session.execute(text(
+            "INSERT INTO career_assessments (id, student_id, assessment_id, questionnaire, created_at) "
+            "VALUES (1, 1, 'served', :served, CURRENT_TIMESTAMP), (2, 1, 'client', '{\"q\": 1}', CURRENT_TIMESTAMP)"
+        ), {'served': served})
+        db.session.execute(delete(SchemaMigration).where(SchemaMigration.name == add_questionnaire_versions.__name__))
+        db.session.commit()
+
+        assert run_migrations() == [add_questionnaire_versions.__name__]
+        rows = db.session.execute(text(
+            'SELECT questionnaire, questionnaire_version FROM career_assessments ORDER BY id'
+        )).all()
+    assert rows == [(None, 1), ('{"q": 1}', None)]
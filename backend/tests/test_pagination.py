@@ -0,0 +1,37 @@
+"""Following next_cursor visits every row once, newest first, ties included."""
+import uuid
+from datetime import datetime
+from conftest import auth_header
+from models import db, User
+
+
+def test_pages_cover_rows_with_equal_sort_keys(app, client):
+    created = datetime(2030, 1, 1)
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').one()
+        admin.created_at = datetime(2020, 1, 1)
+        db.session.add_all(
+            User(user_id=str(uuid.uuid4()), name=f'user{i}', email=f'user{i}@test.local', password_hash='-',
+                 role='student', created_at=created if i % 2 else datetime(2030, 1, i + 1))
+            for i in range(7)
+        )
+        db.session.commit()
+        expected = [u.id for u in User.query.order_by(User.created_at.desc(), User.id.desc())]
+        headers = auth_header(app, admin.id)
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/api/admin/users', query_string=params, headers=headers).get_json()
+        seen.extend(user['id'] for user in page['users'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == expected
+
+
+def test_malformed_cursor_is_rejected(app, client):
+    with app.app_context():
+        headers = auth_header(app, User.query.filter_by(role='admin').one().id)
+    response = client.get('/api/admin/users', query_string={'cursor': 'bm90LWEtY3Vyc29y'}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,47 @@
+"""Pool failures surface as PasswordHashingBusy (503) and do not outlive the request."""
+import os
+import threading
+import time
+import pytest
+import passwords
+from passwords import PasswordHashingBusy, hash_password, hash_passwords, verify_password
+
+
+@pytest.fixture
+def pooled(app):
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_TIMEOUT=0.5)
+    with app.app_context():
+        yield
+    passwords.shutdown_pool()
+
+
+def test_timeout_is_busy(pooled):
+    with pytest.raises(PasswordHashingBusy):
+        passwords._run(time.sleep, 2)
+
+
+def test_broken_pool_is_replaced(pooled):
+    with pytest.raises(PasswordHashingBusy):
+        passwords._run(os._exit, 1)
+    assert verify_password(hash_password('secret'), 'secret')
+
+
+def test_bulk_hashing_leaves_room_for_logins(app, pooled):
+    # 30 hashes take about two seconds on one process; a login submitted
+    # meanwhile waits behind at most one of them
+    app.config.update(PASSWORD_HASH_METHOD='pbkdf2:sha256:200000', PASSWORD_HASH_TIMEOUT=1)
+    stored = hash_password('secret')
+    results = {}
+
+    def bulk():
+        with app.app_context():
+            results['hashes'] = hash_passwords([f'password{i}' for i in range(30)])
+
+    thread = threading.Thread(target=bulk)
+    thread.start()
+    time.sleep(0.2)
+    started = time.perf_counter()
+    assert verify_password(stored, 'secret')
+    assert time.perf_counter() - started < 0.5
+    thread.join()
+    assert len(results['hashes']) == 30
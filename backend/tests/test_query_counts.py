@@ -0,0 +1,37 @@
+"""The statements a list endpoint runs must not grow with the rows it returns."""
+from conftest import StatementCounter, auth_header, seed
+from models import db
+
+ROWS = 10
+
+ENDPOINTS = [
+    ('student', '/api/mentors/search'),
+    ('student', '/api/mentors/search?q=python'),
+    ('student', '/api/communications/messages'),
+    ('student', '/api/communications/sessions'),
+    ('mentor', '/api/mentors/requests'),
+    ('admin', '/api/admin/mentors/pending'),
+    ('admin', '/api/admin/users'),
+    ('admin', '/api/admin/reports/sessions'),
+]
+
+
+def statement_counts(make_app, n):
+    app = make_app()
+    with app.app_context():
+        user_ids = seed(n)
+        counter = StatementCounter(db.engine)
+        db.session.remove()
+    client = app.test_client()
+    counts = {}
+    for role, path in ENDPOINTS:
+        headers = auth_header(app, user_ids[role])
+        counter.reset()
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, (path, response.get_json())
+        counts[(role, path)] = counter.count
+    return counts
+
+
+def test_statements_do_not_grow_with_rows(make_app):
+    assert statement_counts(make_app, ROWS) == statement_counts(make_app, 2 * ROWS)
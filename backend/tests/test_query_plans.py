@@ -0,0 +1,138 @@
+"""Every SELECT the hot endpoints run must be index-backed.
+
+Each statement is run through ``EXPLAIN QUERY PLAN``. A plan fails on a full
+table scan, on a scan of a whole index (``SCAN t USING INDEX``, which walks
+every entry) unless the statement has a LIMIT, and on a temporary sort.
+"""
+import re
+import pytest
+from sqlalchemy import event
+from conftest import auth_header, seed
+from models import db
+
+# Tables that are read in full by design
+FULL_SCAN_ALLOWED = {'stat_counters'}
+
+_SUBQUERY = re.compile(r'^(MATERIALIZE|CO-ROUTINE) (\w+)')
+_TABLE_SCAN = re.compile(r'^SCAN (\w+)\b( USING (COVERING )?INDEX)?(?! VIRTUAL TABLE)')
+_TEMP_SORT = re.compile(r'USE TEMP B-TREE FOR (?!RIGHT PART)')
+_LIMIT = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+
+ENDPOINTS = [
+    ('student', '/api/auth/me'),
+    ('student', '/api/students/profile'),
+    ('student', '/api/students/assessments'),
+    ('student', '/api/students/progress'),
+    ('student', '/api/mentors/search'),
+    ('student', '/api/mentors/search?q=python'),
+    ('student', '/api/communications/messages'),
+    ('student', '/api/communications/sessions'),
+    ('mentor', '/api/mentors/profile'),
+    ('mentor', '/api/mentors/requests'),
+    ('mentor', '/api/mentors/resources'),
+    ('mentor', '/api/mentors/availability'),
+    ('student', '/api/mentors/1/slots'),
+    ('mentor', '/api/communications/messages'),
+    ('mentor', '/api/communications/sessions'),
+    ('mentor', '/api/communications/messages/unread'),
+    ('student', '/api/communications/messages/unread'),
+    ('mentor', '/api/communications/conversations'),
+    ('mentor', '/api/communications/conversations/1/messages'),
+    ('admin', '/api/admin/users'),
+    ('admin', '/api/admin/users?role=mentor'),
+    ('admin', '/api/admin/mentors/pending'),
+    ('admin', '/api/admin/dashboard/stats'),
+    ('admin', '/api/admin/reports/sessions'),
+]
+
+# Lists paged with a cursor; the later pages add the keyset predicate
+PAGED_ENDPOINTS = [
+    ('student', '/api/communications/messages'),
+    ('student', '/api/communications/sessions'),
+    ('mentor', '/api/mentors/requests'),
+    ('mentor', '/api/communications/conversations'),
+    ('admin', '/api/admin/users'),
+    ('admin', '/api/admin/reports/sessions'),
+]
+
+
+def problems(statement, plan):
+    found = []
+    # Subquery results are already bounded by an index search
+    subqueries = {m.group(2) for m in map(_SUBQUERY.search, plan) if m}
+    sorts_subquery = False
+    for line in plan:
+        scan = _TABLE_SCAN.search(line)
+        if scan:
+            table, index = scan.group(1), scan.group(2)
+            if table in subqueries:
+                sorts_subquery = True
+            elif table in FULL_SCAN_ALLOWED or (index and _LIMIT.search(statement)):
+                # Walking an index in order is fine when the walk stops early
+                continue
+            else:
+                found.append(line)
+        elif _TEMP_SORT.search(line) and not (sorts_subquery or ' MATCH ' in statement):
+            # Ordering the rows of a bounded subquery, or full-text matches by
+            # relevance, is expected
+            found.append(line)
+    return found
+
+
+def test_index_walks_need_a_limit():
+    plan = ['SCAN users USING INDEX ix_users_created_at']
+    assert problems('SELECT * FROM users ORDER BY created_at', plan) == plan
+    assert problems('SELECT * FROM users ORDER BY created_at LIMIT ?', plan) == []
+    assert problems('SELECT * FROM users', ['SCAN users']) == ['SCAN users']
+    assert problems('SELECT * FROM users WHERE id = ?', ['SEARCH users USING INTEGER PRIMARY KEY (rowid=?)']) == []
+
+
+def get_with_plans(app, client, path, headers):
+    """GET ``path``; returns the response and the problems in its SELECTs' plans."""
+    with app.app_context():
+        engine = db.engine
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    response = client.get(path, headers=headers)
+    event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.get_json()
+
+    failures = []
+    raw = engine.raw_connection()
+    try:
+        for statement, parameters in captured:
+            cursor = raw.cursor()
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            plan = [row[-1] for row in cursor.fetchall()]
+            failures.extend(
+                f'{line}\n    in: {" ".join(statement.split())}' for line in problems(statement, plan)
+            )
+    finally:
+        raw.close()
+    return response, failures
+
+
+@pytest.mark.parametrize('role, path', ENDPOINTS)
+def test_plans_use_indexes(app, client, role, path):
+    with app.app_context():
+        user_ids = seed(3)
+        db.session.remove()
+    _, failures = get_with_plans(app, client, path, auth_header(app, user_ids[role]))
+    assert not failures, '\n'.join(failures)
+
+
+@pytest.mark.parametrize('role, path', PAGED_ENDPOINTS)
+def test_later_pages_use_indexes(app, client, role, path):
+    with app.app_context():
+        user_ids = seed(3)
+        db.session.remove()
+    headers = auth_header(app, user_ids[role])
+    first = client.get(path, query_string={'limit': 1}, headers=headers).get_json()
+    assert first['next_cursor']
+    _, failures = get_with_plans(app, client, f'{path}?limit=1&cursor={first["next_cursor"]}', headers)
+    assert not failures, '\n'.join(failures)
@@ -0,0 +1,81 @@
+"""Mentor updates apply without a rebuild, and survive a rebuild they race."""
+import threading
+from collections import Counter
+from types import SimpleNamespace
+import recommendations
+from conftest import seed
+from models import db, Mentor
+from recommendations import MentorRecommender
+
+
+def mentor(mentor_id, expertise, status='verified'):
+    return SimpleNamespace(id=mentor_id, expertise=expertise, industry=None, professional_title=None,
+                           bio=None, verification_status=status)
+
+
+def ids(recommender, *words):
+    return [mentor_id for mentor_id, _ in recommender.top_k([Counter(words)])[0]]
+
+
+def test_updates_apply_without_a_rebuild():
+    recommender = MentorRecommender()
+    recommender.build([(1, Counter(['python'])), (2, Counter(['design'])), (3, Counter(['python', 'data']))])
+    assert sorted(ids(recommender, 'python')) == [1, 3]
+
+    recommender.update_mentor(mentor(1, 'design'))
+    recommender.update_mentor(mentor(4, 'python rust'))
+    recommender.update_mentor(mentor(3, 'python', status='rejected'))
+    assert ids(recommender, 'python') == [4]
+    assert sorted(ids(recommender, 'design')) == [1, 2]
+    # Terms first seen in an update are searchable too
+    assert ids(recommender, 'rust') == [4]
+    assert recommender.stats()['mentors'] == 3
+
+    recommender.remove_mentor(4)
+    assert ids(recommender, 'python') == []
+
+
+def test_rebuild_keeps_changes_made_while_it_reads(app, monkeypatch):
+    recommender = MentorRecommender()
+    recommender.build([])
+    weighted_terms = recommendations.weighted_terms
+
+    def update_during_read(fields):
+        if not updates:
+            # The database has the old profile; the update lands mid-read
+            updates.append(True)
+            recommender.update_mentor(mentor(first, 'rust'))
+        return weighted_terms(fields)
+
+    updates = []
+    monkeypatch.setattr(recommendations, 'weighted_terms', update_during_read)
+    with app.app_context():
+        seed(4)
+        first = Mentor.query.filter_by(verification_status='verified').order_by(Mentor.id).first().id
+        recommender.build_from_database()
+    assert ids(recommender, 'rust') == [first]
+    assert first not in ids(recommender, 'python')
+    assert recommender.stats()['pending_changes'] == 1
+
+    # Changes made before a rebuild starts are part of what it reads
+    monkeypatch.setattr(recommendations, 'weighted_terms', weighted_terms)
+    with app.app_context():
+        db.session.get(Mentor, first).expertise = 'rust'
+        db.session.commit()
+        recommender.build_from_database()
+    assert recommender.stats()['pending_changes'] == 0
+    assert ids(recommender, 'rust') == [first]
+
+
+def test_stale_index_answers_while_another_thread_rebuilds():
+    recommender = MentorRecommender(refresh_seconds=0)
+    recommender.build([(1, Counter(['python']))])
+    recommender._build_lock.acquire()
+    try:
+        thread = threading.Thread(target=recommender.ensure_built)
+        thread.start()
+        thread.join(1)
+        assert not thread.is_alive()
+    finally:
+        recommender._build_lock.release()
+    assert ids(recommender, 'python') == [1]
@@ -0,0 +1,81 @@
+"""Booking, free slots and exports agree on what a session occupies."""
+import json
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from conftest import auth_header
+from models import db, User, Student, Mentor, Session, MentorAvailability
+
+START = datetime(2030, 1, 1, 9)
+
+
+@pytest.fixture
+def ids(app):
+    def user(role):
+        return User(user_id=str(uuid.uuid4()), name=role, email=f'{role}@test.local', password_hash='-', role=role)
+    student = Student(user=user('student'))
+    mentor = Mentor(user=user('mentor'), verification_status='verified')
+    with app.app_context():
+        db.session.add_all([student, mentor])
+        db.session.commit()
+        admin = User.query.filter_by(role='admin').first()
+        return {'student': student.user_id, 'mentor': mentor.user_id, 'admin': admin.id,
+                'student_id': student.id, 'mentor_id': mentor.id}
+
+
+def test_slots_without_windows_match_booking(app, client, ids):
+    with app.app_context():
+        db.session.add(Session(session_id=str(uuid.uuid4()), student_id=ids['student_id'], mentor_id=ids['mentor_id'],
+                               date_time=START + timedelta(hours=1), end_time=START + timedelta(hours=2)))
+        db.session.commit()
+    response = client.get(
+        f'/api/mentors/{ids["mentor_id"]}/slots',
+        query_string={'start': START.isoformat(), 'end': (START + timedelta(hours=4)).isoformat()},
+        headers=auth_header(app, ids['student'])
+    )
+    assert response.get_json()['slots'] == [
+        {'start_time': '2030-01-01T09:00:00', 'end_time': '2030-01-01T10:00:00'},
+        {'start_time': '2030-01-01T11:00:00', 'end_time': '2030-01-01T13:00:00'},
+    ]
+    booked = client.post('/api/communications/sessions', headers=auth_header(app, ids['student']),
+                         json={'mentor_id': ids['mentor_id'], 'date_time': '2030-01-01T11:00:00'})
+    assert booked.status_code == 201
+
+    with app.app_context():
+        db.session.add(MentorAvailability(mentor_id=ids['mentor_id'], start_time=START + timedelta(days=1),
+                                          end_time=START + timedelta(days=1, hours=2)))
+        db.session.commit()
+    response = client.get(
+        f'/api/mentors/{ids["mentor_id"]}/slots',
+        query_string={'start': START.isoformat(), 'end': (START + timedelta(hours=4)).isoformat()},
+        headers=auth_header(app, ids['student'])
+    )
+    assert response.get_json()['slots'] == []
+
+
+def test_reviving_into_a_conflict_is_rejected(app, client, ids):
+    with app.app_context():
+        cancelled = Session(session_id=str(uuid.uuid4()), student_id=ids['student_id'], mentor_id=ids['mentor_id'],
+                            date_time=START, end_time=START + timedelta(hours=1), status='cancelled')
+        db.session.add_all([cancelled, Session(
+            session_id=str(uuid.uuid4()), student_id=ids['student_id'], mentor_id=ids['mentor_id'],
+            date_time=START + timedelta(minutes=30), end_time=START + timedelta(minutes=90)
+        )])
+        db.session.commit()
+        cancelled_id = cancelled.id
+    response = client.put(f'/api/communications/sessions/{cancelled_id}', json={'status': 'scheduled'},
+                          headers=auth_header(app, ids['mentor']))
+    assert response.status_code == 409
+    with app.app_context():
+        assert db.session.get(Session, cancelled_id).status == 'cancelled'
+
+
+def test_session_export_includes_end_time(app, client, ids):
+    with app.app_context():
+        db.session.add(Session(session_id=str(uuid.uuid4()), student_id=ids['student_id'], mentor_id=ids['mentor_id'],
+                               date_time=START, end_time=START + timedelta(hours=1)))
+        db.session.commit()
+    response = client.get('/api/admin/exports/sessions', query_string={'format': 'ndjson'},
+                          headers=auth_header(app, ids['admin']))
+    row = json.loads(response.get_data(as_text=True).splitlines()[0])
+    assert row['end_time'] == '2030-01-01T10:00:00'
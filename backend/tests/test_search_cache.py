@@ -0,0 +1,52 @@
+"""A mentor change drops every cached search it affects, and only those."""
+from types import SimpleNamespace
+from conftest import auth_header
+from models import db, User
+from search_cache import SearchCache, normalize_query
+
+
+def mentor(mentor_id, **fields):
+    profile = {**dict(professional_title=None, industry=None, expertise=None, bio=None), **fields}
+    return SimpleNamespace(id=mentor_id, user=SimpleNamespace(name='Mentor'),
+                           verification_status='verified', **profile)
+
+
+def test_invalidation_folds_case_and_accents():
+    cache = SearchCache()
+    for query in [normalize_query('resume'), normalize_query('RÉSUMÉ'), normalize_query(expertise='resume'),
+                  normalize_query('python')]:
+        cache.set(query, [], '{}', cache.generation)
+
+    assert cache.invalidate_mentor(1, mentor(1, expertise='Résumé review')) == 3
+    assert cache.stats()['entries'] == 1
+
+
+def test_response_from_before_an_invalidation_is_not_stored():
+    cache = SearchCache()
+    key = normalize_query('python')
+    started = cache.generation
+    # The mentor commits and invalidates while the search runs
+    cache.invalidate_mentor(1, mentor(1, expertise='python'))
+    assert not cache.set(key, [], '{"stale": true}', started)
+    assert cache.get(key) is None
+    assert cache.set(key, [1], '{}', cache.generation)
+    assert cache.get(key) == '{}'
+
+
+def test_profile_edit_shows_in_cached_accent_free_search(app, client):
+    response = client.post('/api/auth/register', json={
+        'name': 'Mentor', 'email': 'mentor@test.local', 'password': 'password', 'role': 'mentor'
+    })
+    mentor_user = response.get_json()['user']['id']
+    with app.app_context():
+        admin = auth_header(app, User.query.filter_by(role='admin').one().id)
+        mentor_id = db.session.get(User, mentor_user).mentor_profile.id
+    client.put(f'/api/admin/mentors/verify/{mentor_id}', headers=admin, json={'status': 'verified'})
+
+    def search():
+        response = client.get('/api/mentors/search', query_string={'q': 'resume'}, headers=admin)
+        return [m['id'] for m in response.get_json()['mentors']]
+
+    assert search() == []
+    client.put('/api/mentors/profile', headers=auth_header(app, mentor_user), json={'expertise': 'Résumé review'})
+    assert search() == [mentor_id]
@@ -0,0 +1,44 @@
+"""The N+1 detector fails requests that load a relationship once per row."""
+import pytest
+from flask import jsonify
+from sqlalchemy.orm import joinedload
+from conftest import seed
+from models import db, Student
+from sql_monitor import NPlusOneError, fingerprint
+
+
+@pytest.fixture
+def student_names(app):
+    # Two versions of one list view: a lazy load per row, and a joined load
+    def lazy():
+        return jsonify([s.user.name for s in Student.query.order_by(Student.id)])
+
+    def joined():
+        return jsonify([s.user.name for s in Student.query.options(joinedload(Student.user)).order_by(Student.id)])
+
+    app.add_url_rule('/test/students/lazy', 'students_lazy', lazy)
+    app.add_url_rule('/test/students/joined', 'students_joined', joined)
+    app.testing = True
+    with app.app_context():
+        seed(app.config['N_PLUS_ONE_THRESHOLD'] + 2)
+        db.session.remove()
+    return app.test_client()
+
+
+def test_lazy_load_per_row_raises(student_names):
+    with pytest.raises(NPlusOneError, match='Possible N\\+1 queries in GET /test/students/lazy'):
+        student_names.get('/test/students/lazy')
+
+
+def test_joined_load_passes(student_names):
+    assert student_names.get('/test/students/joined').status_code == 200
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint('SELECT * FROM users WHERE id IN (?, ?, ?) AND role = ?') == \
+        fingerprint('SELECT * FROM users WHERE id IN (?, ?) AND role = ?') == \
+        'SELECT * FROM users WHERE id IN (?) AND role = ?'
+    assert fingerprint("SELECT * FROM users WHERE name = 'it''s'  AND id = 42") == \
+        fingerprint("SELECT * FROM users WHERE name = 'bob' AND id = 7") == \
+        'SELECT * FROM users WHERE name = ? AND id = ?'
+    assert fingerprint('SELECT * FROM users WHERE id = %(id_1)s') == fingerprint('SELECT * FROM users WHERE id = :id')
@@ -0,0 +1,50 @@
+"""Per-request loading of the authenticated user.
+
+The JWT identity is resolved to a User, with its student or mentor profile
+joined in the same SELECT, once per request and cached on ``flask.g``.
+"""
+from functools import wraps
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.orm import joinedload
+from models import db, User
+
+_UNSET = object()
+
+
+def _identity_to_id():
+    # JWT identity is stored as a string; convert back to int for DB lookup
+    try:
+        return int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_current_user():
+    """Return the authenticated User (profiles loaded) or None."""
+    user = g.get('current_user', _UNSET)
+    if user is _UNSET:
+        user_id = _identity_to_id()
+        user = None
+        if user_id is not None:
+            user = db.session.get(
+                User, user_id,
+                options=[joinedload(User.student_profile), joinedload(User.mentor_profile)]
+            )
+        g.current_user = user
+    return user
+
+
+def load_current_user(fn):
+    """Route decorator (below ``jwt_required``) that sets ``g.current_user``.
+
+    Responds 422 when the token identity is not a user id; a missing user is
+    left as None for the route to report.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _identity_to_id() is None:
+            return jsonify({'error': 'Invalid token identity'}), 422
+        get_current_user()
+        return fn(*args, **kwargs)
+    return wrapper
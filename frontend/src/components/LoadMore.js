@@ -0,0 +1,16 @@
+import React from 'react';
+import Button from './Button';
+
+const LoadMore = ({ hasMore, loading, onClick }) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className="p-4 text-center">
+      <Button variant="secondary" size="sm" onClick={onClick} disabled={loading}>
+        {loading ? 'Loading...' : 'Load more'}
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
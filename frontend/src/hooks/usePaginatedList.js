@@ -0,0 +1,32 @@
+import { useCallback, useState } from 'react';
+
+// Keeps a cursor-paginated list: `reload` fetches the first page, `loadMore`
+// appends the next one. `fetchPage` receives `{ cursor }` and must resolve to
+// a response whose data holds the rows under `key` and a `next_cursor`.
+const usePaginatedList = (fetchPage, key) => {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const reload = useCallback(async () => {
+    const response = await fetchPage({});
+    setItems(response.data[key]);
+    setNextCursor(response.data.next_cursor);
+  }, [fetchPage, key]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetchPage({ cursor: nextCursor });
+      setItems((current) => [...current, ...response.data[key]]);
+      setNextCursor(response.data.next_cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [fetchPage, key, nextCursor]);
+
+  return { items, hasMore: Boolean(nextCursor), loadingMore, reload, loadMore };
+};
+
+export default usePaginatedList;
@@ -1,11 +1,16 @@
 import React, { useEffect, useState } from 'react';
 import { adminAPI } from '../services/api';
+import usePaginatedList from '../hooks/usePaginatedList';
 import Button from '../components/Button';
+import LoadMore from '../components/LoadMore';
+
+const fetchUsers = (params) => adminAPI.getUsers(undefined, params);
 
 const Admin = () => {
   const [stats, setStats] = useState({});
   const [pendingMentors, setPendingMentors] = useState([]);
-  const [users, setUsers] = useState([]);
+  const { items: users, hasMore, loadingMore, reload: reloadUsers, loadMore } =
+    usePaginatedList(fetchUsers, 'users');
   const [activeTab, setActiveTab] = useState('dashboard');
 
   useEffect(() => {
@@ -20,8 +25,7 @@ const Admin = () => {
       const mentorsRes = await adminAPI.getPendingMentors();
       setPendingMentors(mentorsRes.data.mentors);
       
-      const usersRes = await adminAPI.getUsers();
-      setUsers(usersRes.data.users);
+      await reloadUsers();
     } catch (error) {
       console.error('Error:', error);
     }
@@ -150,6 +154,11 @@ const Admin = () => {
                 ))}
               </tbody>
             </table>
+            <LoadMore
+              hasMore={hasMore}
+              loading={loadingMore}
+              onClick={() => loadMore().catch((error) => console.error('Error:', error))}
+            />
           </div>
         )}
       </div>
@@ -30,12 +30,8 @@ const Assessment = () => {
 
   const submitAssessment = async () => {
     try {
-      const recommendations = generateRecommendations(answers);
-      await studentAPI.createAssessment({
-        questionnaire: questions,
-        results: answers,
-        recommendations: recommendations
-      });
+      // Results and recommendations are scored on the server
+      await studentAPI.createAssessment({ answers });
       alert('Assessment completed! Check your dashboard for recommendations.');
       navigate('/dashboard');
     } catch (error) {
@@ -43,20 +39,6 @@ const Assessment = () => {
     }
   };
 
-  const generateRecommendations = (answers) => {
-    const recs = [];
-    if (answers[2]?.toLowerCase().includes('people')) {
-      recs.push('Human Resources', 'Teaching', 'Sales');
-    }
-    if (answers[2]?.toLowerCase().includes('data')) {
-      recs.push('Data Science', 'Analytics', 'Research');
-    }
-    if (recs.length === 0) {
-      recs.push('Business Management', 'Marketing', 'Consulting');
-    }
-    return recs;
-  };
-
   const question = questions[currentQuestion];
 
   return (
@@ -14,24 +14,23 @@ const Dashboard = () => {
   useEffect(() => {
     const fetchDashboardData = async () => {
       try {
-        const sessionsRes = await communicationAPI.getSessions();
-        setSessions(sessionsRes.data.sessions.slice(0, 5));
+        const sessionsRes = await communicationAPI.getSessions({ limit: 5 });
+        setSessions(sessionsRes.data.sessions);
 
-        const messagesRes = await communicationAPI.getMessages();
-        setMessages(messagesRes.data.messages.slice(0, 5));
+        const messagesRes = await communicationAPI.getMessages({ limit: 5 });
+        setMessages(messagesRes.data.messages);
 
         if (isStudent) {
-          const assessmentsRes = await studentAPI.getAssessments();
-          setAssessments(assessmentsRes.data.assessments.slice(0, 3));
+          const assessmentsRes = await studentAPI.getAssessments({ limit: 3 });
+          setAssessments(assessmentsRes.data.assessments);
         }
 
         if (isMentor) {
-          const requestsRes = await mentorAPI.getMentorshipRequests();
-          setRequests(
-            requestsRes.data.requests
-              .filter((r) => r.status === "pending")
-              .slice(0, 5)
-          );
+          const requestsRes = await mentorAPI.getMentorshipRequests({
+            status: "pending",
+            limit: 5,
+          });
+          setRequests(requestsRes.data.requests);
         }
       } catch (error) {
         console.error("Error fetching dashboard data:", error);
@@ -1,23 +1,19 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect } from 'react';
 import { communicationAPI } from '../services/api';
 import { useAuth } from '../context/AuthContext';
+import usePaginatedList from '../hooks/usePaginatedList';
+import LoadMore from '../components/LoadMore';
 
 const Messages = () => {
-  const [messages, setMessages] = useState([]);
+  const { items: messages, hasMore, loadingMore, reload, loadMore } =
+    usePaginatedList(communicationAPI.getMessages, 'messages');
   const { isStudent } = useAuth();
 
   useEffect(() => {
-    fetchMessages();
-  }, []);
+    reload().catch((error) => console.error('Error:', error));
+  }, [reload]);
 
-  const fetchMessages = async () => {
-    try {
-      const response = await communicationAPI.getMessages();
-      setMessages(response.data.messages);
-    } catch (error) {
-      console.error('Error:', error);
-    }
-  };
+  const fetchMore = () => loadMore().catch((error) => console.error('Error:', error));
 
   return (
     <div className="min-h-screen bg-gray-50 py-8">
@@ -37,6 +33,7 @@ const Messages = () => {
                   <p className="text-gray-700">{msg.content}</p>
                 </div>
               ))}
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={fetchMore} />
             </div>
           ) : (
             <div className="p-12 text-center text-gray-500">No messages yet</div>
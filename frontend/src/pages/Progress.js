@@ -1,25 +1,22 @@
 import React, { useEffect, useState } from 'react';
 import { studentAPI } from '../services/api';
+import usePaginatedList from '../hooks/usePaginatedList';
 import Button from '../components/Button';
+import LoadMore from '../components/LoadMore';
 
 const Progress = () => {
-  const [trackers, setTrackers] = useState([]);
+  const { items: trackers, hasMore, loadingMore, reload, loadMore } =
+    usePaginatedList(studentAPI.getProgress, 'trackers');
   const [showModal, setShowModal] = useState(false);
   const [newGoal, setNewGoal] = useState('');
   const [goals, setGoals] = useState([]);
 
-  useEffect(() => {
-    fetchProgress();
-  }, []);
+  const fetchProgress = () => reload().catch((error) => console.error('Error:', error));
+  const fetchMore = () => loadMore().catch((error) => console.error('Error:', error));
 
-  const fetchProgress = async () => {
-    try {
-      const response = await studentAPI.getProgress();
-      setTrackers(response.data.trackers);
-    } catch (error) {
-      console.error('Error:', error);
-    }
-  };
+  useEffect(() => {
+    reload().catch((error) => console.error('Error:', error));
+  }, [reload]);
 
   const createTracker = async () => {
     try {
@@ -49,7 +46,7 @@ const Progress = () => {
 
         <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
           {trackers.map((tracker) => {
-            const goalsList = JSON.parse(tracker.goals || '[]');
+            const goalsList = tracker.goals || [];
             return (
               <div key={tracker.id} className="bg-white rounded-lg shadow p-6">
                 <h3 className="text-lg font-semibold mb-4">Tracker {tracker.tracker_id.slice(0, 8)}</h3>
@@ -66,6 +63,7 @@ const Progress = () => {
             );
           })}
         </div>
+        <LoadMore hasMore={hasMore} loading={loadingMore} onClick={fetchMore} />
 
         {trackers.length === 0 && (
           <div className="text-center py-12">
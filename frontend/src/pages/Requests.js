@@ -1,22 +1,19 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect } from 'react';
 import { mentorAPI } from '../services/api';
+import usePaginatedList from '../hooks/usePaginatedList';
 import Button from '../components/Button';
+import LoadMore from '../components/LoadMore';
 
 const Requests = () => {
-  const [requests, setRequests] = useState([]);
+  const { items: requests, hasMore, loadingMore, reload, loadMore } =
+    usePaginatedList(mentorAPI.getMentorshipRequests, 'requests');
 
-  useEffect(() => {
-    fetchRequests();
-  }, []);
+  const fetchRequests = () => reload().catch((error) => console.error('Error:', error));
+  const fetchMore = () => loadMore().catch((error) => console.error('Error:', error));
 
-  const fetchRequests = async () => {
-    try {
-      const response = await mentorAPI.getMentorshipRequests();
-      setRequests(response.data.requests);
-    } catch (error) {
-      console.error('Error:', error);
-    }
-  };
+  useEffect(() => {
+    reload().catch((error) => console.error('Error:', error));
+  }, [reload]);
 
   const handleResponse = async (requestId, status) => {
     try {
@@ -61,6 +58,7 @@ const Requests = () => {
                   </div>
                 </div>
               ))}
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={fetchMore} />
             </div>
           ) : (
             <div className="p-12 text-center text-gray-500">No requests yet</div>
@@ -1,25 +1,22 @@
 import React, { useEffect, useState } from 'react';
 import { mentorAPI } from '../services/api';
+import usePaginatedList from '../hooks/usePaginatedList';
 import Button from '../components/Button';
 import Input from '../components/Input';
+import LoadMore from '../components/LoadMore';
 
 const Resources = () => {
-  const [resources, setResources] = useState([]);
+  const { items: resources, hasMore, loadingMore, reload, loadMore } =
+    usePaginatedList(mentorAPI.getResources, 'resources');
   const [showModal, setShowModal] = useState(false);
   const [formData, setFormData] = useState({ title: '', description: '', file_type: '', file_url: '' });
 
-  useEffect(() => {
-    fetchResources();
-  }, []);
+  const fetchResources = () => reload().catch((error) => console.error('Error:', error));
+  const fetchMore = () => loadMore().catch((error) => console.error('Error:', error));
 
-  const fetchResources = async () => {
-    try {
-      const response = await mentorAPI.getResources();
-      setResources(response.data.resources);
-    } catch (error) {
-      console.error('Error:', error);
-    }
-  };
+  useEffect(() => {
+    reload().catch((error) => console.error('Error:', error));
+  }, [reload]);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -58,6 +55,7 @@ const Resources = () => {
             </div>
           ))}
         </div>
+        <LoadMore hasMore={hasMore} loading={loadingMore} onClick={fetchMore} />
 
         {resources.length === 0 && (
           <div className="text-center py-12 text-gray-500">No resources yet. Add one to share with students!</div>
@@ -1,24 +1,21 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect } from 'react';
 import { communicationAPI } from '../services/api';
 import { useAuth } from '../context/AuthContext';
+import usePaginatedList from '../hooks/usePaginatedList';
 import Button from '../components/Button';
+import LoadMore from '../components/LoadMore';
 
 const Sessions = () => {
-  const [sessions, setSessions] = useState([]);
+  const { items: sessions, hasMore, loadingMore, reload, loadMore } =
+    usePaginatedList(communicationAPI.getSessions, 'sessions');
   const { isStudent, isMentor } = useAuth();
 
-  useEffect(() => {
-    fetchSessions();
-  }, []);
+  const fetchSessions = () => reload().catch((error) => console.error('Error:', error));
+  const fetchMore = () => loadMore().catch((error) => console.error('Error:', error));
 
-  const fetchSessions = async () => {
-    try {
-      const response = await communicationAPI.getSessions();
-      setSessions(response.data.sessions);
-    } catch (error) {
-      console.error('Error:', error);
-    }
-  };
+  useEffect(() => {
+    reload().catch((error) => console.error('Error:', error));
+  }, [reload]);
 
   const updateSession = async (sessionId, status) => {
     try {
@@ -73,6 +70,7 @@ const Sessions = () => {
                   </div>
                 </div>
               ))}
+              <LoadMore hasMore={hasMore} loading={loadingMore} onClick={fetchMore} />
             </div>
           ) : (
             <div className="p-12 text-center text-gray-500">No sessions scheduled</div>
@@ -36,6 +36,9 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints return up to `limit` rows (default 50) and a `next_cursor`;
+// pass it back as `cursor` for the next page (see hooks/usePaginatedList)
+
 // Auth APIs
 export const authAPI = {
   register: (data) => api.post('/auth/register', data),
@@ -48,11 +51,13 @@ export const authAPI = {
 export const studentAPI = {
   getProfile: () => api.get('/students/profile'),
   updateProfile: (data) => api.put('/students/profile', data),
+  getQuestionnaire: () => api.get('/students/assessment/questionnaire'),
   createAssessment: (data) => api.post('/students/assessment', data),
-  getAssessments: () => api.get('/students/assessments'),
-  getProgress: () => api.get('/students/progress'),
+  getAssessments: (params) => api.get('/students/assessments', { params }),
+  getProgress: (params) => api.get('/students/progress', { params }),
   createProgress: (data) => api.post('/students/progress', data),
   updateProgress: (trackerId, data) => api.put(`/students/progress/${trackerId}`, data),
+  patchProgress: (trackerId, operations) => api.patch(`/students/progress/${trackerId}`, { operations }),
 };
 
 // Mentor APIs
@@ -60,32 +65,42 @@ export const mentorAPI = {
   getProfile: () => api.get('/mentors/profile'),
   updateProfile: (data) => api.put('/mentors/profile', data),
   searchMentors: (params) => api.get('/mentors/search', { params }),
+  getRecommendations: (limit) => api.get('/mentors/recommendations', { params: { limit } }),
   getMentor: (mentorId) => api.get(`/mentors/${mentorId}`),
   requestMentorship: (data) => api.post('/mentors/request', data),
-  getMentorshipRequests: () => api.get('/mentors/requests'),
+  getMentorshipRequests: (params) => api.get('/mentors/requests', { params }),
   respondToRequest: (requestId, status) => api.put(`/mentors/requests/${requestId}`, { status }),
-  getResources: () => api.get('/mentors/resources'),
+  getResources: (params) => api.get('/mentors/resources', { params }),
   uploadResource: (data) => api.post('/mentors/resources', data),
+  getAvailability: (params) => api.get('/mentors/availability', { params }),
+  addAvailability: (windows) => api.post('/mentors/availability', { windows }),
+  deleteAvailability: (windowId) => api.delete(`/mentors/availability/${windowId}`),
+  getFreeSlots: (mentorId, params) => api.get(`/mentors/${mentorId}/slots`, { params }),
 };
 
 // Communication APIs
 export const communicationAPI = {
-  getMessages: () => api.get('/communications/messages'),
+  getMessages: (params) => api.get('/communications/messages', { params }),
   sendMessage: (data) => api.post('/communications/messages', data),
   markMessageRead: (messageId) => api.put(`/communications/messages/${messageId}/read`),
-  getSessions: () => api.get('/communications/sessions'),
+  markMessagesRead: (data) => api.put('/communications/messages/read', data),
+  getUnreadSummary: () => api.get('/communications/messages/unread'),
+  getConversations: (params) => api.get('/communications/conversations', { params }),
+  getConversationMessages: (partnerId, params) => api.get(`/communications/conversations/${partnerId}/messages`, { params }),
+  getSessions: (params) => api.get('/communications/sessions', { params }),
   createSession: (data) => api.post('/communications/sessions', data),
   updateSession: (sessionId, data) => api.put(`/communications/sessions/${sessionId}`, data),
 };
 
 // Admin APIs
 export const adminAPI = {
-  getUsers: (role) => api.get('/admin/users', { params: { role } }),
+  getUsers: (role, params) => api.get('/admin/users', { params: { role, ...params } }),
   deleteUser: (userId) => api.delete(`/admin/users/${userId}`),
   verifyMentor: (mentorId, status) => api.put(`/admin/mentors/verify/${mentorId}`, { status }),
   getPendingMentors: () => api.get('/admin/mentors/pending'),
   getDashboardStats: () => api.get('/admin/dashboard/stats'),
-  getSessionReport: () => api.get('/admin/reports/sessions'),
+  getSessionReport: (params) => api.get('/admin/reports/sessions', { params }),
+  exportReport: (name, params) => api.get(`/admin/exports/${name}`, { params, responseType: 'blob' }),
   updateProfile: (data) => api.put('/admin/profile', data),
 };
 